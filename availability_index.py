@@ -0,0 +1,157 @@
+"""
+availability_index.py
+Defines the AvailabilityIndex class for searching free rooms across a property.
+"""
+
+import threading
+from datetime import date
+from functools import partial
+from room import Room
+
+def set_bits(mask: int):
+    """Yields the positions of the set bits of a non-negative integer, lowest first."""
+    bits = bin(mask)[:1:-1]   # least significant bit first
+    pos = bits.find("1")
+    while pos >= 0:
+        yield pos
+        pos = bits.find("1", pos + 1)
+
+
+class AvailabilityIndex:
+    """
+    The AvailabilityIndex class maps room numbers to Room objects and answers
+    date-range availability questions. Every room gets a bit position, and the
+    index keeps a bitmap per night of the rooms reserved that night, updated by
+    observing each room's RoomSchedule. Finding the free rooms of a stay ORs the
+    bitmaps of its nights, so its cost grows with the nights and the rooms
+    returned rather than with a schedule lookup per room.
+    """
+
+    def __init__(self, rooms: list = None):
+        """
+        Initializes a new AvailabilityIndex.
+
+        :param rooms: An optional list of Room objects to index.
+        """
+        self.__rooms = {}
+        self.__slots = {}       # room number -> bit position
+        self.__numbers = []     # bit position -> room number (None once removed)
+        self.__observers = {}   # room number -> observer registered on its schedule
+        self.__indexed = 0      # bitmap of the indexed rooms
+        self.__busy = {}        # night ordinal -> bitmap of the rooms reserved that night
+        self.__lock = threading.Lock()
+        for room in rooms or []:
+            self.add_room(room)
+
+    def _mark(self, bit: int, start: int, end: int, delta: int) -> None:
+        """RoomSchedule observer that sets or clears a room's bit for the nights of a reservation."""
+        busy = self.__busy
+        with self.__lock:
+            if delta > 0:
+                for night in range(start, end):
+                    busy[night] = busy.get(night, 0) | bit
+            else:
+                for night in range(start, end):
+                    mask = busy.get(night, 0) & ~bit
+                    if mask:
+                        busy[night] = mask
+                    else:
+                        busy.pop(night, None)
+
+    def add_room(self, room: Room) -> None:
+        """
+        Adds a room to the index.
+
+        :raises ValueError: If a room with the same number is already indexed.
+        """
+        number = room.get_room_number()
+        if number in self.__rooms:
+            raise ValueError(f"Room {number} is already indexed.")
+        slot = len(self.__numbers)
+        observer = partial(self._mark, 1 << slot)
+        schedule = room.get_schedule()
+        # Holding the schedule lock, no reservation can slip in between the replay and the observer.
+        with schedule.get_lock():
+            for check_in, check_out, _ in schedule.get_reservations():
+                observer(check_in.toordinal(), check_out.toordinal(), 1)
+            schedule.add_observer(observer)
+        self.__rooms[number] = room
+        self.__slots[number] = slot
+        self.__numbers.append(number)
+        self.__observers[number] = observer
+        with self.__lock:
+            self.__indexed |= 1 << slot
+
+    def remove_room(self, room_number: int) -> Room:
+        """Removes a room from the index and returns it."""
+        room = self.__rooms.pop(room_number)
+        slot = self.__slots.pop(room_number)
+        schedule = room.get_schedule()
+        with schedule.get_lock():
+            schedule.remove_observer(self.__observers.pop(room_number))
+            for check_in, check_out, _ in schedule.get_reservations():
+                self._mark(1 << slot, check_in.toordinal(), check_out.toordinal(), -1)
+        self.__numbers[slot] = None
+        with self.__lock:
+            self.__indexed &= ~(1 << slot)
+        return room
+
+    def get_room(self, room_number: int) -> Room:
+        """Returns the room with the given number, or None if it is not indexed."""
+        return self.__rooms.get(room_number)
+
+    def get_rooms(self) -> list:
+        """Returns all indexed rooms."""
+        return list(self.__rooms.values())
+
+    def is_free(self, room_number: int, check_in: date, check_out: date) -> bool:
+        """
+        Returns True if the given room can be booked for [check_in, check_out).
+
+        :raises KeyError: If the room is not indexed.
+        """
+        return self.__rooms[room_number].is_available_for(check_in, check_out)
+
+    def _free_mask(self, check_in: date, check_out: date) -> int:
+        """Returns the bitmap of the indexed rooms with no reservation in [check_in, check_out)."""
+        start, end = check_in.toordinal(), check_out.toordinal()
+        if end <= start:
+            raise ValueError(f"Check-out {check_out} must be after check-in {check_in}.")
+        busy = self.__busy
+        with self.__lock:
+            reserved = 0
+            for night in range(start, end):
+                reserved |= busy.get(night, 0)
+            return self.__indexed & ~reserved
+
+    def free_rooms(self, check_in: date, check_out: date, room_numbers=None):
+        """
+        Yields the rooms that are free for [check_in, check_out).
+
+        :param room_numbers: Optional iterable of candidate room numbers; when given,
+                             only those rooms are checked, in that order (e.g. the
+                             output of a type filter).
+        """
+        free = self._free_mask(check_in, check_out)
+        rooms = self.__rooms
+        if room_numbers is None:
+            numbers = self.__numbers
+            for slot in set_bits(free):
+                room = rooms.get(numbers[slot])
+                if room is not None and room.is_available():
+                    yield room
+            return
+        bits = bin(free)[:1:-1]   # least significant bit first
+        slots = self.__slots
+        for number in room_numbers:
+            slot = slots.get(number)
+            if slot is not None and slot < len(bits) and bits[slot] == "1":
+                room = rooms.get(number)
+                if room is not None and room.is_available():
+                    yield room
+
+    def __len__(self) -> int:
+        return len(self.__rooms)
+
+    def __str__(self) -> str:
+        return f"AvailabilityIndex with {len(self.__rooms)} room(s)"
@@ -0,0 +1,467 @@
+"""
+benchmark.py
+Runs performance benchmarks for the Royal Stay Hotel Management System.
+"""
+
+import argparse
+import contextlib
+import csv
+import gc
+import heapq
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from event_log import EventLog, set_event_log
+from guest import Guest
+from room import Room
+from booking import Booking
+from invoice import Invoice
+from credit_card_payment import CreditCardPayment
+from room_inventory import RoomInventory
+from booking_engine import BookingEngine
+from loyalty_program import LoyaltyProgram
+from tier_engine import TierEngine
+from booking_store import BookingStore
+from bulk_importer import BulkImporter
+
+def _slot_names(cls) -> list:
+    """Returns the (mangled) slot names of a class and its bases, base classes first."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in getattr(klass, "__slots__", ()):
+            if name.startswith("__"):
+                name = f"_{klass.__name__.lstrip('_')}{name}"
+            names.append(name)
+    return names
+
+
+def _dict_backed(cls):
+    """
+    Returns a factory that copies a slotted instance into a plain object storing the
+    same attributes in a per-instance __dict__, i.e. the layout the models had
+    before they declared __slots__.
+    """
+    names = _slot_names(cls)
+    plain = type(f"Dict{cls.__name__}", (), {})
+
+    def copy(obj, **overrides):
+        record = plain()
+        for name in names:
+            setattr(record, name, overrides[name] if name in overrides else getattr(obj, name))
+        return record
+    return copy
+
+
+def _measure(build, count: int) -> int:
+    """Returns the bytes retained per item after calling build() count times."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return round((after - before) / count)
+
+
+def bench_memory(count: int = 100_000) -> dict:
+    """
+    Measures bytes per reservation record (one Booking, Invoice and CreditCardPayment,
+    sharing a guest and a room) with the slotted models and with an equivalent
+    __dict__-backed layout.
+    """
+    guest = Guest("Bench Guest", "bench@example.com", "555-0000")
+    room = Room(101, "Suite", ["Wi-Fi", "TV"], 300.0)
+    start = date(2025, 1, 1)
+    dict_booking = _dict_backed(Booking)
+    dict_invoice = _dict_backed(Invoice)
+    dict_payment = _dict_backed(CreditCardPayment)
+
+    def slotted(i):
+        booking = Booking(i, guest, room, start + timedelta(days=i % 365), start + timedelta(days=i % 365 + 2))
+        invoice = Invoice(i, booking, 600.0)
+        payment = CreditCardPayment(i, 600.0, "Credit Card", "1234567812345678", "12/28")
+        return booking, invoice, payment
+
+    def dict_backed(i):
+        booking, invoice, payment = slotted(i)
+        booking = dict_booking(booking)
+        return booking, dict_invoice(invoice, _Invoice__booking=booking), dict_payment(payment)
+
+    after = _measure(slotted, count)
+    before = _measure(dict_backed, count)
+    return {
+        "records": count,
+        "bytes_per_record_dict": before,
+        "bytes_per_record_slots": after,
+        "saving_pct": round(100.0 * (before - after) / before, 1),
+    }
+
+
+def _count_overlaps(bookings: list) -> int:
+    """Counts pairs of bookings that hold the same room for overlapping nights."""
+    by_room = {}
+    for booking in bookings:
+        by_room.setdefault(booking.get_room().get_room_number(), []).append(booking)
+    overlaps = 0
+    for stays in by_room.values():
+        stays.sort(key=Booking.get_check_in)
+        check_outs = []   # heap of the check-outs of earlier stays still running
+        for stay in stays:
+            while check_outs and check_outs[0] <= stay.get_check_in():
+                heapq.heappop(check_outs)
+            overlaps += len(check_outs)
+            heapq.heappush(check_outs, stay.get_check_out())
+    return overlaps
+
+
+def bench_double_booking(threads: int = 16, rooms: int = 20, requests: int = 20_000, seed: int = 7) -> dict:
+    """
+    Fires booking requests for a few hot rooms from many threads at once and checks
+    that no two confirmed bookings hold the same room for overlapping nights.
+    """
+    inventory = RoomInventory([Room(100 + i, "Suite", ["Wi-Fi"], 300.0) for i in range(rooms)])
+    engine = BookingEngine(inventory)
+    guest = Guest("Bench Guest", "bench@example.com", "555-0000")
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    work = [(100 + rng.randrange(rooms), start + timedelta(days=rng.randrange(60)), rng.randint(1, 5))
+            for _ in range(requests)]
+    confirmed = []
+    barrier = threading.Barrier(threads)
+
+    def worker(chunk):
+        mine = []
+        barrier.wait()
+        for room_number, check_in, nights in chunk:
+            booking = engine.try_book(guest, room_number, check_in, check_in + timedelta(days=nights))
+            if booking is not None:
+                mine.append(booking)
+        confirmed.extend(mine)
+
+    pool = [threading.Thread(target=worker, args=(work[i::threads],)) for i in range(threads)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # force frequent thread switches to provoke races
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            began = time.perf_counter()
+            for thread in pool:
+                thread.start()
+            for thread in pool:
+                thread.join()
+            elapsed = time.perf_counter() - began
+    finally:
+        sys.setswitchinterval(interval)
+    held = sum(len(room.get_schedule()) for room in inventory.get_availability_index().get_rooms())
+    return {
+        "threads": threads,
+        "requests": requests,
+        "confirmed": len(confirmed),
+        "double_bookings": _count_overlaps(confirmed),
+        "schedule_mismatch": held - len(confirmed),
+        "requests_per_sec": round(requests / elapsed),
+    }
+
+
+def bench_tier_evaluation(members: int = 200_000, changed: int = 2_000, seed: int = 11) -> dict:
+    """
+    Compares a full tier recalculation over every member with an incremental run
+    after a small share of members had new stays.
+    """
+    rng = random.Random(seed)
+    engine = TierEngine()
+    room = Room(101, "Suite", ["Wi-Fi"], 300.0)
+    guests = [Guest(f"Guest {i}", f"guest{i}@example.com", "555-0000",
+                    LoyaltyProgram(rng.randrange(12000))) for i in range(members)]
+    for guest in guests:
+        engine.register(guest)
+    engine.evaluate()
+
+    start = date(2025, 1, 1)
+    for i, guest in enumerate(rng.sample(guests, changed)):
+        booking = Booking(i, guest, room, start, start + timedelta(days=rng.randint(1, 30)))
+        engine.record_stay(Invoice(i, booking, rng.uniform(100.0, 9000.0)))
+
+    began = time.perf_counter()
+    incremental = engine.evaluate()
+    incremental_time = time.perf_counter() - began
+    began = time.perf_counter()
+    engine.evaluate_all()
+    full_time = time.perf_counter() - began
+    return {
+        "members": members,
+        "changed": changed,
+        "tier_changes": len(incremental),
+        "full_ms": round(full_time * 1000, 1),
+        "incremental_ms": round(incremental_time * 1000, 1),
+    }
+
+
+def _write_csv(path: str, header: list, rows) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def bench_import(rooms: int = 10_000, guests: int = 50_000, bookings: int = 200_000, seed: int = 3) -> dict:
+    """Generates CSV exports and measures import throughput into an in-memory BookingStore."""
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    types = [("Single", 120.0), ("Double", 200.0), ("Suite", 300.0)]
+    with tempfile.TemporaryDirectory() as folder:
+        rooms_csv = os.path.join(folder, "rooms.csv")
+        guests_csv = os.path.join(folder, "guests.csv")
+        bookings_csv = os.path.join(folder, "bookings.csv")
+        _write_csv(rooms_csv, ["room_number", "room_type", "amenities", "price_per_night"],
+                   ((1000 + i, types[i % 3][0], "Wi-Fi|TV", types[i % 3][1]) for i in range(rooms)))
+        _write_csv(guests_csv, ["name", "email", "phone", "loyalty_points", "loyalty_tier"],
+                   ((f"Guest {i}", f"guest{i}@example.com", f"555-{i:07d}", i % 5000, "Basic")
+                    for i in range(guests)))
+        # Stays are laid out back to back per room so confirmed bookings never overlap.
+        _write_csv(bookings_csv, ["booking_id", "guest_email", "room_number", "check_in", "check_out", "status"],
+                   ((i, f"guest{rng.randrange(guests)}@example.com", 1000 + i % rooms,
+                     (start + timedelta(days=3 * (i // rooms))).isoformat(),
+                     (start + timedelta(days=3 * (i // rooms) + 2)).isoformat(), "Confirmed")
+                    for i in range(bookings)))
+        store = BookingStore(":memory:")
+        importer = BulkImporter(store)
+        results = {}
+        for name, path, run in (("rooms", rooms_csv, importer.import_rooms),
+                                ("guests", guests_csv, importer.import_guests),
+                                ("bookings", bookings_csv, importer.import_bookings)):
+            stats = run(path)
+            results[f"{name}_rows_per_sec"] = stats["rows_per_sec"]
+            results[f"{name}_rejected"] = stats["rejected"]
+        store.close()
+    return results
+
+
+# Relative demand by month (January first) and weekday (Monday first) for synthetic stays.
+MONTH_DEMAND = (0.6, 0.6, 0.8, 0.9, 1.0, 1.4, 1.8, 1.8, 1.1, 0.9, 0.7, 1.3)
+WEEKDAY_DEMAND = (0.8, 0.8, 0.9, 1.0, 1.3, 1.4, 0.9)
+STAY_NIGHTS = (1, 2, 3, 4, 5, 7, 14)
+STAY_WEIGHTS = (20, 25, 20, 12, 8, 10, 5)
+ROOM_TYPES = (("Single", 120.0), ("Double", 200.0), ("Suite", 350.0))
+
+
+def synthesize(scale: int, seed: int = 42, year: int = 2025) -> dict:
+    """
+    Builds a reproducible workload of scale rooms, scale guests and scale booking
+    requests. Check-ins follow MONTH_DEMAND and WEEKDAY_DEMAND (summer and
+    December peaks, busier weekends) and stay lengths follow STAY_WEIGHTS, so
+    popular dates collide the way real demand does.
+    """
+    rng = random.Random(seed)
+    first = date(year, 1, 1)
+    days = [first + timedelta(days=i) for i in range(365)]
+    weights = [MONTH_DEMAND[day.month - 1] * WEEKDAY_DEMAND[day.weekday()] for day in days]
+    rooms = [Room(1000 + i, ROOM_TYPES[i % 3][0], ["Wi-Fi", "TV"], ROOM_TYPES[i % 3][1]) for i in range(scale)]
+    guests = [Guest(f"Guest {i}", f"guest{i}@example.com", f"555-{i:07d}",
+                    LoyaltyProgram(rng.randrange(5000))) for i in range(scale)]
+    check_ins = rng.choices(days, weights, k=scale)
+    nights = rng.choices(STAY_NIGHTS, STAY_WEIGHTS, k=scale)
+    bookings = [Booking(i, guests[rng.randrange(scale)], rooms[rng.randrange(scale)],
+                        check_in, check_in + timedelta(days=stay))
+                for i, (check_in, stay) in enumerate(zip(check_ins, nights))]
+    return {"rooms": rooms, "guests": guests, "bookings": bookings}
+
+
+def _timed(operation, items) -> dict:
+    """Runs operation on every item, timing each call; returns throughput and latency percentiles."""
+    latencies = []
+    failures = 0
+    clock = time.perf_counter_ns
+    began = clock()
+    for item in items:
+        start = clock()
+        try:
+            operation(item)
+        except ValueError:
+            failures += 1
+        latencies.append(clock() - start)
+    elapsed = (clock() - began) / 1e9
+    latencies.sort()
+    count = len(latencies)
+
+    def percentile(q):
+        return round(latencies[min(int(q * count), count - 1)] / 1000, 2) if count else 0.0
+    return {
+        "ops": count,
+        "failed": failures,
+        "seconds": round(elapsed, 4),
+        "ops_per_sec": round(count / elapsed) if elapsed else 0,
+        "p50_us": percentile(0.5),
+        "p95_us": percentile(0.95),
+        "p99_us": percentile(0.99),
+        "max_us": round(latencies[-1] / 1000, 2) if count else 0.0,
+    }
+
+
+def _peak_memory(operation, items) -> int:
+    """Returns the peak bytes allocated while running operation on every item."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for item in items:
+            try:
+                operation(item)
+            except ValueError:
+                pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _stages(scale: int, seed: int) -> dict:
+    """
+    Returns stage name -> setup function. Each setup builds a fresh workload and
+    returns (operation, items); results of an operation are kept in a list so
+    peak memory includes the objects a stage creates.
+    """
+    def room_creation():
+        created = []
+        return (lambda i: created.append(Room(i, ROOM_TYPES[i % 3][0], ["Wi-Fi"], ROOM_TYPES[i % 3][1])),
+                range(scale))
+
+    def booking_confirm():
+        return Booking.confirm_booking, synthesize(scale, seed)["bookings"]
+
+    def booking_cancel():
+        bookings = synthesize(scale, seed)["bookings"]
+        confirmed = []
+        for booking in bookings:
+            try:
+                booking.confirm_booking()
+                confirmed.append(booking)
+            except ValueError:
+                pass
+        return Booking.cancel_booking, confirmed
+
+    def invoice_generation():
+        invoices = []
+        bookings = synthesize(scale, seed)["bookings"]
+        return (lambda booking: invoices.append(Invoice(booking.get_booking_id(), booking).generate_invoice()),
+                bookings)
+
+    def payment_processing():
+        payments = [CreditCardPayment(i, 100.0 + i % 900, "Credit Card", f"4111{i:012d}", "12/28")
+                    for i in range(scale)]
+        return CreditCardPayment.process_payment, payments
+
+    def loyalty_accrual():
+        guests = synthesize(scale, seed)["guests"]
+        rng = random.Random(seed)
+        work = [(guest.get_loyalty_program(), rng.randint(50, 2000)) for guest in guests]
+        return lambda item: item[0].add_points(item[1]), work
+
+    return {
+        "room_creation": room_creation,
+        "booking_confirm": booking_confirm,
+        "booking_cancel": booking_cancel,
+        "invoice_generation": invoice_generation,
+        "payment_processing": payment_processing,
+        "loyalty_accrual": loyalty_accrual,
+    }
+
+
+def run_suite(scale: int = 10_000, seed: int = 42, stages: list = None, memory: bool = True) -> dict:
+    """
+    Runs the core workload stages at a given scale and returns machine-readable
+    results: throughput and latency percentiles per stage and, unless memory is
+    False, the peak bytes allocated by a second, untimed run of the stage.
+    Model events go to an EventLog without sinks while the suite runs, so
+    console output does not skew the timings.
+    """
+    available = _stages(scale, seed)
+    names = stages or list(available)
+    previous = set_event_log(EventLog([]))
+    results = {}
+    try:
+        for name in names:
+            operation, items = available[name]()
+            gc.collect()
+            results[name] = _timed(operation, items)
+            if memory:
+                operation, items = available[name]()
+                results[name]["peak_kib"] = round(_peak_memory(operation, items) / 1024)
+    finally:
+        set_event_log(previous)
+    return {
+        "suite": "royal-stay",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "seed": seed,
+        "stages": results,
+    }
+
+
+def compare(baseline: dict, current: dict) -> dict:
+    """
+    Compares two run_suite() results stage by stage: the ratio of current to
+    baseline throughput (below 1 is slower) and of p99 latency (above 1 is slower).
+    """
+    comparison = {}
+    for name, now in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if not before:
+            continue
+        comparison[name] = {
+            "throughput_ratio": round(now["ops_per_sec"] / before["ops_per_sec"], 3) if before["ops_per_sec"] else None,
+            "p99_ratio": round(now["p99_us"] / before["p99_us"], 3) if before["p99_us"] else None,
+        }
+    return comparison
+
+
+def _print_section(title: str, values: dict) -> None:
+    print(f"===== {title} =====")
+    for key, value in values.items():
+        print(f"{key}: {value}")
+
+
+def _focused_benchmarks():
+    _print_section("Memory: bytes per reservation record", bench_memory())
+    _print_section("Concurrency: booking confirmation stress", bench_double_booking())
+    _print_section("Loyalty: full vs incremental tier evaluation", bench_tier_evaluation())
+    _print_section("Import: streaming CSV throughput", bench_import())
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Royal Stay performance benchmarks.")
+    parser.add_argument("--scale", type=int, default=10_000, help="rooms, guests and bookings in the suite workload")
+    parser.add_argument("--seed", type=int, default=42, help="random seed of the suite workload")
+    parser.add_argument("--stages", nargs="*", choices=list(_stages(0, 0)),
+                        help="suite stages to run (default: all)")
+    parser.add_argument("--json", metavar="PATH", help="write the suite results to a JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare the suite results with an earlier JSON file")
+    parser.add_argument("--suite-only", action="store_true", help="skip the focused benchmarks")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs")
+    args = parser.parse_args(argv)
+
+    if not args.suite_only:
+        _focused_benchmarks()
+    results = run_suite(args.scale, args.seed, args.stages, memory=not args.no_memory)
+    for name, stage in results["stages"].items():
+        _print_section(f"Suite: {name} (scale {args.scale})", stage)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        for name, ratios in compare(baseline, results).items():
+            _print_section(f"Compare: {name}", ratios)
+
+
+if __name__ == "__main__":
+    main()
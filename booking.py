@@ -4,14 +4,38 @@ Defines the Booking class for the hotel management system.
 """
 
 from datetime import date
+from event_log import emit
 from guest import Guest
+from metrics import timer
 from room import Room
 
 class Booking:
     """
     The Booking class manages reservation details for a specific guest and room.
+    Listeners registered with add_listener() are called as listener(event, booking)
+    whenever a booking is "created", "confirmed" or "cancelled". "created" comes
+    from the code paths that make new bookings (see notify_created()), not from
+    the constructor, so loading or rebuilding a Booking notifies nobody.
     """
 
+    __slots__ = ("__booking_id", "__guest", "__room", "__check_in", "__check_out", "__status")
+
+    __listeners = []
+
+    @classmethod
+    def add_listener(cls, listener) -> None:
+        """Registers a callable to be notified of booking lifecycle events."""
+        cls.__listeners.append(listener)
+
+    @classmethod
+    def remove_listener(cls, listener) -> None:
+        """Unregisters a previously added listener."""
+        cls.__listeners.remove(listener)
+
+    def _notify(self, event: str) -> None:
+        for listener in Booking.__listeners:
+            listener(event, self)
+
     def __init__(self, booking_id: int, guest: Guest, room: Room,
                  check_in: date, check_out: date, status: str = "Pending"):
         """
@@ -31,21 +55,42 @@ class Booking:
         self.__check_out = check_out
         self.__status = status
 
+    def notify_created(self) -> None:
+        """
+        Tells listeners that this booking was newly made. Called by the code that
+        creates bookings (e.g. BookingEngine, RoomAllocator), never by loads.
+        """
+        self._notify("created")
+
     def confirm_booking(self) -> None:
         """
-        Confirms the booking and marks the room as unavailable.
+        Confirms the booking and reserves the room for the stay.
+
+        :raises ValueError: If the room is not available for the booked dates.
         """
-        self.__status = "Confirmed"
-        self.__room.set_availability(False)
-        print(f"Booking {self.__booking_id} confirmed for {self.__guest.get_name()}.")
+        with timer("booking.confirm"):
+            with self.__room.get_lock():
+                if self.__status == "Confirmed":
+                    return
+                self.__room.reserve(self.__check_in, self.__check_out, self.__booking_id)
+                self.__status = "Confirmed"
+            self._notify("confirmed")
+        emit("booking.confirmed", "Booking {booking_id} confirmed for {guest}.",
+             booking_id=self.__booking_id, guest=self.__guest.get_name(), room_number=self.__room.get_room_number())
 
     def cancel_booking(self) -> None:
         """
         Cancels the booking and frees up the room (if it was confirmed).
         """
-        self.__status = "Cancelled"
-        self.__room.set_availability(True)
-        print(f"Booking {self.__booking_id} cancelled.")
+        with self.__room.get_lock():
+            was_confirmed = self.__status == "Confirmed"
+            if was_confirmed:
+                self.__room.release(self.__check_in, self.__booking_id)
+            self.__status = "Cancelled"
+        if was_confirmed:
+            self._notify("cancelled")
+        emit("booking.cancelled", "Booking {booking_id} cancelled.",
+             booking_id=self.__booking_id, released=was_confirmed)
 
     # Getters and Setters
     def get_booking_id(self) -> int:
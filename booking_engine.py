@@ -0,0 +1,73 @@
+"""
+booking_engine.py
+Defines the BookingEngine class for taking bookings safely from many threads.
+"""
+
+import itertools
+from datetime import date
+from booking import Booking
+from guest import Guest
+from room_inventory import RoomInventory
+
+class BookingEngine:
+    """
+    The BookingEngine class creates and confirms bookings against a RoomInventory.
+    Confirmation relies on the per-room lock of each RoomSchedule, so requests for
+    different rooms proceed in parallel and two requests for overlapping dates on
+    the same room can never both succeed. There is no engine-wide lock.
+    """
+
+    __slots__ = ("__inventory", "__booking_ids")
+
+    def __init__(self, inventory: RoomInventory, first_booking_id: int = 1):
+        """
+        Initializes a new BookingEngine.
+
+        :param inventory: The RoomInventory holding the bookable rooms.
+        :param first_booking_id: The ID given to the first booking created by the engine.
+        """
+        self.__inventory = inventory
+        self.__booking_ids = itertools.count(first_booking_id)
+
+    def book(self, guest: Guest, room_number: int, check_in: date, check_out: date) -> Booking:
+        """
+        Books a specific room and confirms the booking.
+
+        :raises KeyError: If the room is not in the inventory.
+        :raises ValueError: If the room is not available for those dates.
+        """
+        room = self.__inventory.get_room(room_number)
+        if room is None:
+            raise KeyError(f"Room {room_number} is not in the inventory.")
+        booking = Booking(next(self.__booking_ids), guest, room, check_in, check_out)
+        booking.confirm_booking()
+        booking.notify_created()
+        return booking
+
+    def try_book(self, guest: Guest, room_number: int, check_in: date, check_out: date) -> Booking:
+        """Books a specific room, returning None instead of raising if it is taken."""
+        try:
+            return self.book(guest, room_number, check_in, check_out)
+        except ValueError:
+            return None
+
+    def book_any(self, guest: Guest, check_in: date, check_out: date, room_type: str = None,
+                 amenities: list = None, max_price: float = None) -> Booking:
+        """
+        Books the cheapest room matching the filters. If another thread takes a
+        candidate between the search and the confirmation, the next one is tried.
+
+        :return: The confirmed Booking, or None if no matching room is free.
+        """
+        for room in self.__inventory.search(check_in, check_out, room_type, amenities, max_price):
+            booking = self.try_book(guest, room.get_room_number(), check_in, check_out)
+            if booking is not None:
+                return booking
+        return None
+
+    def cancel(self, booking: Booking) -> None:
+        """Cancels a booking and releases its room."""
+        booking.cancel_booking()
+
+    def __str__(self) -> str:
+        return f"BookingEngine over {self.__inventory}"
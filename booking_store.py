@@ -0,0 +1,370 @@
+"""
+booking_store.py
+Defines the BookingStore class, the SQLite persistence layer of the hotel management system.
+"""
+
+import itertools
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+from booking import Booking
+from credit_card_payment import CreditCardPayment
+from guest import Guest
+from invoice import Invoice
+from loyalty_program import LoyaltyProgram
+from payment import Payment
+from room import Room
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    room_number     INTEGER PRIMARY KEY,
+    room_type       TEXT NOT NULL,
+    amenities       TEXT NOT NULL,
+    price_per_night REAL NOT NULL,
+    is_available    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS guests (
+    email          TEXT PRIMARY KEY,
+    name           TEXT NOT NULL,
+    phone          TEXT NOT NULL,
+    loyalty_points INTEGER,
+    loyalty_tier   TEXT
+);
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id  INTEGER PRIMARY KEY,
+    guest_email TEXT NOT NULL REFERENCES guests(email),
+    room_number INTEGER NOT NULL REFERENCES rooms(room_number),
+    check_in    TEXT NOT NULL,
+    check_out   TEXT NOT NULL,
+    status      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_room ON bookings(room_number, check_in);
+CREATE INDEX IF NOT EXISTS idx_bookings_guest ON bookings(guest_email, check_in);
+CREATE INDEX IF NOT EXISTS idx_bookings_dates ON bookings(check_in, check_out);
+CREATE INDEX IF NOT EXISTS idx_bookings_status ON bookings(status);
+CREATE TABLE IF NOT EXISTS invoices (
+    invoice_id INTEGER PRIMARY KEY,
+    booking_id INTEGER NOT NULL REFERENCES bookings(booking_id),
+    total      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_invoices_booking ON invoices(booking_id);
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id  INTEGER PRIMARY KEY,
+    amount      REAL NOT NULL,
+    method      TEXT NOT NULL,
+    card_number TEXT,
+    expiry_date TEXT,
+    status      TEXT NOT NULL
+);
+"""
+
+_AMENITY_SEPARATOR = "|"
+
+class BookingStore:
+    """
+    The BookingStore class maps rooms, guests, bookings, invoices and payments to
+    SQLite tables. Writes go through one connection in batched executemany()
+    transactions; reads borrow connections from a small pool so concurrent
+    readers do not block each other, and queries yield objects one row at a
+    time instead of loading the whole history at startup. Streaming queries read
+    READ_CHUNK rows at a time and hand their connection back between chunks, so
+    a caller may start other reads while iterating.
+    """
+
+    __slots__ = ("__path", "__writer", "__write_lock", "__readers", "__batch_size")
+
+    _memory_ids = itertools.count()
+
+    # Rows fetched per borrowed connection when streaming query results.
+    READ_CHUNK = 1000
+
+    def __init__(self, path: str = "royal_stay.db", readers: int = 4, batch_size: int = 5000):
+        """
+        Opens (and if needed creates) a BookingStore.
+
+        :param path: The SQLite database file, or ":memory:" for a private in-memory database.
+        :param readers: The number of pooled read connections.
+        :param batch_size: The number of rows sent per executemany() call on bulk saves.
+        """
+        if path == ":memory:":
+            # A shared-cache URI lets the pooled connections see the same in-memory database.
+            path = f"file:royal_stay_{next(BookingStore._memory_ids)}?mode=memory&cache=shared"
+        self.__path = path
+        self.__batch_size = batch_size
+        self.__write_lock = threading.Lock()
+        self.__writer = self._connect()
+        if not path.startswith("file:"):
+            self.__writer.execute("PRAGMA journal_mode=WAL")
+        self.__writer.executescript(_SCHEMA)
+        self.__readers = queue.Queue()
+        for _ in range(readers):
+            self.__readers.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.__path, uri=self.__path.startswith("file:"), check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """
+        Borrows a read connection from the pool for the duration of a with-block.
+        When every pooled connection is in use, a temporary connection is opened
+        (and closed afterwards) instead of waiting, so nested reads cannot deadlock.
+        """
+        try:
+            conn, pooled = self.__readers.get_nowait(), True
+        except queue.Empty:
+            conn, pooled = self._connect(), False
+        try:
+            yield conn
+        finally:
+            if pooled:
+                self.__readers.put(conn)
+            else:
+                conn.close()
+
+    def _write_many(self, sql: str, rows) -> int:
+        """Inserts rows in batches of batch_size inside one transaction and returns the row count."""
+        count = 0
+        with self.__write_lock, self.__writer:
+            iterator = iter(rows)
+            while True:
+                batch = list(itertools.islice(iterator, self.__batch_size))
+                if not batch:
+                    return count
+                self.__writer.executemany(sql, batch)
+                count += len(batch)
+
+    def _query(self, sql: str, params: tuple, start):
+        """
+        Yields the rows of a keyset query READ_CHUNK rows at a time, borrowing a
+        connection per chunk. The query must be ordered by its first column, a
+        unique key, and take the key to resume after and the chunk size as its
+        last two parameters; the first chunk resumes after start.
+        """
+        position = start
+        while True:
+            with self.reader() as conn:
+                rows = conn.execute(sql, params + (position, self.READ_CHUNK)).fetchall()
+            yield from rows
+            if len(rows) < self.READ_CHUNK:
+                return
+            position = rows[-1][0]
+
+    def _query_one(self, sql: str, params: tuple = ()):
+        """Returns the first row of a query, or None."""
+        with self.reader() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    # Bulk saves
+    def save_rooms(self, rooms) -> int:
+        """Inserts or replaces rooms; returns the number of rows written."""
+        return self._write_many(
+            "INSERT OR REPLACE INTO rooms VALUES (?, ?, ?, ?, ?)",
+            ((room.get_room_number(), room.get_room_type(), _AMENITY_SEPARATOR.join(room.get_amenities()),
+              room.get_price_per_night(), int(room.is_available())) for room in rooms),
+        )
+
+    def save_guests(self, guests) -> int:
+        """Inserts or replaces guests (keyed on email); returns the number of rows written."""
+        def row(guest):
+            loyalty = guest.get_loyalty_program()
+            points = loyalty.get_points() if loyalty else None
+            tier = loyalty.get_tier() if loyalty else None
+            return guest.get_email(), guest.get_name(), guest.get_phone(), points, tier
+        return self._write_many("INSERT OR REPLACE INTO guests VALUES (?, ?, ?, ?, ?)", map(row, guests))
+
+    def save_bookings(self, bookings) -> int:
+        """Inserts or replaces bookings; returns the number of rows written."""
+        return self._write_many(
+            "INSERT OR REPLACE INTO bookings VALUES (?, ?, ?, ?, ?, ?)",
+            ((booking.get_booking_id(), booking.get_guest().get_email(), booking.get_room().get_room_number(),
+              booking.get_check_in().isoformat(), booking.get_check_out().isoformat(), booking.get_status())
+             for booking in bookings),
+        )
+
+    def save_invoices(self, invoices) -> int:
+        """Inserts or replaces invoices; returns the number of rows written."""
+        return self._write_many(
+            "INSERT OR REPLACE INTO invoices VALUES (?, ?, ?)",
+            ((invoice.get_invoice_id(), invoice.get_booking().get_booking_id(), invoice.get_total())
+             for invoice in invoices),
+        )
+
+    def save_payments(self, payments) -> int:
+        """
+        Inserts or replaces payments; returns the number of rows written.
+        Only the last four digits of a card number are stored.
+        """
+        def row(payment):
+            card = expiry = None
+            if isinstance(payment, CreditCardPayment):
+                card = "*" * 12 + payment.get_card_number()[-4:]
+                expiry = payment.get_expiry_date()
+            return (payment.get_payment_id(), payment.get_amount(), payment.get_method(), card, expiry,
+                    payment.get_status())
+        return self._write_many("INSERT OR REPLACE INTO payments VALUES (?, ?, ?, ?, ?, ?)", map(row, payments))
+
+    def update_booking_status(self, booking_id: int, status: str) -> bool:
+        """
+        Updates the stored status of a single booking.
+
+        :return: False if the booking is not stored.
+        """
+        with self.__write_lock, self.__writer:
+            cursor = self.__writer.execute("UPDATE bookings SET status = ? WHERE booking_id = ?",
+                                           (status, booking_id))
+            return cursor.rowcount > 0
+
+    def on_booking_event(self, event: str, booking: Booking) -> None:
+        """
+        Booking listener that persists status changes; register it with
+        Booking.add_listener(store.on_booking_event). A booking that was never
+        saved is inserted.
+        """
+        if event in ("confirmed", "cancelled"):
+            if not self.update_booking_status(booking.get_booking_id(), booking.get_status()):
+                self.save_bookings([booking])
+
+    # Loading
+    @staticmethod
+    def _room_from_row(row) -> Room:
+        number, room_type, amenities, price, available = row
+        return Room(number, room_type, amenities.split(_AMENITY_SEPARATOR) if amenities else [],
+                    price, bool(available))
+
+    @staticmethod
+    def _guest_from_row(row) -> Guest:
+        email, name, phone, points, tier = row
+        loyalty = LoyaltyProgram(points, tier) if tier is not None else None
+        return Guest(name, email, phone, loyalty)
+
+    def _load_room(self, conn: sqlite3.Connection, room_number: int, with_schedule: bool) -> Room:
+        row = conn.execute("SELECT * FROM rooms WHERE room_number = ?", (room_number,)).fetchone()
+        if row is None:
+            return None
+        room = self._room_from_row(row)
+        if with_schedule:
+            schedule = room.get_schedule()
+            for booking_id, check_in, check_out in conn.execute(
+                    "SELECT booking_id, check_in, check_out FROM bookings "
+                    "WHERE room_number = ? AND status = 'Confirmed'", (room_number,)):
+                schedule.reserve(date.fromisoformat(check_in), date.fromisoformat(check_out), booking_id)
+        return room
+
+    def _load_guest(self, conn: sqlite3.Connection, email: str) -> Guest:
+        row = conn.execute("SELECT * FROM guests WHERE email = ?", (email,)).fetchone()
+        return self._guest_from_row(row) if row else None
+
+    def load_room(self, room_number: int, with_schedule: bool = True) -> Room:
+        """
+        Loads a room, or returns None if it is not stored. With with_schedule, the
+        room's confirmed bookings are replayed into its RoomSchedule.
+        """
+        with self.reader() as conn:
+            return self._load_room(conn, room_number, with_schedule)
+
+    def load_guest(self, email: str) -> Guest:
+        """Loads a guest by email, or returns None if it is not stored."""
+        with self.reader() as conn:
+            return self._load_guest(conn, email)
+
+    def iter_rooms(self):
+        """Yields every stored room (without its schedule), ordered by room number."""
+        for row in self._query("SELECT * FROM rooms WHERE room_number > ? ORDER BY room_number LIMIT ?",
+                               (), float("-inf")):
+            yield self._room_from_row(row)
+
+    def _iter_bookings(self, where: str, params: tuple):
+        """
+        Yields Booking objects for the rows matching a WHERE clause. Rooms and guests
+        are loaded once per query and shared between the bookings that reference them.
+        """
+        rooms = {}
+        guests = {}
+        first = f"SELECT * FROM bookings WHERE {where} ORDER BY check_in, booking_id LIMIT ?"
+        after = (f"SELECT * FROM bookings WHERE ({where}) AND (check_in, booking_id) > (?, ?) "
+                 f"ORDER BY check_in, booking_id LIMIT ?")
+        position = None
+        while True:
+            # Each chunk resumes after the last row of the previous one, on whichever connection is free.
+            with self.reader() as conn:
+                if position is None:
+                    rows = conn.execute(first, params + (self.READ_CHUNK,)).fetchall()
+                else:
+                    rows = conn.execute(after, params + position + (self.READ_CHUNK,)).fetchall()
+                for _, email, room_number, _, _, _ in rows:
+                    if room_number not in rooms:
+                        rooms[room_number] = self._load_room(conn, room_number, with_schedule=False)
+                    if email not in guests:
+                        guests[email] = self._load_guest(conn, email)
+            for booking_id, email, room_number, check_in, check_out, status in rows:
+                yield Booking(booking_id, guests[email], rooms[room_number], date.fromisoformat(check_in),
+                              date.fromisoformat(check_out), status)
+            if len(rows) < self.READ_CHUNK:
+                return
+            position = (rows[-1][3], rows[-1][0])
+
+    def has_booking(self, booking_id: int) -> bool:
+        """Returns True if a booking with the given ID is stored."""
+        return self._query_one("SELECT 1 FROM bookings WHERE booking_id = ?", (booking_id,)) is not None
+
+    def load_booking(self, booking_id: int) -> Booking:
+        """Loads a booking by ID, or returns None if it is not stored."""
+        return next(self._iter_bookings("booking_id = ?", (booking_id,)), None)
+
+    def bookings_for_room(self, room_number: int):
+        """Yields the bookings of a room ordered by check-in date."""
+        return self._iter_bookings("room_number = ?", (room_number,))
+
+    def bookings_for_guest(self, email: str):
+        """Yields the bookings of a guest ordered by check-in date."""
+        return self._iter_bookings("guest_email = ?", (email,))
+
+    def bookings_by_status(self, status: str):
+        """Yields the bookings with the given status ordered by check-in date."""
+        return self._iter_bookings("status = ?", (status,))
+
+    def bookings_between(self, start: date, end: date):
+        """Yields the bookings whose stay overlaps [start, end), ordered by check-in date."""
+        return self._iter_bookings("check_in < ? AND check_out > ?", (end.isoformat(), start.isoformat()))
+
+    def iter_invoices(self, booking: Booking):
+        """Yields the invoices stored for a booking."""
+        for invoice_id, _, total in self._query(
+                "SELECT * FROM invoices WHERE booking_id = ? AND invoice_id > ? ORDER BY invoice_id LIMIT ?",
+                (booking.get_booking_id(),), float("-inf")):
+            yield Invoice(invoice_id, booking, total)
+
+    def load_payment(self, payment_id: int) -> Payment:
+        """
+        Loads a payment by ID, or returns None. Card payments come back as a
+        CreditCardPayment carrying the masked card number.
+        """
+        row = self._query_one("SELECT * FROM payments WHERE payment_id = ?", (payment_id,))
+        if row is None:
+            return None
+        payment_id, amount, method, card, expiry, status = row
+        if card is None:
+            return Payment(payment_id, amount, method, status)
+        payment = CreditCardPayment(payment_id, amount, method, card, expiry)
+        payment.set_status(status)
+        return payment
+
+    def count_bookings(self, status: str = None) -> int:
+        """Returns the number of stored bookings, optionally only those with a given status."""
+        if status is None:
+            return self._query_one("SELECT COUNT(*) FROM bookings")[0]
+        return self._query_one("SELECT COUNT(*) FROM bookings WHERE status = ?", (status,))[0]
+
+    def close(self) -> None:
+        """Closes every connection of the store."""
+        self.__writer.close()
+        while not self.__readers.empty():
+            self.__readers.get().close()
+
+    def __str__(self) -> str:
+        return f"BookingStore at {self.__path}"
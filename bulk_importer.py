@@ -0,0 +1,219 @@
+"""
+bulk_importer.py
+Defines the BulkImporter class for loading rooms, guests and bookings from CSV or JSONL exports.
+"""
+
+import csv
+import itertools
+import json
+import time
+from datetime import date
+from booking import Booking
+from booking_store import BookingStore
+from guest import Guest
+from guest_directory import GuestDirectory
+from loyalty_program import LoyaltyProgram
+from room import Room
+
+def read_rows(path: str):
+    """
+    Yields the records of a .csv or .jsonl file one at a time as (line number, record)
+    pairs. CSV records are dicts; JSONL records are the raw line, decoded by the caller
+    so that a malformed line can be rejected on its own.
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.endswith(".jsonl"):
+            for number, line in enumerate(handle, start=1):
+                if line.strip():
+                    yield number, line
+        else:
+            for number, row in enumerate(csv.DictReader(handle), start=2):
+                yield number, row
+
+
+class BulkImporter:
+    """
+    The BulkImporter class streams export files into a BookingStore. Each file is
+    read row by row through a generator pipeline (read -> validate -> build
+    objects -> batched save), so memory does not grow with the number of
+    bookings: it holds one batch plus every distinct room and guest seen, which
+    stay cached (the guests in the GuestDirectory) so that bookings share them
+    and overlapping stays are detected. Invalid rows are skipped and reported
+    instead of aborting the import, and bookings already in the store are
+    skipped, so importing the same file twice is harmless.
+    """
+
+    MAX_REPORTED_ERRORS = 100
+
+    def __init__(self, store: BookingStore, directory: GuestDirectory = None, batch_size: int = 5000):
+        """
+        Initializes a new BulkImporter.
+
+        :param store: The BookingStore that imported objects are saved to.
+        :param directory: The GuestDirectory used to dedupe and resolve guests.
+        :param batch_size: The number of objects committed to the store per transaction.
+        """
+        self.__store = store
+        self.__directory = directory if directory is not None else GuestDirectory()
+        self.__batch_size = batch_size
+        self.__rooms = {}
+        self.__errors = []
+        self.__error_count = 0
+
+    def _error(self, path: str, line: int, message: str) -> None:
+        self.__error_count += 1
+        if len(self.__errors) < self.MAX_REPORTED_ERRORS:
+            self.__errors.append(f"{path}:{line}: {message}")
+
+    def _valid(self, path: str, parse, stats: dict):
+        """
+        Yields parse(row) for every row of a file, recording rows that fail validation.
+        A row parsed to None is already imported and counted as skipped.
+        """
+        for line, row in read_rows(path):
+            stats["rows"] += 1
+            try:
+                record = json.loads(row) if isinstance(row, str) else row
+                if not isinstance(record, dict):
+                    raise ValueError(f"expected an object, got {type(record).__name__}")
+                parsed = parse(record)
+            except (KeyError, TypeError, ValueError) as error:
+                stats["rejected"] += 1
+                self._error(path, line, f"{type(error).__name__}: {error}")
+                continue
+            if parsed is None:
+                stats["skipped"] += 1
+            else:
+                yield parsed
+
+    def _run(self, path: str, parse, save) -> dict:
+        """Streams one file through parse and saves the results in batched transactions."""
+        stats = {"file": path, "rows": 0, "imported": 0, "rejected": 0, "skipped": 0}
+        began = time.perf_counter()
+        objects = self._valid(path, parse, stats)
+        while True:
+            batch = list(itertools.islice(objects, self.__batch_size))
+            if not batch:
+                break
+            stats["imported"] += save(batch)
+        elapsed = time.perf_counter() - began
+        stats["seconds"] = round(elapsed, 3)
+        stats["rows_per_sec"] = round(stats["rows"] / elapsed) if elapsed else 0
+        return stats
+
+    # Row parsers
+    @staticmethod
+    def _required(row: dict, field: str) -> str:
+        """Returns a required text field trimmed; short CSV rows and JSON nulls are rejected."""
+        value = row[field]
+        if value is None:
+            raise ValueError(f"missing {field}")
+        return str(value).strip()
+
+    def _parse_room(self, row: dict) -> Room:
+        amenities = row.get("amenities") or []
+        if isinstance(amenities, str):
+            amenities = [item.strip() for item in amenities.split("|") if item.strip()]
+        price = float(row["price_per_night"])
+        if price < 0:
+            raise ValueError(f"negative price {price}")
+        available = str(row.get("is_available", "true")).strip().lower() not in ("0", "false", "no")
+        room = Room(int(row["room_number"]), self._required(row, "room_type"), amenities, price, available)
+        self.__rooms[room.get_room_number()] = room
+        return room
+
+    def _parse_guest(self, row: dict) -> tuple:
+        """Returns (directory guest, whether the row added a new guest rather than merging)."""
+        email = self._required(row, "email")
+        if "@" not in email:
+            raise ValueError(f"invalid email {email!r}")
+        loyalty = None
+        if row.get("loyalty_tier"):
+            loyalty = LoyaltyProgram(int(row.get("loyalty_points") or 0), row["loyalty_tier"])
+        guest = Guest(self._required(row, "name"), email, row.get("phone") or "", loyalty)
+        interned = self.__directory.intern(guest)
+        return interned, interned is guest
+
+    def _resolve_room(self, room_number: int) -> Room:
+        room = self.__rooms.get(room_number)
+        if room is None:
+            room = self.__store.load_room(room_number)
+            if room is None:
+                raise ValueError(f"unknown room {room_number}")
+            self.__rooms[room_number] = room
+        return room
+
+    def _resolve_guest(self, email: str) -> Guest:
+        guest = self.__directory.find_by_email(email)
+        if guest is None:
+            guest = self.__store.load_guest(email)
+            if guest is None:
+                raise ValueError(f"unknown guest {email!r}")
+            guest = self.__directory.intern(guest)
+        return guest
+
+    def _parse_booking(self, row: dict) -> Booking:
+        """Returns the row's Booking, or None if a booking with its ID is already stored."""
+        booking_id = int(row["booking_id"])
+        if self.__store.has_booking(booking_id):
+            return None
+        check_in = date.fromisoformat(row["check_in"])
+        check_out = date.fromisoformat(row["check_out"])
+        if check_out <= check_in:
+            raise ValueError(f"check-out {check_out} is not after check-in {check_in}")
+        room = self._resolve_room(int(row["room_number"]))
+        guest = self._resolve_guest(self._required(row, "guest_email"))
+        status = row.get("status") or "Pending"
+        booking = Booking(booking_id, guest, room, check_in, check_out, status)
+        if status == "Confirmed":
+            # Replaying the stay into the room schedule rejects double-booked exports.
+            room.get_schedule().reserve(check_in, check_out, booking.get_booking_id())
+        return booking
+
+    # Batch savers
+    def _save_guests(self, batch: list) -> int:
+        """Saves each distinct guest of a batch once; returns the number of new guests."""
+        self.__store.save_guests({id(guest): guest for guest, _ in batch}.values())
+        return sum(added for _, added in batch)
+
+    def _save_bookings(self, batch: list) -> int:
+        """Saves a batch of bookings, releasing their replayed reservations if the save fails."""
+        try:
+            return self.__store.save_bookings(batch)
+        except Exception:
+            for booking in batch:
+                if booking.get_status() == "Confirmed":
+                    booking.get_room().get_schedule().release(booking.get_check_in(), booking.get_booking_id())
+            raise
+
+    # Public entry points
+    def import_rooms(self, path: str) -> dict:
+        """Imports rooms (room_number, room_type, amenities, price_per_night[, is_available])."""
+        return self._run(path, self._parse_room, self.__store.save_rooms)
+
+    def import_guests(self, path: str) -> dict:
+        """
+        Imports guests (name, email, phone[, loyalty_points, loyalty_tier]), merging duplicates.
+        Rows merged into an already known guest are counted as "merged", not "imported".
+        """
+        stats = self._run(path, self._parse_guest, self._save_guests)
+        stats["merged"] = stats["rows"] - stats["rejected"] - stats["imported"]
+        return stats
+
+    def import_bookings(self, path: str) -> dict:
+        """
+        Imports bookings (booking_id, guest_email, room_number, check_in, check_out[, status]).
+        Rooms and guests must already be imported or stored; rows whose booking ID is
+        already stored are counted as "skipped".
+        """
+        return self._run(path, self._parse_booking, self._save_bookings)
+
+    def get_errors(self) -> list:
+        """Returns the first MAX_REPORTED_ERRORS rejected rows as "file:line: message" strings."""
+        return list(self.__errors)
+
+    def get_error_count(self) -> int:
+        return self.__error_count
+
+    def __str__(self) -> str:
+        return f"BulkImporter into {self.__store} ({self.__error_count} rejected row(s))"
@@ -0,0 +1,296 @@
+"""
+columnar_export.py
+Defines a chunked, memory-mappable columnar file format for exporting bookings,
+invoices and payments, with the ColumnarWriter and ColumnarReader classes.
+
+File layout (buffers in the writer's native byte order, each 8-byte aligned):
+    magic "RSCOL001"
+    chunk*      for each column: its data buffer (and for strings, an int64 offsets buffer first)
+    footer      UTF-8 JSON: schema, byte order and the offset/length of every buffer
+    trailer     little-endian uint64 footer length, then magic "RSCOL001"
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import date
+from credit_card_payment import CreditCardPayment
+
+MAGIC = b"RSCOL001"
+
+# Column kind -> array typecode of its data buffer.
+_TYPECODES = {"int": "q", "float": "d", "date": "i", "str": "B"}
+
+class ColumnarWriter:
+    """
+    The ColumnarWriter class writes rows to a columnar file one chunk at a time.
+    Only the current chunk is held in memory, as typed arrays, so exporting
+    millions of rows runs in constant memory. Used as a context manager, the
+    file is deleted instead of finished if the with-block raises, so a
+    truncated export can never be opened as a complete one.
+    """
+
+    def __init__(self, path: str, schema: list, chunk_size: int = 65536):
+        """
+        Opens a new columnar file for writing.
+
+        :param path: The output file path.
+        :param schema: A list of (column name, kind) pairs; kind is "int", "float", "date" or "str".
+        :param chunk_size: The number of rows per chunk.
+        """
+        for name, kind in schema:
+            if kind not in _TYPECODES:
+                raise ValueError(f"Unknown column kind {kind!r} for {name!r}.")
+        self.__schema = list(schema)
+        self.__chunk_size = chunk_size
+        self.__path = path
+        self.__handle = open(path, "wb")
+        self.__handle.write(MAGIC)
+        self.__chunks = []
+        self.__rows = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.__buffers = []
+        for _, kind in self.__schema:
+            if kind == "str":
+                self.__buffers.append((array("q", [0]), bytearray()))
+            else:
+                self.__buffers.append(array(_TYPECODES[kind]))
+        self.__pending = 0
+
+    def _write_buffer(self, data) -> list:
+        """Writes one buffer at an 8-byte aligned offset and returns [offset, length]."""
+        offset = self.__handle.tell()
+        padding = -offset % 8
+        if padding:
+            self.__handle.write(b"\0" * padding)
+            offset += padding
+        raw = data.tobytes() if isinstance(data, array) else bytes(data)
+        self.__handle.write(raw)
+        return [offset, len(raw)]
+
+    def write_row(self, row: tuple) -> None:
+        """
+        Appends one row; values must follow the schema order. A row with a bad
+        value is not written at all, so the columns always stay the same length.
+
+        :raises ValueError: If the row does not have one value per column.
+        """
+        if len(row) != len(self.__schema):
+            raise ValueError(f"Expected {len(self.__schema)} values, got {len(row)}.")
+        written = 0
+        try:
+            for (_, kind), buffer, value in zip(self.__schema, self.__buffers, row):
+                if kind == "str":
+                    offsets, blob = buffer
+                    blob += (value or "").encode("utf-8")
+                    offsets.append(len(blob))
+                elif kind == "date":
+                    buffer.append(value.toordinal())
+                else:
+                    buffer.append(value)
+                written += 1
+        except Exception:
+            self._unwrite(written)
+            raise
+        self.__pending += 1
+        if self.__pending >= self.__chunk_size:
+            self.flush()
+
+    def _unwrite(self, columns: int) -> None:
+        """Removes the value of the pending row from the first columns buffers."""
+        for buffer in self.__buffers[:columns]:
+            if isinstance(buffer, tuple):
+                offsets, blob = buffer
+                offsets.pop()
+                del blob[offsets[-1]:]
+            else:
+                buffer.pop()
+
+    def write_rows(self, rows) -> int:
+        """Appends every row of an iterable; returns the number of rows written."""
+        count = 0
+        for row in rows:
+            self.write_row(row)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """Writes the pending rows as one chunk."""
+        if not self.__pending:
+            return
+        columns = []
+        for (_, kind), buffer in zip(self.__schema, self.__buffers):
+            if kind == "str":
+                columns.append(self._write_buffer(buffer[0]) + self._write_buffer(buffer[1]))
+            else:
+                columns.append(self._write_buffer(buffer))
+        self.__chunks.append({"rows": self.__pending, "columns": columns})
+        self.__rows += self.__pending
+        self._reset()
+
+    def close(self) -> int:
+        """Flushes the last chunk, writes the footer and returns the total number of rows."""
+        self.flush()
+        footer = json.dumps({
+            "schema": self.__schema,
+            "byteorder": sys.byteorder,
+            "rows": self.__rows,
+            "chunks": self.__chunks,
+        }).encode("utf-8")
+        self.__handle.write(footer)
+        self.__handle.write(struct.pack("<Q", len(footer)))
+        self.__handle.write(MAGIC)
+        self.__handle.close()
+        return self.__rows
+
+    def abort(self) -> None:
+        """Closes the file without a footer and deletes it."""
+        self.__handle.close()
+        os.remove(self.__path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class ColumnarReader:
+    """
+    The ColumnarReader class memory-maps a columnar file and exposes each numeric
+    column chunk as a typed memoryview over the mapping, so reading a column
+    copies nothing; strings are decoded only when asked for.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens a columnar file for reading.
+
+        :raises ValueError: If the file is not a columnar export.
+        """
+        self.__handle = open(path, "rb")
+        try:
+            self.__map = mmap.mmap(self.__handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.__handle.close()
+            raise
+        try:
+            footer = self._footer(path)
+        except BaseException:
+            self.__map.close()
+            self.__handle.close()
+            raise
+        self.__schema = [tuple(column) for column in footer["schema"]]
+        self.__positions = {name: i for i, (name, _) in enumerate(self.__schema)}
+        self.__chunks = footer["chunks"]
+        self.__rows = footer["rows"]
+        self.__view = memoryview(self.__map)
+
+    def _footer(self, path: str) -> dict:
+        """Checks the magic and byte order of the mapped file and returns its footer."""
+        size = len(self.__map)
+        if size < 24 or self.__map[:8] != MAGIC or self.__map[size - 8:] != MAGIC:
+            raise ValueError(f"{path} is not a columnar export.")
+        (footer_length,) = struct.unpack("<Q", self.__map[size - 16:size - 8])
+        footer = json.loads(self.__map[size - 16 - footer_length:size - 16].decode("utf-8"))
+        if footer["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {footer['byteorder']}-endian machine.")
+        return footer
+
+    def _buffer(self, offset: int, length: int, typecode: str) -> memoryview:
+        return self.__view[offset:offset + length].cast(typecode)
+
+    def get_schema(self) -> list:
+        return list(self.__schema)
+
+    def get_row_count(self) -> int:
+        return self.__rows
+
+    def get_chunk_count(self) -> int:
+        return len(self.__chunks)
+
+    def column_chunk(self, name: str, chunk: int):
+        """
+        Returns one chunk of a column: a zero-copy memoryview for numeric and date
+        (ordinal) columns, or an (offsets, bytes) pair of memoryviews for strings.
+        """
+        position = self.__positions[name]
+        kind = self.__schema[position][1]
+        spec = self.__chunks[chunk]["columns"][position]
+        if kind == "str":
+            return self._buffer(spec[0], spec[1], "q"), self.__view[spec[2]:spec[2] + spec[3]]
+        return self._buffer(spec[0], spec[1], _TYPECODES[kind])
+
+    def column(self, name: str):
+        """Yields every value of a column, decoding strings and dates."""
+        kind = self.__schema[self.__positions[name]][1]
+        for chunk in range(len(self.__chunks)):
+            data = self.column_chunk(name, chunk)
+            if kind == "str":
+                offsets, blob = data
+                for i in range(len(offsets) - 1):
+                    yield bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
+            elif kind == "date":
+                yield from map(date.fromordinal, data)
+            else:
+                yield from data
+
+    def rows(self):
+        """Yields every row as a tuple in schema order."""
+        return zip(*(self.column(name) for name, _ in self.__schema))
+
+    def close(self) -> None:
+        """Closes the mapping; memoryviews returned by column_chunk() must be released first."""
+        self.__view.release()
+        self.__map.close()
+        self.__handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+
+BOOKING_SCHEMA = [("booking_id", "int"), ("guest_email", "str"), ("room_number", "int"),
+                  ("check_in", "date"), ("check_out", "date"), ("status", "str")]
+INVOICE_SCHEMA = [("invoice_id", "int"), ("booking_id", "int"), ("room_number", "int"),
+                  ("check_in", "date"), ("check_out", "date"), ("total", "float")]
+PAYMENT_SCHEMA = [("payment_id", "int"), ("amount", "float"), ("method", "str"),
+                  ("status", "str"), ("card_last4", "str")]
+
+
+def export_bookings(bookings, path: str, chunk_size: int = 65536) -> int:
+    """Exports an iterable of Bookings to a columnar file; returns the number of rows."""
+    with ColumnarWriter(path, BOOKING_SCHEMA, chunk_size) as writer:
+        return writer.write_rows(
+            (booking.get_booking_id(), booking.get_guest().get_email(), booking.get_room().get_room_number(),
+             booking.get_check_in(), booking.get_check_out(), booking.get_status())
+            for booking in bookings)
+
+
+def export_invoices(invoices, path: str, chunk_size: int = 65536) -> int:
+    """Exports an iterable of Invoices to a columnar file; returns the number of rows."""
+    def row(invoice):
+        booking = invoice.get_booking()
+        return (invoice.get_invoice_id(), booking.get_booking_id(), booking.get_room().get_room_number(),
+                booking.get_check_in(), booking.get_check_out(), invoice.get_total())
+    with ColumnarWriter(path, INVOICE_SCHEMA, chunk_size) as writer:
+        return writer.write_rows(map(row, invoices))
+
+
+def export_payments(payments, path: str, chunk_size: int = 65536) -> int:
+    """Exports an iterable of Payments to a columnar file; only card last-four digits are kept."""
+    def row(payment):
+        last4 = payment.get_card_number()[-4:] if isinstance(payment, CreditCardPayment) else ""
+        return payment.get_payment_id(), payment.get_amount(), payment.get_method(), payment.get_status(), last4
+    with ColumnarWriter(path, PAYMENT_SCHEMA, chunk_size) as writer:
+        return writer.write_rows(map(row, payments))
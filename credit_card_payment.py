@@ -3,6 +3,8 @@ credit_card_payment.py
 Defines the CreditCardPayment class for the hotel management system.
 """
 
+from event_log import emit
+from metrics import timer
 from payment import Payment
 
 class CreditCardPayment(Payment):
@@ -11,6 +13,8 @@ class CreditCardPayment(Payment):
     to implement credit card-specific attributes and logic.
     """
 
+    __slots__ = ("__card_number", "__expiry_date")
+
     def __init__(self, payment_id: int, amount: float, method: str, card_number: str, expiry_date: str):
         """
         Initializes a new CreditCardPayment object.
@@ -30,9 +34,26 @@ class CreditCardPayment(Payment):
         Processes the credit card payment. 
         For now, we simulate a successful payment.
         """
-        print(f"Processing credit card payment with card number ending in {self.__card_number[-4:]}")
-        # Here you would integrate with a payment gateway.
-        return True
+        with timer("payment.process"):
+            emit("payment.processing",
+                 "Processing credit card payment with card number ending in {card_last4}",
+                 payment_id=self.get_payment_id(), amount=self.get_amount(), card_last4=self.__card_number[-4:])
+            # Here you would integrate with a payment gateway.
+            self.set_status("Paid")
+            return True
+
+    async def process_payment_async(self, gateway) -> bool:
+        """
+        Charges the card through a PaymentGateway, awaiting the gateway's network
+        round trip instead of blocking. The payment's idempotency key is sent along
+        so a retried charge is never applied twice.
+
+        :param gateway: The PaymentGateway to charge.
+        :raises GatewayError: If the gateway reports a transient failure.
+        """
+        approved = await gateway.charge(self, self.get_idempotency_key())
+        self.set_status("Paid" if approved else "Failed")
+        return approved
 
     # Getters and Setters
     def get_card_number(self) -> str:
@@ -0,0 +1,287 @@
+"""
+event_log.py
+Defines the EventLog class and its sinks, the structured event log of the hotel management system.
+"""
+
+import json
+import queue
+import threading
+import time
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+class ConsoleSink:
+    """
+    The ConsoleSink class prints each event's message to stdout as it is emitted.
+    It is the default sink, so interactive runs read exactly as before.
+    """
+
+    def write(self, record: dict) -> None:
+        print(record["message"])
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySink:
+    """
+    The MemorySink class keeps event records in a list, for inspecting events in
+    tests and tools.
+    """
+
+    def __init__(self):
+        """Initializes an empty MemorySink."""
+        self.__records = []
+
+    def write(self, record: dict) -> None:
+        self.__records.append(record)
+
+    def get_records(self, event: str = None) -> list:
+        """Returns the recorded events, optionally only those with a given name."""
+        return [record for record in self.__records if event is None or record["event"] == event]
+
+    def close(self) -> None:
+        pass
+
+
+class BackgroundSink:
+    """
+    The BackgroundSink class moves another sink's writes onto a background thread.
+    write() only puts the record on a queue, so the emitting code never waits on
+    formatting or I/O; the writer thread drains the queue in batches at least every
+    flush_interval seconds. A record the wrapped sink fails to write is counted as
+    dropped and the thread carries on.
+    """
+
+    def __init__(self, sink=None, flush_interval: float = 1.0, batch_size: int = 1000):
+        """
+        Starts the writer thread of a new BackgroundSink.
+
+        :param sink: The sink records are written to from the background thread.
+        :param flush_interval: The longest time, in seconds, an event waits before being written.
+        :param batch_size: The most events written per batch.
+        """
+        self.__sink = sink
+        self.__queue = queue.SimpleQueue()
+        self.__flush_interval = flush_interval
+        self.__batch_size = batch_size
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__written = 0
+        self.__dropped = 0
+        self.__writer = threading.Thread(target=self._drain, name="event-log-writer", daemon=True)
+        self.__writer.start()
+
+    def write(self, record: dict) -> None:
+        """
+        Queues a record for the writer thread.
+
+        :raises ValueError: If the sink is closed.
+        """
+        with self.__lock:
+            if self.__closed:
+                raise ValueError("Cannot write to a closed sink.")
+            self.__queue.put(record)
+
+    def _drain(self) -> None:
+        closing = False
+        while not closing:
+            try:
+                record = self.__queue.get(timeout=self.__flush_interval)
+            except queue.Empty:
+                continue
+            batch = []
+            while record is not None:
+                batch.append(record)
+                if len(batch) >= self.__batch_size:
+                    break
+                try:
+                    record = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+            closing = record is None
+            if batch:
+                try:
+                    written = self._write_batch(batch)
+                except Exception:
+                    written = 0
+                self.__written += written
+                self.__dropped += len(batch) - written
+
+    def _write_batch(self, batch: list) -> int:
+        """
+        Writes a batch of records on the writer thread.
+
+        :return: The number of records written.
+        """
+        written = 0
+        for record in batch:
+            try:
+                self.__sink.write(record)
+            except Exception:
+                continue
+            written += 1
+        return written
+
+    def get_written_count(self) -> int:
+        """Returns the number of events written so far."""
+        return self.__written
+
+    def get_dropped_count(self) -> int:
+        """Returns the number of events that could not be written."""
+        return self.__dropped
+
+    def close(self) -> None:
+        """Writes the queued events, stops the writer thread and closes the wrapped sink."""
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__queue.put(None)
+        self.__writer.join()
+        if self.__sink is not None:
+            self.__sink.close()
+
+
+class JsonlSink(BackgroundSink):
+    """
+    The JsonlSink class appends events to a JSON Lines file from a background
+    thread, serializing and writing each drained batch with a single write call.
+    A record that cannot be serialized is dropped without affecting the others.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, batch_size: int = 1000):
+        """
+        Opens a JSON Lines file for appending and starts its writer thread.
+
+        :param path: The output file path.
+        :param flush_interval: The longest time, in seconds, an event waits before reaching the file.
+        :param batch_size: The most events serialized per write call.
+        """
+        self.__handle = open(path, "a", encoding="utf-8")
+        super().__init__(None, flush_interval, batch_size)
+
+    def _write_batch(self, batch: list) -> int:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record, default=str) + "\n")
+            except Exception:
+                continue
+        self.__handle.write("".join(lines))
+        self.__handle.flush()
+        return len(lines)
+
+    def close(self) -> None:
+        """Writes the queued events, stops the writer thread and closes the file."""
+        super().close()
+        self.__handle.close()
+
+
+class EventLog:
+    """
+    The EventLog class publishes named events (e.g. "booking.confirmed") with a
+    human-readable message and structured fields to its sinks. Events below the
+    log level are dropped, and an event name can be sampled so that only one in
+    every N is kept. The message is a str.format template filled in from the
+    event fields, and filtering happens before the record and its message are
+    built, so suppressed events cost a dictionary lookup.
+
+    The default ConsoleSink prints synchronously so that its lines interleave
+    with the rest of a command-line run; long-running processes should wrap it
+    (or any other blocking sink) in a BackgroundSink.
+    """
+
+    def __init__(self, sinks: list = None, level: int = INFO, sample_rates: dict = None):
+        """
+        Initializes a new EventLog.
+
+        :param sinks: The sinks records are written to (default: a ConsoleSink).
+        :param level: The minimum level of recorded events.
+        :param sample_rates: Event name -> fraction of events kept (e.g. 0.01 keeps one in 100).
+        """
+        self.__sinks = list(sinks) if sinks is not None else [ConsoleSink()]
+        self.__level = level
+        self.__every = {}      # event name -> keep one in every N
+        self.__seen = {}       # event name -> events seen
+        self.__lock = threading.Lock()
+        for event, rate in (sample_rates or {}).items():
+            self.set_sample_rate(event, rate)
+
+    def emit(self, event: str, message: str, level: int = INFO, **fields) -> bool:
+        """
+        Publishes an event.
+
+        :param event: The dotted event name.
+        :param message: The human-readable message, a str.format template over the fields.
+        :param level: The event level (DEBUG, INFO, WARNING or ERROR).
+        :param fields: Structured, JSON-serializable event data.
+        :return: True if the event was recorded, False if it was filtered out.
+        """
+        if level < self.__level:
+            return False
+        every = self.__every.get(event)
+        if every is not None:
+            with self.__lock:
+                seen = self.__seen[event] = self.__seen.get(event, 0) + 1
+            if (seen - 1) % every:
+                return False
+        if fields:
+            message = message.format(**fields)
+        record = {"ts": time.time(), "event": event, "level": LEVEL_NAMES.get(level, level),
+                  "message": message, **fields}
+        for sink in self.__sinks:
+            sink.write(record)
+        return True
+
+    def add_sink(self, sink) -> None:
+        self.__sinks.append(sink)
+
+    def remove_sink(self, sink) -> None:
+        self.__sinks.remove(sink)
+
+    def get_sinks(self) -> list:
+        return list(self.__sinks)
+
+    def get_level(self) -> int:
+        return self.__level
+
+    def set_level(self, level: int) -> None:
+        self.__level = level
+
+    def set_sample_rate(self, event: str, rate: float) -> None:
+        """Keeps only a fraction of an event; a rate of 1 (or more) keeps every one."""
+        if rate <= 0:
+            raise ValueError("A sample rate must be positive.")
+        if rate >= 1:
+            self.__every.pop(event, None)
+        else:
+            self.__every[event] = round(1 / rate)
+
+    def close(self) -> None:
+        """Closes every sink, flushing buffered events."""
+        for sink in self.__sinks:
+            sink.close()
+
+    def __str__(self) -> str:
+        return f"EventLog at level {LEVEL_NAMES.get(self.__level, self.__level)} with {len(self.__sinks)} sink(s)"
+
+
+_event_log = EventLog()
+
+def get_event_log() -> EventLog:
+    """Returns the process-wide EventLog."""
+    return _event_log
+
+
+def set_event_log(event_log: EventLog) -> EventLog:
+    """Replaces the process-wide EventLog and returns the previous one."""
+    global _event_log
+    previous, _event_log = _event_log, event_log
+    return previous
+
+
+def emit(event: str, message: str, level: int = INFO, **fields) -> bool:
+    """Publishes an event to the process-wide EventLog."""
+    return _event_log.emit(event, message, level, **fields)
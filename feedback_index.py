@@ -0,0 +1,211 @@
+"""
+feedback_index.py
+Defines the FeedbackIndex and SentimentAggregator classes for searching and summarizing guest feedback.
+"""
+
+import re
+from collections import Counter
+from datetime import date
+from guest_interaction import GuestInteraction
+
+POSITIVE_WORDS = frozenset({
+    "amazing", "beautiful", "clean", "comfortable", "excellent", "friendly", "great", "helpful",
+    "lovely", "luxurious", "nice", "perfect", "quiet", "spacious", "wonderful",
+})
+NEGATIVE_WORDS = frozenset({
+    "awful", "bad", "broken", "cold", "dirty", "disappointing", "loud", "noise", "noisy",
+    "rude", "slow", "smelly", "terrible", "uncomfortable", "worst",
+})
+NEGATIONS = frozenset({"not", "no", "never", "isn't", "wasn't", "didn't", "don't"})
+# Words left out of the keyword counters (they are still searchable).
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "at", "but", "for", "in", "is", "it", "my", "of", "on", "our",
+    "so", "the", "to", "very", "was", "we", "were", "with",
+})
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_PHRASE = re.compile(r'"([^"]+)"|(\S+)')
+
+# Search polarity -> sign of the sentiment score it keeps.
+_POLARITIES = {"positive": 1, "negative": -1, "neutral": 0}
+
+def tokenize(text: str) -> list:
+    """Returns the lower-cased word tokens of a text."""
+    return _TOKEN.findall(text.lower())
+
+
+def sentiment(tokens: list) -> int:
+    """
+    Returns positive minus negative lexicon words in a token list; a negation
+    up to two words before a sentiment word flips it ("not clean" is negative).
+    """
+    score = 0
+    for i, token in enumerate(tokens):
+        polarity = (token in POSITIVE_WORDS) - (token in NEGATIVE_WORDS)
+        if polarity and NEGATIONS.intersection(tokens[max(i - 2, 0):i]):
+            polarity = -polarity
+        score += polarity
+    return score
+
+
+class SentimentAggregator:
+    """
+    The SentimentAggregator class keeps running keyword and sentiment counters
+    per room and per property. Each message updates its counters once, so a
+    summary is a dictionary lookup however many messages have been seen.
+    """
+
+    def __init__(self):
+        """Initializes an empty SentimentAggregator."""
+        self.__keywords = {}    # ("room" | "property", key) -> Counter of tokens
+        self.__sentiment = {}   # ("room" | "property", key) -> [positive, neutral, negative]
+
+    def add(self, tokens: list, score: int, room_number: int = None, property_id: str = None) -> None:
+        """Counts one message's tokens and sentiment for its room and property."""
+        bucket = 0 if score > 0 else 2 if score < 0 else 1
+        for scope in (("room", room_number), ("property", property_id)):
+            if scope[1] is None:
+                continue
+            self.__keywords.setdefault(scope, Counter()).update(set(tokens) - STOPWORDS)
+            self.__sentiment.setdefault(scope, [0, 0, 0])[bucket] += 1
+
+    def _summary(self, scope: tuple, top: int) -> dict:
+        positive, neutral, negative = self.__sentiment.get(scope, (0, 0, 0))
+        keywords = self.__keywords.get(scope, Counter())
+        return {"messages": positive + neutral + negative, "positive": positive, "neutral": neutral,
+                "negative": negative, "top_keywords": keywords.most_common(top)}
+
+    def room_summary(self, room_number: int, top: int = 10) -> dict:
+        """Returns message and sentiment counts and the most frequent keywords for a room."""
+        return self._summary(("room", room_number), top)
+
+    def property_summary(self, property_id: str, top: int = 10) -> dict:
+        """Returns message and sentiment counts and the most frequent keywords for a property."""
+        return self._summary(("property", property_id), top)
+
+    def keyword_count(self, keyword: str, room_number: int = None, property_id: str = None) -> int:
+        """Returns the number of messages mentioning a keyword in a room or property."""
+        scope = ("room", room_number) if room_number is not None else ("property", property_id)
+        return self.__keywords.get(scope, Counter())[keyword.lower()]
+
+
+class FeedbackIndex:
+    """
+    The FeedbackIndex class is a positional inverted index over feedback messages.
+    Each token maps to the messages containing it and the token positions within
+    them, which answers keyword queries by intersecting posting sets and phrase
+    queries by checking positions. Room, date and sentiment are kept per message,
+    and a room filter starts from that room's (usually much smaller) message set.
+
+    Messages are indexed incrementally; register it with
+    GuestInteraction.add_listener(index.on_interaction_event) to index feedback
+    as it is submitted.
+    """
+
+    def __init__(self, types: tuple = ("Feedback", "Complaint"), properties: dict = None,
+                 aggregator: SentimentAggregator = None):
+        """
+        Initializes an empty FeedbackIndex.
+
+        :param types: The interaction types that are indexed.
+        :param properties: Room number -> property id, used for per-property counters.
+        :param aggregator: The SentimentAggregator updated with every message.
+        """
+        self.__types = set(types)
+        self.__properties = properties or {}
+        self.__aggregator = aggregator if aggregator is not None else SentimentAggregator()
+        self.__postings = {}   # token -> {message id: [positions]}
+        self.__by_room = {}    # room number -> set of message ids
+        self.__days = {}       # message id -> ordinal
+        self.__scores = {}     # message id -> sentiment score
+
+    def add(self, interaction: GuestInteraction, room_number: int = None, day: date = None) -> bool:
+        """
+        Indexes an interaction's message.
+
+        :param room_number: The room the feedback is about (default: the interaction's room).
+        :param day: The day the feedback was given (default: today).
+        :return: True if the message was indexed, False if its type is not indexed or it already was.
+        """
+        message_id = interaction.get_interaction_id()
+        if interaction.get_type() not in self.__types or message_id in self.__days:
+            return False
+        tokens = tokenize(interaction.get_message())
+        for position, token in enumerate(tokens):
+            self.__postings.setdefault(token, {}).setdefault(message_id, []).append(position)
+        if room_number is None:
+            room_number = interaction.get_room_number()
+        if room_number is not None:
+            self.__by_room.setdefault(room_number, set()).add(message_id)
+        self.__days[message_id] = (day or date.today()).toordinal()
+        score = self.__scores[message_id] = sentiment(tokens)
+        self.__aggregator.add(tokens, score, room_number, self.__properties.get(room_number))
+        return True
+
+    def on_interaction_event(self, event: str, interaction: GuestInteraction) -> None:
+        """GuestInteraction listener that indexes messages as they are submitted."""
+        if event == "submitted":
+            self.add(interaction)
+
+    def _phrase(self, words: list, candidates: set) -> set:
+        """Returns the candidates in which the words appear consecutively."""
+        postings = [self.__postings.get(word, {}) for word in words]
+        matches = set()
+        for message_id in candidates:
+            offsets = [set(posting.get(message_id, ())) for posting in postings]
+            if any(all(start + i in offsets[i] for i in range(1, len(words))) for start in offsets[0]):
+                matches.add(message_id)
+        return matches
+
+    def search(self, query: str, room_number: int = None, start: date = None, end: date = None,
+               polarity: str = None) -> list:
+        """
+        Returns the IDs of messages matching every term of a query, newest first.
+        Double-quoted parts of the query must match as phrases.
+
+        :param room_number: Only messages about this room.
+        :param start: Only messages given on or after this day.
+        :param end: Only messages given before this day.
+        :param polarity: "positive", "negative" or "neutral" to keep only messages of that sentiment.
+        :raises ValueError: If polarity is not one of those.
+        """
+        if polarity is not None and polarity not in _POLARITIES:
+            raise ValueError(f"Unknown polarity {polarity!r}; expected one of {', '.join(_POLARITIES)}.")
+        sign = _POLARITIES.get(polarity)
+        terms = [tokenize(phrase or word) for phrase, word in _PHRASE.findall(query)]
+        terms = [words for words in terms if words]
+        # Posting dicts and the room set all support "in", so only the smallest is iterated.
+        sources = [self.__postings.get(word, {}) for words in terms for word in words]
+        if room_number is not None:
+            sources.append(self.__by_room.get(room_number, set()))
+        if not sources:
+            return []
+        sources.sort(key=len)
+        others = sources[1:]
+        candidates = {message_id for message_id in sources[0]
+                      if all(message_id in source for source in others)}
+        for words in terms:
+            if len(words) > 1:
+                candidates = self._phrase(words, candidates)
+        low = start.toordinal() if start else None
+        high = end.toordinal() if end else None
+        days, scores = self.__days, self.__scores
+        results = [message_id for message_id in candidates
+                   if (low is None or days[message_id] >= low) and (high is None or days[message_id] < high)
+                   and (sign is None or (scores[message_id] > 0) - (scores[message_id] < 0) == sign)]
+        results.sort(key=lambda message_id: (days[message_id], message_id), reverse=True)
+        return results
+
+    def get_sentiment(self, message_id: int) -> int:
+        """Returns the sentiment score of an indexed message."""
+        return self.__scores[message_id]
+
+    def get_aggregator(self) -> SentimentAggregator:
+        """Returns the SentimentAggregator fed by this index."""
+        return self.__aggregator
+
+    def __len__(self) -> int:
+        return len(self.__days)
+
+    def __str__(self) -> str:
+        return f"FeedbackIndex with {len(self.__days)} message(s), {len(self.__postings)} term(s)"
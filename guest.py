@@ -3,6 +3,7 @@ guest.py
 Defines the Guest class for the hotel management system.
 """
 
+from event_log import emit
 from loyalty_program import LoyaltyProgram
 
 class Guest:
@@ -11,6 +12,8 @@ class Guest:
     linking to a loyalty program.
     """
 
+    __slots__ = ("__name", "__email", "__phone", "__loyalty")
+
     def __init__(self, name: str, email: str, phone: str, loyalty: LoyaltyProgram = None):
         """
         Initializes a new Guest object.
@@ -27,11 +30,24 @@ class Guest:
 
     def create_account(self) -> None:
         """Simulates account creation for the guest."""
-        print(f"Account created for {self.__name} ({self.__email}).")
+        emit("guest.account_created", "Account created for {name} ({email}).",
+             name=self.__name, email=self.__email)
+
+    def view_history(self, history=None, page: int = 0, page_size: int = 10) -> list:
+        """
+        Displays and returns one page of the guest's bookings, most recent first.
 
-    def view_history(self) -> None:
-        """Displays the guest's booking history (stub)."""
+        :param history: The GuestHistoryIndex to read from.
+        :param page: The zero-based page number.
+        :param page_size: The number of bookings per page.
+        """
         print(f"Displaying booking history for {self.__name}.")
+        if history is None:
+            return []
+        bookings = history.get_history(self.__email, page, page_size)
+        for booking in bookings:
+            print(f"  {booking}")
+        return bookings
 
     # Getters and Setters
     def get_name(self) -> str:
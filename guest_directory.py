@@ -0,0 +1,151 @@
+"""
+guest_directory.py
+Defines the GuestDirectory class, which keeps a single Guest object per person.
+"""
+
+from difflib import SequenceMatcher
+from guest import Guest
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+    "l": "4", **dict.fromkeys("mn", "5"), "r": "6",
+}
+
+def _soundex(word: str) -> str:
+    """Returns the four-character Soundex code of a word (e.g. "Robert" -> "r163")."""
+    word = "".join(ch for ch in word.lower() if ch.isalpha())
+    if not word:
+        return ""
+    code = word[0]
+    last = _SOUNDEX_CODES.get(word[0], "")
+    for ch in word[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "hw":
+            last = digit
+    return code.ljust(4, "0")
+
+
+class GuestDirectory:
+    """
+    The GuestDirectory class interns Guest objects so each person is represented
+    once. Guests are found in O(1) through hash indexes on their normalized email
+    and phone number; a guest matching either is merged into the existing entry.
+    A third index, keyed on the Soundex code of the surname, groups similar names
+    so near-duplicates can be reported without comparing against every guest.
+    """
+
+    def __init__(self, similarity: float = 0.85):
+        """
+        Initializes an empty GuestDirectory.
+
+        :param similarity: The minimum name similarity (0..1) reported by find_similar().
+        """
+        self.__similarity = similarity
+        self.__by_email = {}
+        self.__by_phone = {}
+        self.__by_name = {}    # surname soundex -> list of Guests
+        self.__count = 0
+
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        """Returns the email trimmed and lower-cased."""
+        return (email or "").strip().lower()
+
+    @staticmethod
+    def normalize_phone(phone: str) -> str:
+        """Returns only the digits of a phone number, keeping the last ten for long numbers."""
+        digits = "".join(ch for ch in (phone or "") if ch.isdigit())
+        return digits[-10:]
+
+    @staticmethod
+    def _name_key(name: str) -> str:
+        parts = (name or "").split()
+        return _soundex(parts[-1]) if parts else ""
+
+    def intern(self, guest: Guest) -> Guest:
+        """
+        Returns the directory's Guest for this person, adding the guest if unknown.
+        A match on email or phone is merged: the stored guest gains any phone,
+        email or loyalty program it was missing.
+        """
+        email = self.normalize_email(guest.get_email())
+        phone = self.normalize_phone(guest.get_phone())
+        existing = self.__by_email.get(email) if email else None
+        if existing is None and phone:
+            existing = self.__by_phone.get(phone)
+        if existing is None:
+            self._add(guest, email, phone)
+            return guest
+        if existing is not guest:
+            self._merge(existing, guest, email, phone)
+        return existing
+
+    def _add(self, guest: Guest, email: str, phone: str) -> None:
+        if email:
+            self.__by_email[email] = guest
+        if phone:
+            self.__by_phone[phone] = guest
+        self.__by_name.setdefault(self._name_key(guest.get_name()), []).append(guest)
+        self.__count += 1
+
+    def _merge(self, existing: Guest, duplicate: Guest, email: str, phone: str) -> None:
+        if email and email not in self.__by_email:
+            self.__by_email[email] = existing
+            if not existing.get_email():
+                existing.set_email(duplicate.get_email())
+        if phone and phone not in self.__by_phone:
+            self.__by_phone[phone] = existing
+            if not existing.get_phone():
+                existing.set_phone(duplicate.get_phone())
+        if existing.get_loyalty_program() is None and duplicate.get_loyalty_program() is not None:
+            existing.set_loyalty_program(duplicate.get_loyalty_program())
+
+    def import_guests(self, guests) -> dict:
+        """
+        Interns a stream of guests in a single pass.
+
+        :return: A dict with the number of guests "added" and "merged".
+        """
+        added = merged = 0
+        for guest in guests:
+            if self.intern(guest) is guest:
+                added += 1
+            else:
+                merged += 1
+        return {"added": added, "merged": merged}
+
+    def find_by_email(self, email: str) -> Guest:
+        """Returns the guest with this email, or None."""
+        return self.__by_email.get(self.normalize_email(email))
+
+    def find_by_phone(self, phone: str) -> Guest:
+        """Returns the guest with this phone number, or None."""
+        return self.__by_phone.get(self.normalize_phone(phone))
+
+    def find_similar(self, name: str) -> list:
+        """
+        Returns (guest, score) pairs for guests whose name resembles the given one,
+        best match first. Only guests with a phonetically matching surname are compared.
+        """
+        target = " ".join(name.lower().split())
+        matches = []
+        for guest in self.__by_name.get(self._name_key(name), []):
+            score = SequenceMatcher(None, target, " ".join(guest.get_name().lower().split())).ratio()
+            if score >= self.__similarity:
+                matches.append((guest, score))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def possible_duplicates(self, guest: Guest) -> list:
+        """Returns other guests whose names are similar to this guest's name."""
+        return [match for match, _ in self.find_similar(guest.get_name()) if match is not guest]
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __str__(self) -> str:
+        return f"GuestDirectory with {self.__count} guest(s)"
@@ -0,0 +1,71 @@
+"""
+guest_history.py
+Defines the GuestHistoryIndex class, the guest-to-bookings index of the hotel management system.
+"""
+
+from bisect import insort
+from booking import Booking
+
+class GuestHistoryIndex:
+    """
+    The GuestHistoryIndex class maps each guest email to that guest's bookings,
+    kept sorted by check-in date. It is maintained from Booking lifecycle events,
+    so a guest's history is one dictionary lookup plus a slice of their own
+    bookings, independent of the total number of bookings.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty GuestHistoryIndex. Register it with
+        Booking.add_listener(index.on_booking_event) to keep it up to date.
+        """
+        self.__entries = {}   # normalized email -> sorted [(check-in ordinal, booking id)]
+        self.__bookings = {}  # booking id -> Booking
+
+    @staticmethod
+    def _key(email: str) -> str:
+        return email.strip().lower()
+
+    def add_booking(self, booking: Booking) -> None:
+        """Adds a booking to its guest's history; adding the same booking again has no effect."""
+        booking_id = booking.get_booking_id()
+        if booking_id in self.__bookings:
+            return
+        self.__bookings[booking_id] = booking
+        key = self._key(booking.get_guest().get_email())
+        insort(self.__entries.setdefault(key, []), (booking.get_check_in().toordinal(), booking_id))
+
+    def on_booking_event(self, event: str, booking: Booking) -> None:
+        """Booking listener; bookings are indexed on creation (or first seen on confirm/cancel)."""
+        self.add_booking(booking)
+
+    def get_history(self, email: str, page: int = 0, page_size: int = 10, newest_first: bool = True) -> list:
+        """
+        Returns one page of a guest's bookings ordered by check-in date.
+
+        :param email: The guest's email (case and surrounding spaces are ignored).
+        :param page: The zero-based page number.
+        :param page_size: The number of bookings per page.
+        :param newest_first: Whether the most recent stays come first.
+        """
+        entries = self.__entries.get(self._key(email), [])
+        count = len(entries)
+        if newest_first:
+            stop = max(count - page * page_size, 0)
+            selected = reversed(entries[max(stop - page_size, 0):stop])
+        else:
+            selected = entries[page * page_size:(page + 1) * page_size]
+        return [self.__bookings[booking_id] for _, booking_id in selected]
+
+    def count(self, email: str, status: str = None) -> int:
+        """Returns the number of bookings of a guest, optionally only those with a given status."""
+        entries = self.__entries.get(self._key(email), [])
+        if status is None:
+            return len(entries)
+        return sum(1 for _, booking_id in entries if self.__bookings[booking_id].get_status() == status)
+
+    def __len__(self) -> int:
+        return len(self.__bookings)
+
+    def __str__(self) -> str:
+        return f"GuestHistoryIndex with {len(self.__bookings)} booking(s) for {len(self.__entries)} guest(s)"
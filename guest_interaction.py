@@ -3,15 +3,37 @@ guest_interaction.py
 Defines the GuestInteraction class for handling both feedback and service requests.
 """
 
+from event_log import emit
 from guest import Guest
 
 class GuestInteraction:
     """
     The GuestInteraction class represents any interaction a guest makes, such as
     submitting feedback or requesting a service.
+    Listeners registered with add_listener() are called as listener(event, interaction)
+    when an interaction is "submitted".
     """
 
-    def __init__(self, interaction_id: int, guest: Guest, itype: str, message: str, status: str = "Open"):
+    __slots__ = ("__interaction_id", "__guest", "__type", "__message", "__status", "__room_number")
+
+    __listeners = []
+
+    @classmethod
+    def add_listener(cls, listener) -> None:
+        """Registers a callable to be notified of submitted interactions."""
+        cls.__listeners.append(listener)
+
+    @classmethod
+    def remove_listener(cls, listener) -> None:
+        """Unregisters a previously added listener."""
+        cls.__listeners.remove(listener)
+
+    def _notify(self, event: str) -> None:
+        for listener in GuestInteraction.__listeners:
+            listener(event, self)
+
+    def __init__(self, interaction_id: int, guest: Guest, itype: str, message: str, status: str = "Open",
+                 room_number: int = None):
         """
         Initializes a new GuestInteraction object.
 
@@ -20,16 +42,28 @@ class GuestInteraction:
         :param itype: The type of interaction (e.g., "Feedback", "ServiceRequest").
         :param message: The content of the feedback or request.
         :param status: Current status of the interaction (Open, InProgress, Closed).
+        :param room_number: The room the interaction concerns, if any.
         """
         self.__interaction_id = interaction_id
         self.__guest = guest
         self.__type = itype
         self.__message = message
         self.__status = status
+        self.__room_number = room_number
 
-    def submit_interaction(self) -> None:
-        """Simulates submitting the interaction."""
-        print(f"Interaction #{self.__interaction_id} of type '{self.__type}' submitted by {self.__guest.get_name()}.")
+    def submit_interaction(self, queue=None) -> None:
+        """
+        Submits the interaction.
+
+        :param queue: An optional InteractionQueue that dispatches it to staff.
+        """
+        if queue is not None:
+            queue.enqueue(self)
+        self._notify("submitted")
+        emit("interaction.submitted",
+             "Interaction #{interaction_id} of type '{type}' submitted by {guest}.",
+             interaction_id=self.__interaction_id, type=self.__type, guest=self.__guest.get_name(),
+             email=self.__guest.get_email())
 
     # Getters and Setters
     def get_interaction_id(self) -> int:
@@ -50,6 +84,12 @@ class GuestInteraction:
     def set_message(self, new_message: str) -> None:
         self.__message = new_message
 
+    def get_room_number(self) -> int:
+        return self.__room_number
+
+    def set_room_number(self, room_number: int) -> None:
+        self.__room_number = room_number
+
     def get_status(self) -> str:
         return self.__status
 
@@ -0,0 +1,226 @@
+"""
+interaction_queue.py
+Defines the InteractionQueue class, which dispatches guest interactions to staff workers.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from guest_interaction import GuestInteraction
+from metrics import Histogram
+
+# Lower ranks are served first.
+DEFAULT_TIER_RANKS = {"Platinum": 0, "Gold": 1, "Silver": 2, "Basic": 3}
+DEFAULT_TYPE_RANKS = {"ServiceRequest": 0, "Complaint": 0, "Feedback": 2}
+
+class InteractionQueue:
+    """
+    The InteractionQueue class is a priority work queue of GuestInteractions. An
+    interaction's rank is its guest's loyalty tier rank plus its type rank, and
+    each rank step is worth aging seconds of waiting: the heap is ordered by
+    enqueue time + rank * aging. Urgent requests jump ahead, yet an interaction
+    is never passed by one submitted more than rank * aging seconds after it, so
+    nothing starves, and both enqueue and dequeue stay O(log n).
+
+    Interactions move from Open to InProgress when a worker takes them and to
+    Closed when handled; time-to-assign and time-to-close are recorded per type
+    in fixed-size histograms. An interaction whose handler raises goes back on
+    the queue, keeping its place, until it has failed max_attempts times; it is
+    then marked Failed and listed by get_failed().
+    """
+
+    def __init__(self, aging: float = 60.0, tier_ranks: dict = None, type_ranks: dict = None,
+                 clock=time.monotonic, max_attempts: int = 3):
+        """
+        Initializes an empty InteractionQueue.
+
+        :param aging: Seconds of waiting that make up for one rank step.
+        :param tier_ranks: Loyalty tier -> rank; guests without a program get the highest rank.
+        :param type_ranks: Interaction type -> rank; unknown types get the highest rank.
+        :param clock: A function returning the current time in seconds.
+        :param max_attempts: Handler runs before a failing interaction is marked Failed.
+        """
+        self.__aging = aging
+        self.__tier_ranks = tier_ranks or DEFAULT_TIER_RANKS
+        self.__type_ranks = type_ranks or DEFAULT_TYPE_RANKS
+        self.__clock = clock
+        self.__max_attempts = max_attempts
+        self.__heap = []
+        self.__sequence = itertools.count()
+        self.__submitted = {}   # interaction id -> submit time
+        self.__assigned = {}    # interaction id -> assign time
+        self.__attempts = {}    # interaction id -> failed handler runs
+        self.__failed = []      # interactions that failed max_attempts times
+        self.__latencies = {}   # type -> {"assign": Histogram, "close": Histogram}
+        self.__errors = {}      # type -> handler failures
+        self.__condition = threading.Condition()
+        self.__workers = []
+        self.__stopping = False
+
+    def rank(self, interaction: GuestInteraction) -> int:
+        """Returns the rank of an interaction (lower is served sooner)."""
+        loyalty = interaction.get_guest().get_loyalty_program()
+        worst_tier = max(self.__tier_ranks.values())
+        tier = self.__tier_ranks.get(loyalty.get_tier(), worst_tier) if loyalty else worst_tier
+        return tier + self.__type_ranks.get(interaction.get_type(), max(self.__type_ranks.values()))
+
+    def enqueue(self, interaction: GuestInteraction) -> None:
+        """
+        Adds an interaction to the queue and wakes a waiting worker.
+
+        :raises ValueError: If an interaction with the same ID is already queued or in progress.
+        """
+        now = self.__clock()
+        entry = (now + self.rank(interaction) * self.__aging, next(self.__sequence), interaction)
+        key = interaction.get_interaction_id()
+        with self.__condition:
+            if key in self.__submitted:
+                raise ValueError(f"Interaction {key} is already queued or in progress.")
+            self.__submitted[key] = now
+            heapq.heappush(self.__heap, entry)
+            self.__condition.notify()
+
+    def _retry(self, interaction: GuestInteraction) -> None:
+        """Counts a handler failure and requeues the interaction at its original priority, or fails it."""
+        interaction.set_status("Open")
+        with self.__condition:
+            key = interaction.get_interaction_id()
+            itype = interaction.get_type()
+            self.__errors[itype] = self.__errors.get(itype, 0) + 1
+            self.__assigned.pop(key, None)
+            attempts = self.__attempts[key] = self.__attempts.get(key, 0) + 1
+            if attempts < self.__max_attempts:
+                submitted = self.__submitted[key]
+                entry = (submitted + self.rank(interaction) * self.__aging, next(self.__sequence), interaction)
+                heapq.heappush(self.__heap, entry)
+                self.__condition.notify()
+                return
+            del self.__attempts[key]
+            del self.__submitted[key]
+            self.__failed.append(interaction)
+        interaction.set_status("Failed")
+
+    def dequeue(self, timeout: float = None) -> GuestInteraction:
+        """
+        Takes the most urgent interaction and marks it InProgress.
+
+        :param timeout: Seconds to wait for work; None waits until work arrives or the queue stops.
+        :return: The interaction, or None if none arrived in time or the queue is stopping.
+        """
+        with self.__condition:
+            if not self.__condition.wait_for(lambda: self.__heap or self.__stopping, timeout):
+                return None
+            if not self.__heap:
+                return None
+            interaction = heapq.heappop(self.__heap)[2]
+            now = self.__clock()
+            key = interaction.get_interaction_id()
+            self.__assigned[key] = now
+            if key not in self.__attempts:
+                self._record(interaction.get_type(), "assign", now - self.__submitted[key])
+        interaction.set_status("InProgress")
+        return interaction
+
+    def complete(self, interaction: GuestInteraction) -> None:
+        """
+        Marks an interaction Closed and records its time-to-close.
+
+        :raises ValueError: If the interaction was not taken from this queue or is already closed.
+        """
+        with self.__condition:
+            key = interaction.get_interaction_id()
+            if key not in self.__assigned:
+                raise ValueError(f"Interaction {key} is not in progress in this queue.")
+            del self.__assigned[key]
+            self.__attempts.pop(key, None)
+            self._record(interaction.get_type(), "close", self.__clock() - self.__submitted.pop(key))
+        interaction.set_status("Closed")
+
+    def _record(self, itype: str, kind: str, seconds: float) -> None:
+        kinds = self.__latencies.get(itype)
+        if kinds is None:
+            kinds = self.__latencies[itype] = {"assign": Histogram(), "close": Histogram()}
+        kinds[kind].record(seconds)
+
+    def _work(self, handlers: dict, default) -> None:
+        while True:
+            interaction = self.dequeue()
+            if interaction is None:
+                return
+            handler = handlers.get(interaction.get_type(), default)
+            try:
+                if handler is not None:
+                    handler(interaction)
+            except Exception:
+                self._retry(interaction)
+                continue
+            self.complete(interaction)
+
+    def start(self, handlers: dict = None, workers: int = 4, default=None) -> None:
+        """
+        Starts worker threads that take interactions and pass them to a handler.
+
+        :param handlers: Interaction type -> callable(interaction), e.g. housekeeping or maintenance.
+        :param workers: The number of worker threads.
+        :param default: The handler for types without one; None just closes them.
+        """
+        self.__stopping = False
+        for i in range(workers):
+            worker = threading.Thread(target=self._work, args=(handlers or {}, default),
+                                      name=f"interaction-worker-{i}", daemon=True)
+            worker.start()
+            self.__workers.append(worker)
+
+    def stop(self, drain: bool = True) -> None:
+        """
+        Stops the workers.
+
+        :param drain: Whether to let the workers finish the queued interactions first.
+        """
+        with self.__condition:
+            if not drain:
+                self.__heap.clear()
+            self.__stopping = True
+            self.__condition.notify_all()
+        for worker in self.__workers:
+            worker.join()
+        self.__workers.clear()
+
+    @staticmethod
+    def _summary(histogram: Histogram) -> dict:
+        count = histogram.get_count() if histogram is not None else 0
+        if not count:
+            return {"count": 0}
+        return {"count": count, "mean": histogram.get_sum() / count, "p50": histogram.percentile(0.5),
+                "p95": histogram.percentile(0.95), "max": histogram.summary()["max"]}
+
+    def get_metrics(self) -> dict:
+        """
+        Returns per interaction type the time-to-assign and time-to-close summaries
+        (count, mean, p50, p95, max in seconds), the number of handler errors and
+        the number of interactions that failed for good.
+        """
+        with self.__condition:
+            failed = {}
+            for interaction in self.__failed:
+                failed[interaction.get_type()] = failed.get(interaction.get_type(), 0) + 1
+            metrics = {}
+            for itype in set(self.__latencies) | set(self.__errors):
+                kinds = self.__latencies.get(itype, {})
+                metrics[itype] = {"time_to_assign": self._summary(kinds.get("assign")),
+                                  "time_to_close": self._summary(kinds.get("close")),
+                                  "errors": self.__errors.get(itype, 0), "failed": failed.get(itype, 0)}
+        return metrics
+
+    def get_failed(self) -> list:
+        """Returns the interactions whose handler failed max_attempts times, for a person to pick up."""
+        with self.__condition:
+            return list(self.__failed)
+
+    def __len__(self) -> int:
+        return len(self.__heap)
+
+    def __str__(self) -> str:
+        return (f"InteractionQueue with {len(self.__heap)} waiting, {len(self.__assigned)} in progress, "
+                f"{len(self.__workers)} worker(s)")
@@ -0,0 +1,247 @@
+"""
+inventory_snapshot.py
+Defines the InventorySnapshot class, a memory-mapped snapshot of the room inventory
+and its reservations for fast cold starts.
+
+File layout (native byte order, every array 8-byte aligned):
+    magic "RSSNAP01"
+    room_numbers  int64[rooms], sorted
+    prices        float64[rooms]
+    type_ids      int32[rooms]      index into the footer's type names
+    amenities     int64[rooms]      bitset over the footer's amenity names
+    available     uint8[rooms]      in-service flag
+    offsets       int64[rooms + 1]  each room's slice of the reservation arrays
+    starts, ends  int32[bookings]   check-in/check-out ordinals, sorted per room
+    booking_ids   int64[bookings]
+    footer        UTF-8 JSON: byte order, type and amenity names, array positions
+    trailer       little-endian uint64 footer length, then magic "RSSNAP01"
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from availability_index import set_bits
+from room import Room
+
+MAGIC = b"RSSNAP01"
+
+_ARRAYS = [("room_numbers", "q"), ("prices", "d"), ("type_ids", "i"), ("amenities", "q"),
+           ("available", "B"), ("offsets", "q"), ("starts", "i"), ("ends", "i"), ("booking_ids", "q")]
+
+def write_snapshot(rooms, path: str) -> dict:
+    """
+    Writes rooms and the reservations in their schedules to a snapshot file.
+
+    :param rooms: An iterable of Room objects (e.g. AvailabilityIndex.get_rooms()).
+    :return: The snapshot footer.
+    """
+    columns = {name: array(typecode) for name, typecode in _ARRAYS}
+    columns["offsets"].append(0)
+    type_ids = {}
+    amenity_bits = {}
+    for room in sorted(rooms, key=Room.get_room_number):
+        mask = 0
+        for amenity in room.get_amenities():
+            mask |= 1 << amenity_bits.setdefault(amenity, len(amenity_bits))
+        columns["room_numbers"].append(room.get_room_number())
+        columns["prices"].append(room.get_price_per_night())
+        columns["type_ids"].append(type_ids.setdefault(room.get_room_type(), len(type_ids)))
+        columns["amenities"].append(mask)
+        columns["available"].append(int(room.is_available()))
+        for check_in, check_out, booking_id in room.get_schedule().get_reservations():
+            columns["starts"].append(check_in.toordinal())
+            columns["ends"].append(check_out.toordinal())
+            columns["booking_ids"].append(booking_id)
+        columns["offsets"].append(len(columns["starts"]))
+    if len(amenity_bits) > 63:
+        raise ValueError("A snapshot supports at most 63 distinct amenities.")
+
+    header = {
+        "byteorder": sys.byteorder,
+        "rooms": len(columns["room_numbers"]),
+        "bookings": len(columns["starts"]),
+        "types": list(type_ids),
+        "amenities": list(amenity_bits),
+        "arrays": {},
+    }
+    with open(path, "wb") as handle:
+        handle.write(MAGIC)
+        for name, _ in _ARRAYS:
+            handle.write(b"\0" * (-handle.tell() % 8))
+            header["arrays"][name] = [handle.tell(), len(columns[name]) * columns[name].itemsize]
+            handle.write(columns[name].tobytes())
+        footer = json.dumps(header).encode("utf-8")
+        handle.write(footer)
+        handle.write(struct.pack("<Q", len(footer)))
+        handle.write(MAGIC)
+    return header
+
+
+class InventorySnapshot:
+    """
+    The InventorySnapshot class maps a snapshot file into memory and answers
+    availability questions directly from the mapped arrays with binary searches.
+    Opening a snapshot only parses its small JSON footer, and a Room object is
+    materialized (with its schedule) only when get_room() asks for it. Once a
+    room is materialized, availability answers come from its live schedule, so
+    bookings taken on rooms handed out by get_room() are seen; rooms never
+    materialized are reported as they were when the snapshot was taken.
+
+    free_rooms() works on bitmaps over the room positions: on first use, one
+    bitmap per room type, amenity and reserved night is built from the arrays,
+    and a query then combines the bitmaps of its filters and nights instead of
+    checking every room.
+    """
+
+    def __init__(self, path: str):
+        """
+        Opens a snapshot file.
+
+        :raises ValueError: If the file is not a snapshot or was written with another byte order.
+        """
+        self.__handle = open(path, "rb")
+        self.__map = mmap.mmap(self.__handle.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self.__map)
+        if self.__map[:8] != MAGIC or self.__map[size - 8:] != MAGIC:
+            raise ValueError(f"{path} is not an inventory snapshot.")
+        (length,) = struct.unpack("<Q", self.__map[size - 16:size - 8])
+        header = json.loads(self.__map[size - 16 - length:size - 16].decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine.")
+        self.__types = header["types"]
+        self.__amenities = header["amenities"]
+        self.__view = memoryview(self.__map)
+        self.__arrays = {}
+        for name, typecode in _ARRAYS:
+            offset, length = header["arrays"][name]
+            self.__arrays[name] = self.__view[offset:offset + length].cast(typecode)
+        self.__rooms = {}   # materialized Room objects
+        self.__materialized = 0   # bitmap of the materialized rooms' positions
+        self.__bitmaps = None     # built by _bitmaps() on first use
+
+    def _index(self, room_number: int) -> int:
+        numbers = self.__arrays["room_numbers"]
+        idx = bisect_left(numbers, room_number)
+        if idx == len(numbers) or numbers[idx] != room_number:
+            raise KeyError(f"Room {room_number} is not in the snapshot.")
+        return idx
+
+    def _is_free(self, idx: int, start: int, end: int) -> bool:
+        arrays = self.__arrays
+        if not arrays["available"][idx]:
+            return False
+        lo, hi = arrays["offsets"][idx], arrays["offsets"][idx + 1]
+        pos = bisect_right(arrays["ends"], start, lo, hi)
+        return pos == hi or arrays["starts"][pos] >= end
+
+    def is_free(self, room_number: int, check_in: date, check_out: date) -> bool:
+        """Returns True if the room is free for [check_in, check_out)."""
+        room = self.__rooms.get(room_number)
+        if room is not None:
+            return room.is_available_for(check_in, check_out)
+        return self._is_free(self._index(room_number), check_in.toordinal(), check_out.toordinal())
+
+    def _bitmaps(self) -> tuple:
+        """
+        Returns (in-service rooms, {type id: rooms}, {amenity bit: rooms}, {night: reserved rooms}),
+        each a bitmap over room positions, building them on first use.
+        """
+        if self.__bitmaps is not None:
+            return self.__bitmaps
+        arrays = self.__arrays
+        available, by_type, by_amenity = 0, {}, {}
+        for idx, (type_id, mask, in_service) in enumerate(zip(arrays["type_ids"], arrays["amenities"],
+                                                                arrays["available"])):
+            bit = 1 << idx
+            if in_service:
+                available |= bit
+            by_type[type_id] = by_type.get(type_id, 0) | bit
+            for amenity in set_bits(mask):
+                by_amenity[amenity] = by_amenity.get(amenity, 0) | bit
+        # A room's reservations never overlap, so toggling its bit on the check-in and
+        # check-out nights and XOR-ing the toggles in night order gives each night's bitmap.
+        toggles = {}
+        offsets, starts, ends = arrays["offsets"], arrays["starts"], arrays["ends"]
+        for idx in range(len(arrays["room_numbers"])):
+            bit = 1 << idx
+            for pos in range(offsets[idx], offsets[idx + 1]):
+                toggles[starts[pos]] = toggles.get(starts[pos], 0) ^ bit
+                toggles[ends[pos]] = toggles.get(ends[pos], 0) ^ bit
+        reserved, current = {}, 0
+        nights = sorted(toggles)
+        for night, following in zip(nights, nights[1:]):
+            current ^= toggles[night]
+            if current:
+                for day in range(night, following):
+                    reserved[day] = current
+        self.__bitmaps = (available, by_type, by_amenity, reserved)
+        return self.__bitmaps
+
+    def free_rooms(self, check_in: date, check_out: date, room_type: str = None, amenities: list = None):
+        """Yields the numbers of rooms free for [check_in, check_out) that match the filters, in order."""
+        start, end = check_in.toordinal(), check_out.toordinal()
+        available, by_type, by_amenity, reserved = self._bitmaps()
+        candidates = (1 << len(self)) - 1
+        if room_type is not None:
+            if room_type not in self.__types:
+                return
+            candidates &= by_type.get(self.__types.index(room_type), 0)
+        for amenity in amenities or []:
+            if amenity not in self.__amenities:
+                return
+            candidates &= by_amenity.get(self.__amenities.index(amenity), 0)
+        taken = 0
+        for night in range(start, end):
+            taken |= reserved.get(night, 0)
+        free = candidates & available & ~taken & ~self.__materialized
+        # Materialized rooms are answered from their live schedules instead.
+        numbers = self.__arrays["room_numbers"]
+        for idx in set_bits(candidates & self.__materialized):
+            if self.__rooms[numbers[idx]].is_available_for(check_in, check_out):
+                free |= 1 << idx
+        for idx in set_bits(free):
+            yield numbers[idx]
+
+    def get_room(self, room_number: int) -> Room:
+        """Returns the Room for a room number, building it and its schedule on first access."""
+        room = self.__rooms.get(room_number)
+        if room is not None:
+            return room
+        idx = self._index(room_number)
+        arrays = self.__arrays
+        mask = arrays["amenities"][idx]
+        amenities = [name for bit, name in enumerate(self.__amenities) if mask >> bit & 1]
+        room = Room(room_number, self.__types[arrays["type_ids"][idx]], amenities,
+                    arrays["prices"][idx], bool(arrays["available"][idx]))
+        schedule = room.get_schedule()
+        for pos in range(arrays["offsets"][idx], arrays["offsets"][idx + 1]):
+            schedule.reserve(date.fromordinal(arrays["starts"][pos]), date.fromordinal(arrays["ends"][pos]),
+                             arrays["booking_ids"][pos])
+        self.__rooms[room_number] = room
+        self.__materialized |= 1 << idx
+        return room
+
+    def get_room_numbers(self) -> memoryview:
+        """Returns the sorted room numbers as a zero-copy view."""
+        return self.__arrays["room_numbers"]
+
+    def get_booking_count(self) -> int:
+        return len(self.__arrays["starts"])
+
+    def close(self) -> None:
+        """Releases the mapping; materialized Room objects stay usable."""
+        for view in self.__arrays.values():
+            view.release()
+        self.__view.release()
+        self.__map.close()
+        self.__handle.close()
+
+    def __len__(self) -> int:
+        return len(self.__arrays["room_numbers"])
+
+    def __str__(self) -> str:
+        return f"InventorySnapshot: {len(self)} room(s), {self.get_booking_count()} reservation(s)"
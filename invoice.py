@@ -4,12 +4,15 @@ Defines the Invoice class for the hotel management system.
 """
 
 from booking import Booking
+from metrics import timer
 
 class Invoice:
     """
     The Invoice class represents a billing record generated for a booking.
     """
 
+    __slots__ = ("__invoice_id", "__booking", "__total")
+
     def __init__(self, invoice_id: int, booking: Booking, total: float = 0.0):
         """
         Initializes a new Invoice object.
@@ -22,14 +25,27 @@ class Invoice:
         self.__booking = booking
         self.__total = total
 
-    def generate_invoice(self) -> str:
+    def generate_invoice(self, pricing=None) -> str:
         """
         Generates a summary of charges based on the booking and returns it as a string.
+
+        :param pricing: An optional PricingEngine; when given, the total is the sum of
+                        its nightly rates instead of nights times the room's base price.
+        """
+        with timer("invoice.generate"):
+            if pricing is not None:
+                self.__total = pricing.quote_booking(self.__booking)
+                return self.render()
+            # Example logic: total might be based on room price, nights, plus fees
+            nights = (self.__booking.get_check_out() - self.__booking.get_check_in()).days
+            room_price = self.__booking.get_room().get_price_per_night()
+            self.__total = nights * room_price
+            return self.render()
+
+    def render(self) -> str:
+        """
+        Returns the invoice text for the current total without recomputing it.
         """
-        # Example logic: total might be based on room price, nights, plus fees
-        nights = (self.__booking.get_check_out() - self.__booking.get_check_in()).days
-        room_price = self.__booking.get_room().get_price_per_night()
-        self.__total = nights * room_price
         return (
             f"Invoice #{self.__invoice_id}\n"
             f"Booking ID: {self.__booking.get_booking_id()}\n"
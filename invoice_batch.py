@@ -0,0 +1,93 @@
+"""
+invoice_batch.py
+Defines the InvoiceBatch class for end-of-day billing runs.
+"""
+
+from array import array
+from datetime import date
+from operator import mul, sub
+from booking import Booking
+from invoice import Invoice
+from room import Room
+
+class InvoiceBatch:
+    """
+    The InvoiceBatch class bills a sequence of bookings in one run. Dates and
+    prices are pulled into flat arrays once, nights and totals are computed
+    column-wise with map() over those arrays, and Invoice objects and their text
+    are only built when a consumer asks for them.
+    """
+
+    __slots__ = ("__bookings", "__first_invoice_id", "__nights", "__totals")
+
+    def __init__(self, bookings: list, first_invoice_id: int, pricing=None):
+        """
+        Initializes a new InvoiceBatch and computes every total.
+
+        :param bookings: The bookings to invoice.
+        :param first_invoice_id: The invoice ID given to the first booking; the
+                                 following bookings get consecutive IDs.
+        :param pricing: An optional PricingEngine that prices each night of a stay;
+                        without it every night costs the room's base price.
+        """
+        self.__bookings = list(bookings)
+        self.__first_invoice_id = first_invoice_id
+        check_ins = array("l", map(date.toordinal, map(Booking.get_check_in, self.__bookings)))
+        check_outs = array("l", map(date.toordinal, map(Booking.get_check_out, self.__bookings)))
+        prices = array("d", map(Room.get_price_per_night, map(Booking.get_room, self.__bookings)))
+        self.__nights = array("l", map(sub, check_outs, check_ins))
+        if pricing is None:
+            self.__totals = array("d", map(mul, self.__nights, prices))
+        else:
+            self.__totals = array("d", map(pricing.quote_booking, self.__bookings))
+
+    def get_invoice(self, index: int) -> Invoice:
+        """Returns the Invoice for the booking at the given position in the batch."""
+        return Invoice(self.__first_invoice_id + index, self.__bookings[index], self.__totals[index])
+
+    def invoices(self):
+        """Yields an Invoice for every booking in the batch, in order."""
+        for index in range(len(self.__bookings)):
+            yield self.get_invoice(index)
+
+    def render(self):
+        """Yields the text of every invoice in the batch, in order."""
+        for invoice in self.invoices():
+            yield invoice.render()
+
+    def write(self, stream, chunk_size: int = 1000) -> int:
+        """
+        Renders every invoice into a text stream, writing chunk_size invoices per call.
+
+        :return: The number of invoices written.
+        """
+        chunk = []
+        written = 0
+        for text in self.render():
+            chunk.append(text)
+            if len(chunk) >= chunk_size:
+                stream.write("\n".join(chunk) + "\n")
+                written += len(chunk)
+                chunk.clear()
+        if chunk:
+            stream.write("\n".join(chunk) + "\n")
+            written += len(chunk)
+        return written
+
+    def get_nights(self) -> array:
+        """Returns the number of nights of each booking."""
+        return self.__nights
+
+    def get_totals(self) -> array:
+        """Returns the invoice total of each booking."""
+        return self.__totals
+
+    def get_grand_total(self) -> float:
+        """Returns the sum of all invoice totals in the batch."""
+        return sum(self.__totals)
+
+    def __len__(self) -> int:
+        return len(self.__bookings)
+
+    def __str__(self) -> str:
+        return f"InvoiceBatch of {len(self.__bookings)} invoice(s), total {self.get_grand_total()}"
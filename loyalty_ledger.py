@@ -0,0 +1,170 @@
+"""
+loyalty_ledger.py
+Defines the LoyaltyLedger class, the append-only loyalty points ledger of the hotel management system.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger_entries (
+    entry_id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    account    TEXT NOT NULL,
+    delta      INTEGER NOT NULL,
+    kind       TEXT NOT NULL,
+    reason     TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ledger_account ON ledger_entries(account, entry_id);
+CREATE TABLE IF NOT EXISTS ledger_snapshots (
+    account       TEXT PRIMARY KEY,
+    balance       INTEGER NOT NULL,
+    last_entry_id INTEGER NOT NULL
+);
+"""
+
+class LoyaltyLedger:
+    """
+    The LoyaltyLedger class records every change to a points balance as an
+    immutable entry and never updates balances in place. A balance is the
+    latest snapshot plus the entries written after it; balances are cached in
+    memory after the first read, and an account is re-snapshotted every
+    snapshot_every entries so a cold read only replays a short tail.
+
+    The cache assumes this object is the only writer of its database: entries
+    written by another process or LoyaltyLedger are not seen until invalidate()
+    is called.
+    """
+
+    def __init__(self, path: str = "loyalty_ledger.db", snapshot_every: int = 100):
+        """
+        Opens (and if needed creates) a LoyaltyLedger.
+
+        :param path: The SQLite database file, or ":memory:".
+        :param snapshot_every: The number of entries after which an account's balance is snapshotted.
+        """
+        self.__conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.__conn.execute("PRAGMA journal_mode=WAL")
+        self.__conn.executescript(_SCHEMA)
+        self.__snapshot_every = snapshot_every
+        self.__lock = threading.RLock()
+        self.__balances = {}   # account -> balance
+        self.__tails = {}      # account -> entries since the last snapshot
+
+    def _load(self, account: str) -> int:
+        """Rebuilds an account's balance from its snapshot and the entries after it."""
+        row = self.__conn.execute(
+            "SELECT balance, last_entry_id FROM ledger_snapshots WHERE account = ?", (account,)).fetchone()
+        balance, last_entry_id = row if row else (0, 0)
+        tail_sum, tail_count = self.__conn.execute(
+            "SELECT COALESCE(SUM(delta), 0), COUNT(*) FROM ledger_entries WHERE account = ? AND entry_id > ?",
+            (account, last_entry_id)).fetchone()
+        self.__balances[account] = balance + tail_sum
+        self.__tails[account] = tail_count
+        return self.__balances[account]
+
+    def get_balance(self, account: str) -> int:
+        """Returns the current points balance of an account."""
+        with self.__lock:
+            balance = self.__balances.get(account)
+            return self._load(account) if balance is None else balance
+
+    def invalidate(self, account: str = None) -> None:
+        """Drops the cached balance of an account, or of every account, so the next read reloads it."""
+        with self.__lock:
+            if account is None:
+                self.__balances.clear()
+                self.__tails.clear()
+            else:
+                self.__balances.pop(account, None)
+                self.__tails.pop(account, None)
+
+    def has_account(self, account: str) -> bool:
+        """Returns True if the account has any ledger entries."""
+        with self.__lock:
+            return self.__conn.execute(
+                "SELECT 1 FROM ledger_entries WHERE account = ? LIMIT 1", (account,)).fetchone() is not None
+
+    def record(self, account: str, delta: int, kind: str, reason: str = None) -> int:
+        """
+        Appends one entry and returns the new balance.
+
+        :param kind: The entry kind (e.g. "accrual", "redemption", "adjustment", "opening").
+        :raises ValueError: If the entry would make the balance negative.
+        """
+        with self.__lock:
+            balance = self.get_balance(account) + delta
+            if balance < 0:
+                raise ValueError(f"Insufficient points in {account}: balance would be {balance}.")
+            with self.__conn:
+                cursor = self.__conn.execute(
+                    "INSERT INTO ledger_entries (account, delta, kind, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (account, delta, kind, reason, datetime.now().isoformat(timespec="seconds")))
+                self._after_write(account, balance, cursor.lastrowid)
+            return balance
+
+    def _after_write(self, account: str, balance: int, entry_id: int) -> None:
+        """Updates the cache and snapshots the account if its tail has grown long enough."""
+        self.__balances[account] = balance
+        self.__tails[account] = self.__tails.get(account, 0) + 1
+        if self.__tails[account] >= self.__snapshot_every:
+            self.__conn.execute("INSERT OR REPLACE INTO ledger_snapshots VALUES (?, ?, ?)",
+                                (account, balance, entry_id))
+            self.__tails[account] = 0
+
+    def accrue_many(self, accruals, reason: str = None) -> int:
+        """
+        Appends accrual entries for many accounts in one transaction, e.g. after the
+        nightly invoice run.
+
+        :param accruals: An iterable of (account, points) pairs.
+        :return: The number of entries written.
+        :raises ValueError: If any points amount is not positive; nothing is written then.
+        """
+        stamp = datetime.now().isoformat(timespec="seconds")
+        accruals = list(accruals)
+        for account, points in accruals:
+            if points <= 0:
+                raise ValueError(f"Accrued points must be positive, got {points} for {account}.")
+        with self.__lock, self.__conn:
+            for account in {account for account, _ in accruals}:
+                self.get_balance(account)
+            for account, points in accruals:
+                cursor = self.__conn.execute(
+                    "INSERT INTO ledger_entries (account, delta, kind, reason, created_at) "
+                    "VALUES (?, ?, 'accrual', ?, ?)", (account, points, reason, stamp))
+                self._after_write(account, self.__balances[account] + points, cursor.lastrowid)
+        return len(accruals)
+
+    def snapshot_all(self) -> int:
+        """Snapshots every cached account with unsnapshotted entries; returns how many were written."""
+        with self.__lock, self.__conn:
+            last_entry_id = self.__conn.execute("SELECT COALESCE(MAX(entry_id), 0) FROM ledger_entries").fetchone()[0]
+            dirty = [account for account, tail in self.__tails.items() if tail]
+            self.__conn.executemany("INSERT OR REPLACE INTO ledger_snapshots VALUES (?, ?, ?)",
+                                    ((account, self.__balances[account], last_entry_id) for account in dirty))
+            for account in dirty:
+                self.__tails[account] = 0
+            return len(dirty)
+
+    def history(self, account: str):
+        """Yields (entry_id, delta, kind, reason, created_at) for every entry of an account, oldest first."""
+        with self.__lock:
+            rows = self.__conn.execute(
+                "SELECT entry_id, delta, kind, reason, created_at FROM ledger_entries "
+                "WHERE account = ? ORDER BY entry_id", (account,)).fetchall()
+        yield from rows
+
+    def audit(self, account: str) -> bool:
+        """Returns True if replaying the account's full history reproduces its current balance."""
+        return sum(entry[1] for entry in self.history(account)) == self.get_balance(account)
+
+    def close(self) -> None:
+        """Writes pending snapshots and closes the ledger."""
+        self.snapshot_all()
+        self.__conn.close()
+
+    def __str__(self) -> str:
+        return f"LoyaltyLedger with {len(self.__balances)} cached account(s)"
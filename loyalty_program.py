@@ -3,11 +3,36 @@ loyalty_program.py
 Defines the LoyaltyProgram class for the hotel management system.
 """
 
+from event_log import WARNING, emit
+from loyalty_ledger import LoyaltyLedger
+
 class LoyaltyProgram:
     """
     The LoyaltyProgram class tracks loyalty points and tier status for a guest.
+    Once a LoyaltyLedger is attached, every points change is appended to the
+    ledger instead of overwriting the balance. Listeners registered with
+    add_listener() are called as listener("points_changed", program) after
+    every points change.
     """
 
+    __slots__ = ("__points", "__tier", "__ledger", "__account")
+
+    __listeners = []
+
+    @classmethod
+    def add_listener(cls, listener) -> None:
+        """Registers a callable to be notified of points changes."""
+        cls.__listeners.append(listener)
+
+    @classmethod
+    def remove_listener(cls, listener) -> None:
+        """Unregisters a previously added listener."""
+        cls.__listeners.remove(listener)
+
+    def _notify(self, event: str) -> None:
+        for listener in LoyaltyProgram.__listeners:
+            listener(event, self)
+
     def __init__(self, points: int = 0, tier: str = "Basic"):
         """
         Initializes a new LoyaltyProgram object.
@@ -17,30 +42,90 @@ class LoyaltyProgram:
         """
         self.__points = points
         self.__tier = tier
+        self.__ledger = None
+        self.__account = None
+
+    def attach_ledger(self, ledger: LoyaltyLedger, account: str) -> None:
+        """
+        Moves the points balance into a LoyaltyLedger account. A new account is
+        opened with the current points; an existing account keeps its ledger balance.
+
+        :param ledger: The LoyaltyLedger to record points changes in.
+        :param account: The ledger account, usually the guest's email.
+        """
+        if not ledger.has_account(account):
+            ledger.record(account, self.__points, "opening")
+        self.__ledger = ledger
+        self.__account = account
+        self.__points = ledger.get_balance(account)
+
+    def _apply(self, delta: int, kind: str) -> None:
+        """Applies a points change, through the ledger when one is attached."""
+        if self.__ledger is not None:
+            self.__points = self.__ledger.record(self.__account, delta, kind)
+        else:
+            self.__points += delta
+        self._notify("points_changed")
 
     def add_points(self, amount: int) -> None:
         """
         Adds loyalty points to the guest's account.
         """
-        self.__points += amount
-        print(f"Added {amount} points. Total now: {self.__points}")
+        self._apply(amount, "accrual")
+        emit("loyalty.points_added", "Added {amount} points. Total now: {balance}",
+             account=self.__account, amount=amount, balance=self.__points)
+
+    @classmethod
+    def accrue_many(cls, accruals, reason: str = None) -> None:
+        """
+        Adds points to many programs, e.g. after the nightly invoice run. The
+        entries of each attached LoyaltyLedger are written in one transaction
+        instead of one per program.
+
+        :param accruals: An iterable of (LoyaltyProgram, points) pairs.
+        :param reason: The reason recorded with the ledger entries.
+        """
+        accruals = list(accruals)
+        by_ledger = {}
+        for program, amount in accruals:
+            if program.__ledger is not None:
+                by_ledger.setdefault(program.__ledger, []).append((program.__account, amount))
+        for ledger, entries in by_ledger.items():
+            ledger.accrue_many(entries, reason)
+        for program, amount in accruals:
+            if program.__ledger is not None:
+                program.__points = program.__ledger.get_balance(program.__account)
+            else:
+                program.__points += amount
+            program._notify("points_changed")
+            emit("loyalty.points_added", "Added {amount} points. Total now: {balance}",
+                 account=program.__account, amount=amount, balance=program.__points)
 
     def redeem(self, amount: int) -> None:
         """
         Redeems a certain number of points if available.
         """
-        if amount <= self.__points:
-            self.__points -= amount
-            print(f"Redeemed {amount} points. Remaining: {self.__points}")
+        if amount <= self.get_points():
+            self._apply(-amount, "redemption")
+            emit("loyalty.points_redeemed", "Redeemed {amount} points. Remaining: {balance}",
+                 account=self.__account, amount=amount, balance=self.__points)
         else:
-            print("Not enough points to redeem.")
+            emit("loyalty.redeem_rejected", "Not enough points to redeem.", WARNING,
+                 account=self.__account, amount=amount, balance=self.__points)
 
     def get_points(self) -> int:
         """Returns the current loyalty points."""
+        if self.__ledger is not None:
+            self.__points = self.__ledger.get_balance(self.__account)
         return self.__points
 
     def set_points(self, new_points: int) -> None:
-        self.__points = new_points
+        """Sets the balance; with a ledger attached this is recorded as an adjustment entry."""
+        self._apply(new_points - self.get_points(), "adjustment")
+
+    def get_ledger(self) -> LoyaltyLedger:
+        """Returns the attached LoyaltyLedger, or None."""
+        return self.__ledger
 
     def get_tier(self) -> str:
         """Returns the current loyalty tier."""
@@ -50,4 +135,4 @@ class LoyaltyProgram:
         self.__tier = new_tier
 
     def __str__(self) -> str:
-        return f"Loyalty Program: {self.__tier} Tier with {self.__points} points."
+        return f"Loyalty Program: {self.__tier} Tier with {self.get_points()} points."
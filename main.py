@@ -9,14 +9,18 @@ payment processing, reservation history display, guest interaction, and cancella
 from datetime import date
 from guest import Guest
 from room import Room
+from room_inventory import RoomInventory
 from booking import Booking
 from invoice import Invoice
 from credit_card_payment import CreditCardPayment
 from loyalty_program import LoyaltyProgram
 from guest_interaction import GuestInteraction
+from guest_history import GuestHistoryIndex
 
 def test_donald_trump():
     print("===== Test Case: Donald Trump =====")
+    history = GuestHistoryIndex()
+    Booking.add_listener(history.on_booking_event)
     # Guest Account Creation with Loyalty Program
     loyalty_donald = LoyaltyProgram(points=500, tier="Gold")
     # Exception Handling: Try redeeming too many points
@@ -28,7 +32,13 @@ def test_donald_trump():
     donald.create_account()
     
     # Searching for Available Rooms and Making a Reservation
-    room1 = Room(room_number=101, room_type="Suite", amenities=["Wi-Fi", "TV", "Mini-bar"], price_per_night=300.0)
+    inventory = RoomInventory([
+        Room(room_number=101, room_type="Suite", amenities=["Wi-Fi", "TV", "Mini-bar"], price_per_night=300.0),
+        Room(room_number=102, room_type="Double", amenities=["Wi-Fi", "TV"], price_per_night=200.0),
+    ])
+    room1 = next(inventory.search(date(2025, 4, 1), date(2025, 4, 5), room_type="Suite",
+                                  amenities=["Wi-Fi", "Mini-bar"], max_price=350.0))
+    print(f"Found: {room1}")
     booking1 = Booking(booking_id=1, guest=donald, room=room1,
                        check_in=date(2025, 4, 1), check_out=date(2025, 4, 5))
     booking1.confirm_booking()
@@ -44,7 +54,7 @@ def test_donald_trump():
         print("Payment processed successfully for Donald Trump.")
     
     # Displaying Reservation History
-    donald.view_history()
+    donald.view_history(history)
     
     # Guest Interaction: Feedback Submission
     interaction1 = GuestInteraction(interaction_id=101, guest=donald,
@@ -56,11 +66,14 @@ def test_donald_trump():
                              check_in=date(2025, 4, 10), check_out=date(2025, 4, 12))
     booking_cancel.confirm_booking()
     booking_cancel.cancel_booking()
+    Booking.remove_listener(history.on_booking_event)
     print("===================================\n")
 
 
 def test_joe_biden():
     print("===== Test Case: Joe Biden =====")
+    history = GuestHistoryIndex()
+    Booking.add_listener(history.on_booking_event)
     # Guest Account Creation with Loyalty Program
     loyalty_joe = LoyaltyProgram(points=300, tier="Silver")
     # Exception Handling: Try redeeming too many points
@@ -88,7 +101,7 @@ def test_joe_biden():
         print("Payment processed successfully for Joe Biden.")
     
     # Displaying Reservation History
-    joe.view_history()
+    joe.view_history(history)
     
     # Guest Interaction: Service Request Submission
     interaction2 = GuestInteraction(interaction_id=102, guest=joe,
@@ -97,6 +110,7 @@ def test_joe_biden():
     
     # Cancellation of a Reservation
     booking2.cancel_booking()
+    Booking.remove_listener(history.on_booking_event)
     print("===================================\n")
 
 
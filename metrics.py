@@ -0,0 +1,384 @@
+"""
+metrics.py
+Defines the MetricsRegistry class, the counters, latency histograms and operation timers
+of the hotel management system.
+"""
+
+import cProfile
+import io
+import math
+import pstats
+import threading
+import time
+import tracemalloc
+
+class Histogram:
+    """
+    The Histogram class records values in log-linear buckets, HDR style: each
+    power of two is split into SUB_BUCKETS equal buckets, so every recorded value
+    is known to within about 1/SUB_BUCKETS of itself (~6%) whatever its magnitude,
+    with a fixed, small number of buckets.
+    """
+
+    SUB_BUCKETS = 16
+
+    def __init__(self):
+        """Initializes an empty Histogram."""
+        self.__buckets = {}   # bucket index -> count
+        self.__count = 0
+        self.__sum = 0.0
+        self.__min = math.inf
+        self.__max = -math.inf
+
+    def _index(self, value: float) -> int:
+        if value <= 0:
+            return -1 << 30
+        mantissa, exponent = math.frexp(value)   # value = mantissa * 2**exponent, 0.5 <= mantissa < 1
+        return exponent * self.SUB_BUCKETS + int((mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+
+    def _upper(self, index: int) -> float:
+        """Returns the upper bound of a bucket."""
+        if index == -1 << 30:
+            return 0.0
+        exponent, sub = divmod(index, self.SUB_BUCKETS)
+        return math.ldexp(0.5 + (sub + 1) / (2 * self.SUB_BUCKETS), exponent)
+
+    def record(self, value: float) -> None:
+        index = self._index(value)
+        self.__buckets[index] = self.__buckets.get(index, 0) + 1
+        self.__count += 1
+        self.__sum += value
+        self.__min = min(self.__min, value)
+        self.__max = max(self.__max, value)
+
+    def percentile(self, q: float) -> float:
+        """Returns the upper bound of the bucket holding the q-th quantile (0 <= q <= 1)."""
+        if not self.__count:
+            return 0.0
+        rank = max(math.ceil(q * self.__count), 1)
+        seen = 0
+        for index in sorted(self.__buckets):
+            seen += self.__buckets[index]
+            if seen >= rank:
+                return min(self._upper(index), self.__max)
+        return self.__max
+
+    def get_buckets(self) -> list:
+        """Returns (upper bound, count) pairs for the non-empty buckets, in order."""
+        return [(self._upper(index), self.__buckets[index]) for index in sorted(self.__buckets)]
+
+    def get_count(self) -> int:
+        return self.__count
+
+    def get_sum(self) -> float:
+        return self.__sum
+
+    def summary(self) -> dict:
+        """Returns the count, sum, min, max, mean and p50/p90/p99 of the recorded values."""
+        if not self.__count:
+            return {"count": 0}
+        return {"count": self.__count, "sum": self.__sum, "min": self.__min, "max": self.__max,
+                "mean": self.__sum / self.__count, "p50": self.percentile(0.5),
+                "p90": self.percentile(0.9), "p99": self.percentile(0.99)}
+
+
+class _NullTimer:
+    """The timer handed out while metrics are disabled; it does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """
+    Times one run of an operation and, when the operation is armed, profiles it.
+    Instrumentation failures are swallowed so they never reach the timed code.
+    """
+
+    __slots__ = ("__registry", "__name", "__start", "__profiler")
+
+    def __init__(self, registry, name: str, profiler):
+        self.__registry = registry
+        self.__name = name
+        self.__profiler = profiler
+        self.__start = 0
+
+    def __enter__(self):
+        try:
+            if self.__profiler is not None and not self.__registry._begin_profile(self.__profiler):
+                self.__profiler = None
+        except Exception:
+            self.__profiler = None
+        self.__start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        elapsed = (time.perf_counter_ns() - self.__start) / 1e9
+        try:
+            self.__registry._finish(self.__name, elapsed, exc_type is not None, self.__profiler)
+        except Exception:
+            pass
+
+
+class _Profiler:
+    """
+    Collects a cProfile or tracemalloc profile over a number of runs of one operation.
+    Only one run is profiled at a time (the registry skips runs that overlap it), so
+    start() and stop() always pair up on the same thread.
+    """
+
+    # tracemalloc is process-wide: it is started for the first profiled run in
+    # flight and stopped after the last, unless something else had started it.
+    _tracing_lock = threading.Lock()
+    _tracing_runs = 0
+    _started_tracing = False
+
+    def __init__(self, kind: str, runs: int):
+        if kind not in ("cprofile", "tracemalloc"):
+            raise ValueError(f"Unknown profiler {kind!r}; use 'cprofile' or 'tracemalloc'.")
+        self.kind = kind
+        self.remaining = runs
+        self.running = False
+        self.profile = cProfile.Profile() if kind == "cprofile" else None
+        self.snapshots = []
+        self.__before = None
+
+    def start(self) -> None:
+        if self.profile is not None:
+            self.profile.enable()
+            return
+        with _Profiler._tracing_lock:
+            if _Profiler._tracing_runs == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _Profiler._started_tracing = True
+            _Profiler._tracing_runs += 1
+        try:
+            self.__before = self._snapshot()
+        except Exception:
+            self._release_tracing()
+            raise
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+
+    @staticmethod
+    def _release_tracing() -> None:
+        with _Profiler._tracing_lock:
+            _Profiler._tracing_runs -= 1
+            if _Profiler._tracing_runs == 0 and _Profiler._started_tracing:
+                _Profiler._started_tracing = False
+                tracemalloc.stop()
+
+    def stop(self) -> None:
+        if self.profile is not None:
+            self.profile.disable()
+            return
+        try:
+            self.snapshots.append(self._snapshot().compare_to(self.__before, "lineno"))
+        finally:
+            self.__before = None
+            self._release_tracing()
+
+    def report(self, top: int) -> str:
+        if self.profile is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).sort_stats("cumulative").print_stats(top)
+            return stream.getvalue()
+        totals = {}
+        for differences in self.snapshots:
+            for stat in differences:
+                key = str(stat.traceback)
+                totals[key] = totals.get(key, 0) + stat.size_diff
+        ranked = sorted(totals.items(), key=lambda item: abs(item[1]), reverse=True)[:top]
+        return "\n".join(f"{size:+d} B  {where}" for where, size in ranked)
+
+
+class MetricsRegistry:
+    """
+    The MetricsRegistry class holds named counters and latency histograms.
+    Operations are wrapped in timer(name), which records the run time in the
+    "name" histogram and counts failures in "name.errors". While the registry is
+    disabled, timer() returns a shared do-nothing timer and increment() returns
+    at once, so instrumented hot paths pay only an attribute check.
+
+    profile(name) attaches cProfile or tracemalloc to the next runs of one named
+    operation, even while timing is disabled.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        Initializes an empty MetricsRegistry.
+
+        :param enabled: Whether timers and counters record from the start.
+        """
+        self.__enabled = enabled
+        self.__counters = {}
+        self.__histograms = {}
+        self.__profilers = {}   # operation -> armed _Profiler
+        self.__reports = {}     # operation -> finished profile report
+        self.__lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.__enabled = True
+
+    def disable(self) -> None:
+        self.__enabled = False
+
+    def is_enabled(self) -> bool:
+        return self.__enabled
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Adds to a counter."""
+        if not self.__enabled:
+            return
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float) -> None:
+        """Records a value (e.g. a latency in seconds) in a histogram."""
+        if not self.__enabled:
+            return
+        with self.__lock:
+            histogram = self.__histograms.get(name)
+            if histogram is None:
+                histogram = self.__histograms[name] = Histogram()
+            histogram.record(value)
+
+    def timer(self, name: str):
+        """Returns a context manager that times one run of the named operation."""
+        if not self.__enabled and not self.__profilers:
+            return _NULL_TIMER
+        return _Timer(self, name, self.__profilers.get(name))
+
+    def _begin_profile(self, profiler: _Profiler) -> bool:
+        """
+        Starts a profiled run on the calling thread.
+
+        :return: False if another thread's run of the profiler is in flight or it has
+                 all its runs, in which case this run is timed but not profiled.
+        """
+        with self.__lock:
+            if profiler.running or profiler.remaining <= 0:
+                return False
+            profiler.running = True
+        try:
+            profiler.start()
+        except Exception:
+            with self.__lock:
+                profiler.running = False
+            return False
+        return True
+
+    def _finish(self, name: str, elapsed: float, failed: bool, profiler: _Profiler = None) -> None:
+        self.observe(name, elapsed)
+        if failed:
+            self.increment(name + ".errors")
+        if profiler is None:
+            return
+        try:
+            profiler.stop()
+            stopped = True
+        except Exception:
+            stopped = False
+        with self.__lock:
+            profiler.running = False
+            if stopped:
+                profiler.remaining -= 1
+            if profiler.remaining <= 0 and self.__profilers.get(name) is profiler:
+                del self.__profilers[name]
+                self.__reports[name] = profiler
+
+    def profile(self, name: str, kind: str = "cprofile", runs: int = 100) -> None:
+        """
+        Profiles the next runs of a named operation.
+
+        :param kind: "cprofile" for a call profile or "tracemalloc" for allocations.
+        :param runs: The number of runs to profile; get_profile() reports once they are done.
+        """
+        profiler = _Profiler(kind, runs)
+        with self.__lock:
+            self.__reports.pop(name, None)
+            self.__profilers[name] = profiler
+
+    def get_profile(self, name: str, top: int = 20) -> str:
+        """Returns the report of a finished profile, or None if none has finished."""
+        with self.__lock:
+            profiler = self.__reports.get(name)
+        return profiler.report(top) if profiler is not None else None
+
+    def get_counter(self, name: str) -> int:
+        return self.__counters.get(name, 0)
+
+    def get_histogram(self, name: str) -> Histogram:
+        """Returns a histogram, or None if nothing was recorded under that name."""
+        return self.__histograms.get(name)
+
+    def snapshot(self) -> dict:
+        """Returns the counters and a summary of every histogram."""
+        with self.__lock:
+            return {"counters": dict(self.__counters),
+                    "histograms": {name: histogram.summary() for name, histogram in self.__histograms.items()}}
+
+    def reset(self) -> None:
+        """Clears every counter and histogram."""
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+
+    @staticmethod
+    def _metric_name(name: str) -> str:
+        return "royal_stay_" + "".join(ch if ch.isalnum() else "_" for ch in name)
+
+    def render_prometheus(self) -> str:
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+        with self.__lock:
+            for name, value in sorted(self.__counters.items()):
+                metric = self._metric_name(name) + "_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            for name, histogram in sorted(self.__histograms.items()):
+                metric = self._metric_name(name) + "_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for upper, count in histogram.get_buckets():
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{upper:.9g}"}} {cumulative}')
+                lines += [f'{metric}_bucket{{le="+Inf"}} {histogram.get_count()}',
+                          f"{metric}_sum {histogram.get_sum():.9g}", f"{metric}_count {histogram.get_count()}"]
+        return "\n".join(lines) + "\n"
+
+    def render_text(self) -> str:
+        """Returns a human-readable table of counters and latency percentiles."""
+        snapshot = self.snapshot()
+        lines = [f"{name}: {value}" for name, value in sorted(snapshot["counters"].items())]
+        for name, summary in sorted(snapshot["histograms"].items()):
+            if summary["count"]:
+                lines.append(f"{name}: n={summary['count']} mean={summary['mean'] * 1e6:.1f}us "
+                             f"p50={summary['p50'] * 1e6:.1f}us p99={summary['p99'] * 1e6:.1f}us "
+                             f"max={summary['max'] * 1e6:.1f}us")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        state = "enabled" if self.__enabled else "disabled"
+        return f"MetricsRegistry ({state}) with {len(self.__counters)} counter(s), {len(self.__histograms)} histogram(s)"
+
+
+_registry = MetricsRegistry()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Returns the process-wide MetricsRegistry."""
+    return _registry
+
+
+# Bound methods of the process-wide registry, so instrumented code pays no extra call.
+timer = _registry.timer
+increment = _registry.increment
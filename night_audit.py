@@ -0,0 +1,234 @@
+"""
+night_audit.py
+Defines the NightAudit class, the end-of-day processing run of the hotel management system.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from booking import Booking
+from credit_card_payment import CreditCardPayment
+from invoice import Invoice
+from loyalty_program import LoyaltyProgram
+
+def _card_valid(card_number: str, expiry_date: str, audit_ordinal: int) -> bool:
+    """Returns True if the card number passes the Luhn check and the card has not expired."""
+    digits = [int(ch) for ch in card_number if ch.isdigit()]
+    if not 12 <= len(digits) <= 19:
+        return False
+    checksum = 0
+    for position, digit in enumerate(reversed(digits)):
+        if position % 2:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        checksum += digit
+    if checksum % 10:
+        return False
+    try:
+        month, year = (int(part) for part in expiry_date.split("/"))
+    except ValueError:
+        return False
+    audit_day = date.fromordinal(audit_ordinal)
+    return (2000 + year, month) >= (audit_day.year, audit_day.month)
+
+
+def _is_due(booking: Booking, audit_date: date) -> bool:
+    """Returns True if the audit acts on a booking: a pending arrival that has passed or a checkout."""
+    status = booking.get_status()
+    return ((status == "Pending" and booking.get_check_in() <= audit_date)
+            or (status == "Confirmed" and booking.get_check_out() == audit_date))
+
+
+def _is_checkout(record: tuple, audit_ordinal: int) -> bool:
+    """Returns True if a record is a confirmed stay checking out on the audit date."""
+    return record[5] == "Confirmed" and record[4] == audit_ordinal
+
+
+def _audit_shard(shard: int, records: list, audit_ordinal: int, points_rate: float,
+                 first_invoice_id: int, first_payment_id: int) -> tuple:
+    """
+    Audits one shard of booking records in a worker process: finds no-shows,
+    charges checkouts through CreditCardPayment.process_payment() and adds up
+    the loyalty points each guest earned in the shard.
+
+    A record is (booking_id, room_number, email, check_in, check_out, status,
+    total, card_number, expiry_date) with ordinal dates. A result is
+    ("no-show", booking_id) or ("checkout", booking_id, invoice_id, total, payment),
+    the payment being None for guests without a card on file.
+    """
+    results = []
+    points = {}
+    invoice_id, payment_id = first_invoice_id, first_payment_id
+    for record in records:
+        booking_id, _, email, check_in, _, status, total, card, expiry = record
+        if status == "Pending" and check_in <= audit_ordinal:
+            results.append(("no-show", booking_id))
+        elif _is_checkout(record, audit_ordinal):
+            payment = None
+            if card is not None:
+                payment = CreditCardPayment(payment_id, total, "Credit Card", card, expiry)
+                payment_id += 1
+                if _card_valid(card, expiry, audit_ordinal):
+                    payment.process_payment()
+                else:
+                    payment.set_status("Failed")
+                if payment.get_status() == "Paid":
+                    points[email] = points.get(email, 0) + int(total * points_rate)
+            results.append(("checkout", booking_id, invoice_id, total, payment))
+            invoice_id += 1
+    return shard, results, points, len(records)
+
+
+class NightAudit:
+    """
+    The NightAudit class runs end-of-day processing for a business date: pending
+    bookings whose arrival date has passed become no-shows, and confirmed stays
+    checking out are invoiced, charged to the guest's card, earn loyalty points
+    and become Checked-Out. Audited bookings leave the Pending and Confirmed
+    states, so running the same date again does not invoice or charge twice.
+
+    Only the bookings the audit acts on are flattened to tuples; they are sorted
+    by room number and cut into shards of contiguous room-number ranges that run
+    on a ProcessPoolExecutor. Each shard gets its own range of invoice and payment
+    IDs up front, and workers do the card checks, payment processing and per-guest
+    points sums; the parent only attaches the results to its Booking objects, in
+    shard order, so every output is the same whatever order the workers finish in,
+    and credits all the points with one LoyaltyProgram.accrue_many() call.
+    Booking objects hold locks and cannot be sent to worker processes, so building
+    the records and the Invoice objects stays in the parent.
+    With more than one worker, payment events are emitted from the worker processes.
+
+    Totals are the nights times the room's base price, or the sum of the nightly
+    rates of a PricingEngine when one is given.
+    """
+
+    def __init__(self, workers: int = None, shards_per_worker: int = 4, points_rate: float = 1.0,
+                 pricing=None):
+        """
+        Initializes a new NightAudit.
+
+        :param workers: The number of worker processes (default: one per CPU); 1 runs in-process.
+        :param shards_per_worker: Shards per worker, so faster workers pick up more of the load.
+        :param points_rate: Loyalty points earned per currency unit of a paid invoice.
+        :param pricing: An optional PricingEngine that prices the stays.
+        """
+        self.__workers = workers or os.cpu_count() or 1
+        self.__shards_per_worker = shards_per_worker
+        self.__points_rate = points_rate
+        self.__pricing = pricing
+
+    def _record(self, booking: Booking, cards: dict) -> tuple:
+        card_number, expiry_date = cards.get(booking.get_guest().get_email(), (None, None))
+        check_in, check_out = booking.get_check_in().toordinal(), booking.get_check_out().toordinal()
+        if booking.get_status() != "Confirmed":
+            total = 0.0
+        elif self.__pricing is not None:
+            total = self.__pricing.quote_booking(booking)
+        else:
+            total = round((check_out - check_in) * booking.get_room().get_price_per_night(), 2)
+        return (booking.get_booking_id(), booking.get_room().get_room_number(), booking.get_guest().get_email(),
+                check_in, check_out, booking.get_status(), total, card_number, expiry_date)
+
+    def shard(self, records: list) -> list:
+        """
+        Sorts records by room number and splits them into shards of about equal
+        size; a room's bookings always stay within one shard.
+        """
+        records = sorted(records, key=lambda record: (record[1], record[0]))
+        count = self.__workers * self.__shards_per_worker
+        target = max(-(-len(records) // count), 1)
+        shards, current = [], []
+        for record in records:
+            if len(current) >= target and record[1] != current[-1][1]:
+                shards.append(current)
+                current = []
+            current.append(record)
+        if current:
+            shards.append(current)
+        return shards
+
+    def _jobs(self, shards: list, audit_ordinal: int, first_invoice_id: int, first_payment_id: int) -> list:
+        """Returns the _audit_shard arguments of every shard, with its first invoice and payment IDs."""
+        jobs = []
+        invoice_id, payment_id = first_invoice_id, first_payment_id
+        for i, shard in enumerate(shards):
+            jobs.append((i, shard, audit_ordinal, self.__points_rate, invoice_id, payment_id))
+            for record in shard:
+                if _is_checkout(record, audit_ordinal):
+                    invoice_id += 1
+                    payment_id += record[7] is not None
+        return jobs
+
+    def _execute(self, jobs: list, progress) -> list:
+        """Runs every shard and returns the (results, points) of each in shard order."""
+        merged = [None] * len(jobs)
+        total = sum(len(job[1]) for job in jobs)
+        done = records = 0
+        if self.__workers == 1:
+            completed = (_audit_shard(*job) for job in jobs)
+            for index, results, points, size in completed:
+                merged[index] = (results, points)
+                done, records = done + 1, records + size
+                if progress:
+                    progress(done, len(jobs), records, total)
+            return merged
+        with ProcessPoolExecutor(max_workers=self.__workers) as pool:
+            futures = [pool.submit(_audit_shard, *job) for job in jobs]
+            for future in as_completed(futures):
+                index, results, points, size = future.result()
+                merged[index] = (results, points)
+                done, records = done + 1, records + size
+                if progress:
+                    progress(done, len(jobs), records, total)
+        return merged
+
+    def run(self, bookings, audit_date: date, cards: dict = None, first_invoice_id: int = 1,
+            first_payment_id: int = 1, progress=None) -> dict:
+        """
+        Audits a business date.
+
+        :param bookings: The bookings to examine.
+        :param audit_date: The business date being closed.
+        :param cards: Guest email -> (card number, expiry "MM/YY") used to charge checkouts.
+        :param first_invoice_id: The ID of the first invoice created; the rest follow on.
+        :param first_payment_id: The ID of the first payment created; the rest follow on.
+        :param progress: An optional callable(shards done, shards, bookings done, bookings).
+        :return: A dict with the "no_shows" bookings, "invoices", "payments", "points" earned
+                 per guest email, the number of "shards" and the elapsed "seconds".
+        """
+        began = time.perf_counter()
+        by_id = {booking.get_booking_id(): booking for booking in bookings if _is_due(booking, audit_date)}
+        cards = cards or {}
+        shards = self.shard([self._record(booking, cards) for booking in by_id.values()])
+        jobs = self._jobs(shards, audit_date.toordinal(), first_invoice_id, first_payment_id)
+        merged = self._execute(jobs, progress)
+
+        report = {"audit_date": audit_date, "no_shows": [], "invoices": [], "payments": [], "points": {}}
+        earned = report["points"]
+        for results, points in merged:
+            for result in results:
+                booking = by_id[result[1]]
+                if result[0] == "no-show":
+                    booking.set_status("No-Show")
+                    report["no_shows"].append(booking)
+                    continue
+                _, _, invoice_id, total, payment = result
+                booking.set_status("Checked-Out")
+                report["invoices"].append(Invoice(invoice_id, booking, total))
+                if payment is not None:
+                    report["payments"].append(payment)
+            for email, amount in points.items():
+                earned[email] = earned.get(email, 0) + amount
+        guests = {booking.get_guest().get_email(): booking.get_guest() for booking in by_id.values()}
+        LoyaltyProgram.accrue_many(
+            ((guests[email].get_loyalty_program(), amount) for email, amount in earned.items()
+             if amount > 0 and guests[email].get_loyalty_program() is not None),
+            f"Night audit {audit_date}")
+        report["shards"] = len(shards)
+        report["seconds"] = round(time.perf_counter() - began, 3)
+        return report
+
+    def __str__(self) -> str:
+        return f"NightAudit with {self.__workers} worker(s)"
@@ -0,0 +1,142 @@
+"""
+occupancy_matrix.py
+Defines the OccupancyMatrix class for occupancy and revenue reporting.
+"""
+
+from array import array
+from datetime import date, timedelta
+from booking import Booking
+
+class OccupancyMatrix:
+    """
+    The OccupancyMatrix class stores room-nights as two flat, day-major columns:
+    a bytearray of 0/1 occupancy flags and an array of int64 nightly rates in
+    cents, so revenue sums are exact. A range of days is one contiguous slice of
+    both columns, so occupancy rate, ADR and RevPAR are C-level reductions
+    (bytes.count / sum) rather than Python loops over bookings and nights.
+    10k rooms x 365 days takes about 33 MB.
+    """
+
+    def __init__(self, room_numbers: list, start: date, days: int):
+        """
+        Initializes an empty OccupancyMatrix.
+
+        :param room_numbers: The room numbers covered by the matrix (its columns).
+        :param start: The first date covered by the matrix.
+        :param days: The number of days covered by the matrix.
+        """
+        self.__room_index = {number: i for i, number in enumerate(room_numbers)}
+        self.__start = start.toordinal()
+        self.__days = days
+        width = len(self.__room_index)
+        self.__occupied = bytearray(width * days)
+        self.__rates = array("q", [0]) * (width * days)   # cents
+
+    def _clip(self, first: int, last: int) -> tuple:
+        """Clips an ordinal range [first, last) to the matrix and returns day offsets."""
+        return max(first - self.__start, 0), min(last - self.__start, self.__days)
+
+    def _mark(self, booking: Booking, flag: int) -> None:
+        col = self.__room_index.get(booking.get_room().get_room_number())
+        if col is None:
+            return
+        first, last = self._clip(booking.get_check_in().toordinal(), booking.get_check_out().toordinal())
+        nights = last - first
+        if nights <= 0:
+            return
+        width = len(self.__room_index)
+        lo, hi = first * width + col, last * width
+        # Strided slice assignment writes every night of the stay in one C call.
+        self.__occupied[lo:hi:width] = bytes([flag]) * nights
+        cents = round(booking.get_room().get_price_per_night() * 100) if flag else 0
+        self.__rates[lo:hi:width] = array("q", [cents]) * nights
+
+    def add_booking(self, booking: Booking) -> None:
+        """Marks the nights of a confirmed booking as occupied at the room's nightly rate."""
+        self._mark(booking, 1)
+
+    def remove_booking(self, booking: Booking) -> None:
+        """Clears the nights of a cancelled booking."""
+        self._mark(booking, 0)
+
+    def on_booking_event(self, event: str, booking: Booking) -> None:
+        """
+        Booking listener that keeps the matrix in sync; register it with
+        Booking.add_listener(matrix.on_booking_event).
+        """
+        if event == "confirmed":
+            self.add_booking(booking)
+        elif event == "cancelled":
+            self.remove_booking(booking)
+
+    def _slice(self, start: date, end: date) -> tuple:
+        first, last = self._clip(start.toordinal(), end.toordinal())
+        if last <= first:
+            return 0, 0
+        width = len(self.__room_index)
+        return first * width, last * width
+
+    def rooms_sold(self, start: date, end: date) -> int:
+        """Returns the number of occupied room-nights in [start, end)."""
+        lo, hi = self._slice(start, end)
+        return self.__occupied.count(1, lo, hi)
+
+    def rooms_available(self, start: date, end: date) -> int:
+        """Returns the number of room-nights in [start, end) covered by the matrix."""
+        lo, hi = self._slice(start, end)
+        return hi - lo
+
+    def revenue(self, start: date, end: date) -> float:
+        """Returns the room revenue earned in [start, end)."""
+        lo, hi = self._slice(start, end)
+        return sum(self.__rates[lo:hi]) / 100
+
+    def occupancy_rate(self, start: date, end: date) -> float:
+        """Returns rooms sold divided by rooms available in [start, end)."""
+        available = self.rooms_available(start, end)
+        return self.rooms_sold(start, end) / available if available else 0.0
+
+    def adr(self, start: date, end: date) -> float:
+        """Returns the average daily rate (revenue per room sold) in [start, end)."""
+        sold = self.rooms_sold(start, end)
+        return self.revenue(start, end) / sold if sold else 0.0
+
+    def revpar(self, start: date, end: date) -> float:
+        """Returns the revenue per available room in [start, end)."""
+        available = self.rooms_available(start, end)
+        return self.revenue(start, end) / available if available else 0.0
+
+    def daily_occupancy(self, start: date, end: date) -> list:
+        """Returns the number of occupied rooms for each day in [start, end)."""
+        width = len(self.__room_index)
+        first, last = self._clip(start.toordinal(), end.toordinal())
+        occupied = self.__occupied
+        return [occupied.count(1, day * width, (day + 1) * width) for day in range(first, last)]
+
+    def report(self, start: date, end: date) -> dict:
+        """Returns rooms sold, revenue, occupancy, ADR and RevPAR for [start, end)."""
+        sold = self.rooms_sold(start, end)
+        available = self.rooms_available(start, end)
+        revenue = self.revenue(start, end)
+        return {
+            "start": start,
+            "end": end,
+            "rooms_sold": sold,
+            "rooms_available": available,
+            "revenue": revenue,
+            "occupancy_rate": sold / available if available else 0.0,
+            "adr": revenue / sold if sold else 0.0,
+            "revpar": revenue / available if available else 0.0,
+        }
+
+    def get_start(self) -> date:
+        return date.fromordinal(self.__start)
+
+    def get_end(self) -> date:
+        return date.fromordinal(self.__start) + timedelta(days=self.__days)
+
+    def __str__(self) -> str:
+        return (
+            f"OccupancyMatrix: {len(self.__room_index)} rooms x {self.__days} days "
+            f"from {self.get_start()}"
+        )
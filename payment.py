@@ -8,17 +8,21 @@ class Payment:
     The Payment class is a base class for handling different payment methods.
     """
 
-    def __init__(self, payment_id: int, amount: float, method: str):
+    __slots__ = ("__payment_id", "__amount", "__method", "__status")
+
+    def __init__(self, payment_id: int, amount: float, method: str, status: str = "Pending"):
         """
         Initializes a new Payment object.
 
         :param payment_id: Unique ID for the payment.
         :param amount: The total amount to be paid.
         :param method: The payment method (e.g., "Credit Card", "Cash").
+        :param status: Current status of the payment (Pending, Paid, Failed, Settled, Rejected).
         """
         self.__payment_id = payment_id
         self.__amount = amount
         self.__method = method
+        self.__status = status
 
     def process_payment(self) -> bool:
         """
@@ -26,6 +30,17 @@ class Payment:
         """
         raise NotImplementedError("Subclasses must implement this method.")
 
+    async def process_payment_async(self, gateway) -> bool:
+        """
+        Processes the payment through a PaymentGateway without blocking the event loop.
+        This method is intended to be overridden by subclasses.
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def get_idempotency_key(self) -> str:
+        """Returns the key that identifies this payment to a gateway across retries."""
+        return f"payment-{self.__payment_id}"
+
     # Getters and Setters
     def get_payment_id(self) -> int:
         return self.__payment_id
@@ -42,5 +57,11 @@ class Payment:
     def set_method(self, new_method: str) -> None:
         self.__method = new_method
 
+    def get_status(self) -> str:
+        return self.__status
+
+    def set_status(self, new_status: str) -> None:
+        self.__status = new_status
+
     def __str__(self) -> str:
         return f"Payment #{self.__payment_id} - Method: {self.__method}, Amount: {self.__amount}"
@@ -0,0 +1,105 @@
+"""
+payment_dispatcher.py
+Defines the PaymentDispatcher class for processing many payments concurrently.
+"""
+
+import asyncio
+from payment import Payment
+from payment_gateway import GatewayError, PaymentGateway
+
+class PaymentDispatcher:
+    """
+    The PaymentDispatcher class runs process_payment_async() for many payments at
+    once on an asyncio event loop. A semaphore shared by every dispatch() call
+    bounds the number of in-flight gateway calls, each attempt has a timeout, transient failures are retried
+    with exponential backoff, and payments are de-duplicated by idempotency key
+    so the same payment is never submitted twice by one dispatcher.
+    """
+
+    def __init__(self, gateway: PaymentGateway, concurrency: int = 20, timeout: float = 5.0,
+                 retries: int = 3, backoff: float = 0.1):
+        """
+        Initializes a new PaymentDispatcher.
+
+        :param gateway: The PaymentGateway that payments are charged through.
+        :param concurrency: The maximum number of gateway calls in flight.
+        :param timeout: The time limit in seconds for a single attempt.
+        :param retries: The number of retries after a failed or timed-out attempt.
+        :param backoff: The delay in seconds before the first retry; doubled on each retry.
+        """
+        self.__gateway = gateway
+        self.__concurrency = concurrency
+        self.__timeout = timeout
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__in_flight = {}   # idempotency key -> asyncio.Task
+        self.__paid = set()     # idempotency keys already approved
+        self.__limit = None     # (event loop, asyncio.Semaphore)
+
+    def _limit(self) -> asyncio.Semaphore:
+        """Returns the dispatcher's semaphore for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self.__limit is None or self.__limit[0] is not loop:
+            self.__limit = (loop, asyncio.Semaphore(self.__concurrency))
+        return self.__limit[1]
+
+    async def _process(self, payment: Payment, key: str) -> bool:
+        """
+        Charges one payment and records the outcome. Any error other than the
+        retried GatewayError and timeouts fails the payment; the task never raises.
+        """
+        try:
+            approved = await self._attempts(payment)
+        except Exception:
+            payment.set_status("Failed")
+            approved = False
+        finally:
+            self.__in_flight.pop(key, None)
+        if approved:
+            self.__paid.add(key)
+        return approved
+
+    async def _attempts(self, payment: Payment) -> bool:
+        limit = self._limit()
+        delay = self.__backoff
+        for attempt in range(self.__retries + 1):
+            try:
+                async with limit:
+                    return await asyncio.wait_for(payment.process_payment_async(self.__gateway), self.__timeout)
+            except (GatewayError, asyncio.TimeoutError):
+                if attempt == self.__retries:
+                    payment.set_status("Failed")
+                    return False
+            await asyncio.sleep(delay)
+            delay *= 2
+        return False
+
+    async def dispatch(self, payments: list) -> list:
+        """
+        Processes payments concurrently and returns their results in input order.
+        A payment whose idempotency key is already paid or in flight is not submitted again.
+        """
+        tasks = []
+        for payment in payments:
+            key = payment.get_idempotency_key()
+            if key in self.__paid:
+                tasks.append(None)
+                continue
+            task = self.__in_flight.get(key)
+            if task is None:
+                task = self.__in_flight[key] = asyncio.ensure_future(self._process(payment, key))
+            tasks.append(task)
+        results = []
+        for payment, task in zip(payments, tasks):
+            approved = True if task is None else await task
+            # Duplicates of a payment share its outcome.
+            payment.set_status("Paid" if approved else "Failed")
+            results.append(approved)
+        return results
+
+    def run(self, payments: list) -> list:
+        """Processes payments from synchronous code; see dispatch()."""
+        return asyncio.run(self.dispatch(payments))
+
+    def __str__(self) -> str:
+        return f"PaymentDispatcher (concurrency {self.__concurrency}) via {self.__gateway}"
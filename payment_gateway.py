@@ -0,0 +1,138 @@
+"""
+payment_gateway.py
+Defines the PaymentGateway interface and a local FakeGateway for the hotel management system.
+"""
+
+import asyncio
+import csv
+import os
+import random
+from datetime import datetime
+from payment import Payment
+from credit_card_payment import CreditCardPayment
+
+class GatewayError(Exception):
+    """Raised by a PaymentGateway for a transient failure that may succeed on retry."""
+
+
+class PaymentGateway:
+    """
+    The PaymentGateway class is the base class for payment processors.
+    Subclasses talk to a real processor (or simulate one).
+    """
+
+    async def charge(self, payment: Payment, idempotency_key: str) -> bool:
+        """
+        Charges a payment. Charging the same idempotency key twice must not bill twice.
+
+        :return: True if the charge was approved, False if it was declined.
+        :raises GatewayError: On a transient failure.
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def settle_batch(self, payments: list) -> list:
+        """
+        Submits a batch of charged payments for settlement in one round trip.
+
+        :return: One boolean per payment, True if it was settled.
+        :raises GatewayError: If the whole batch could not be submitted.
+        """
+        raise NotImplementedError("Subclasses must implement this method.")
+
+
+class FakeGateway(PaymentGateway):
+    """
+    The FakeGateway class simulates a remote processor locally: every charge waits
+    for a random latency, a share of calls fail with GatewayError, and results are
+    remembered per idempotency key like a real processor would.
+    """
+
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, failure_rate: float = 0.0,
+                 decline_rate: float = 0.0, seed: int = None):
+        """
+        Initializes a new FakeGateway.
+
+        :param latency: The mean simulated round-trip time in seconds.
+        :param jitter: The maximum random deviation from the mean latency in seconds.
+        :param failure_rate: The probability that a call raises GatewayError.
+        :param decline_rate: The probability that a charge is declined.
+        :param seed: An optional random seed for reproducible runs.
+        """
+        self.__latency = latency
+        self.__jitter = jitter
+        self.__failure_rate = failure_rate
+        self.__decline_rate = decline_rate
+        self.__random = random.Random(seed)
+        self.__results = {}   # idempotency key -> approved
+        self.__calls = 0
+
+    async def charge(self, payment: Payment, idempotency_key: str) -> bool:
+        self.__calls += 1
+        await asyncio.sleep(max(0.0, self.__latency + self.__random.uniform(-self.__jitter, self.__jitter)))
+        if idempotency_key in self.__results:
+            return self.__results[idempotency_key]
+        if self.__random.random() < self.__failure_rate:
+            raise GatewayError(f"Gateway unavailable for {idempotency_key}.")
+        approved = self.__random.random() >= self.__decline_rate
+        self.__results[idempotency_key] = approved
+        return approved
+
+    def get_calls(self) -> int:
+        """Returns the number of charge calls received, including retries."""
+        return self.__calls
+
+    def get_charged_keys(self) -> list:
+        """Returns the idempotency keys of all approved charges."""
+        return [key for key, approved in self.__results.items() if approved]
+
+    def __str__(self) -> str:
+        return f"FakeGateway ({len(self.__results)} charge(s), {self.__calls} call(s))"
+
+
+class FileGateway(PaymentGateway):
+    """
+    The FileGateway class is a local stand-in for a processor that accepts
+    settlement files. Each batch is written as one CSV file to a directory;
+    items with a positive amount are settled once per idempotency key, and
+    repeated keys or non-positive amounts are rejected.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initializes a new FileGateway.
+
+        :param directory: The directory settlement files are written to; created if missing.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__settled = set()
+        self.__batches = 0
+
+    async def charge(self, payment: Payment, idempotency_key: str) -> bool:
+        return payment.get_amount() > 0
+
+    def settle_batch(self, payments: list) -> list:
+        self.__batches += 1
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        path = os.path.join(self.__directory, f"settlement_{stamp}_{self.__batches:06d}.csv")
+        results = []
+        with open(path, "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["idempotency_key", "payment_id", "amount", "method", "card_last4", "result"])
+            for payment in payments:
+                key = payment.get_idempotency_key()
+                settled = payment.get_amount() > 0 and key not in self.__settled
+                if settled:
+                    self.__settled.add(key)
+                last4 = payment.get_card_number()[-4:] if isinstance(payment, CreditCardPayment) else ""
+                writer.writerow([key, payment.get_payment_id(), payment.get_amount(), payment.get_method(),
+                                 last4, "SETTLED" if settled else "REJECTED"])
+                results.append(settled)
+        return results
+
+    def get_batches(self) -> int:
+        """Returns the number of settlement files written."""
+        return self.__batches
+
+    def __str__(self) -> str:
+        return f"FileGateway writing to {self.__directory} ({self.__batches} batch(es))"
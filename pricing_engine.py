@@ -0,0 +1,191 @@
+"""
+pricing_engine.py
+Defines the PricingEngine class, the dynamic nightly rate engine of the hotel management system.
+"""
+
+from array import array
+from bisect import bisect_right
+from datetime import date
+from itertools import repeat
+from operator import mul
+import threading
+from booking import Booking
+from room import Room
+from room_inventory import RoomInventory
+
+# Rate factor for a night starting on each weekday, Monday first (Friday and Saturday nights cost more).
+DEFAULT_WEEKDAY_FACTORS = (1.0, 1.0, 1.0, 1.0, 1.15, 1.15, 1.0)
+
+# (first (month, day), last (month, day), factor); the last day is included, and a
+# season whose first day falls after its last (e.g. Dec 15 - Jan 5) wraps the year end.
+DEFAULT_SEASONS = [
+    ((6, 15), (8, 31), 1.25),
+    ((12, 20), (12, 31), 1.3),
+]
+
+# (minimum occupancy of the room type, factor), lowest band first.
+DEFAULT_OCCUPANCY_BANDS = [
+    (0.0, 0.9),
+    (0.5, 1.0),
+    (0.75, 1.15),
+    (0.9, 1.3),
+]
+
+class PricingEngine:
+    """
+    The PricingEngine class prices every night of a stay from the room's base
+    price times a factor for the room type and date. The factor combines the
+    weekday, the season and the occupancy band the room type is in that night.
+
+    Factors are cached per room type in rate tables of BLOCK_DAYS consecutive
+    days. Sold room-nights are counted per type and date from Booking events,
+    and a block is only dropped from the cache when a booking moves one of its
+    nights into another occupancy band, so most bookings leave the cache intact.
+    A lock serializes the counters and the cache, so bookings may be confirmed
+    from several threads while quotes are computed.
+    """
+
+    BLOCK_DAYS = 32
+
+    def __init__(self, inventory: RoomInventory, weekday_factors: tuple = None,
+                 seasons: list = None, occupancy_bands: list = None):
+        """
+        Initializes a new PricingEngine. Register it with
+        Booking.add_listener(engine.on_booking_event) to keep occupancy current.
+
+        :param inventory: The RoomInventory whose rooms are priced.
+        :param weekday_factors: Seven factors, Monday first.
+        :param seasons: A list of ((month, day), (month, day), factor) ranges.
+        :param occupancy_bands: A list of (minimum occupancy, factor) pairs, lowest first.
+        """
+        self.__inventory = inventory
+        self.__weekday_factors = weekday_factors or DEFAULT_WEEKDAY_FACTORS
+        self.__seasons = seasons if seasons is not None else DEFAULT_SEASONS
+        bands = occupancy_bands or DEFAULT_OCCUPANCY_BANDS
+        self.__thresholds = [threshold for threshold, _ in bands]
+        self.__band_factors = [factor for _, factor in bands]
+        self.__tables = {}   # (room type, block) -> array of factors
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Recounts the rooms of each type and the sold nights in their schedules,
+        and clears the cache. Call it after rooms are added to or removed from the inventory.
+        """
+        capacity = {}  # room type -> rooms in service
+        sold_by_type = {}  # room type -> {ordinal: rooms sold}
+        for room in self.__inventory.get_availability_index().get_rooms():
+            room_type = room.get_room_type()
+            if room.is_available():
+                capacity[room_type] = capacity.get(room_type, 0) + 1
+            sold = sold_by_type.setdefault(room_type, {})
+            for check_in, check_out, _ in room.get_schedule().get_reservations():
+                for day in range(check_in.toordinal(), check_out.toordinal()):
+                    sold[day] = sold.get(day, 0) + 1
+        with self.__lock:
+            self.__capacity = capacity
+            self.__sold = sold_by_type
+            self.__tables.clear()
+
+    def _band(self, room_type: str, sold: int) -> int:
+        capacity = self.__capacity.get(room_type, 0)
+        return bisect_right(self.__thresholds, sold / capacity if capacity else 0.0) - 1
+
+    def _season_factor(self, day: date) -> float:
+        key = (day.month, day.day)
+        factor = 1.0
+        for first, last, season_factor in self.__seasons:
+            if first <= key <= last or (first > last and (key >= first or key <= last)):
+                factor *= season_factor
+        return factor
+
+    def _table(self, room_type: str, block: int) -> array:
+        """Returns the cached factors of one block of days, building it on a miss. Call it holding the lock."""
+        table = self.__tables.get((room_type, block))
+        if table is not None:
+            self.__hits += 1
+            return table
+        self.__misses += 1
+        sold = self.__sold.get(room_type, {})
+        first = block * self.BLOCK_DAYS
+        table = array("d")
+        for ordinal in range(first, first + self.BLOCK_DAYS):
+            day = date.fromordinal(ordinal)
+            band = max(self._band(room_type, sold.get(ordinal, 0)), 0)
+            table.append(self.__weekday_factors[day.weekday()] * self._season_factor(day)
+                         * self.__band_factors[band])
+        self.__tables[(room_type, block)] = table
+        return table
+
+    def factors(self, room_type: str, check_in: date, check_out: date) -> array:
+        """Returns the rate factor of every night in [check_in, check_out) for a room type."""
+        start, end = check_in.toordinal(), check_out.toordinal()
+        size = self.BLOCK_DAYS
+        factors = array("d")
+        with self.__lock:
+            for block in range(start // size, (end - 1) // size + 1):
+                first = block * size
+                factors.extend(self._table(room_type, block)[max(start - first, 0):min(end - first, size)])
+        return factors
+
+    def nightly_rates(self, room: Room, check_in: date, check_out: date) -> array:
+        """Returns the price of every night of a stay in a room."""
+        factors = self.factors(room.get_room_type(), check_in, check_out)
+        return array("d", map(mul, factors, repeat(room.get_price_per_night())))
+
+    def quote(self, room: Room, check_in: date, check_out: date) -> float:
+        """Returns the total price of a stay in a room."""
+        return round(sum(self.nightly_rates(room, check_in, check_out)), 2)
+
+    def quote_booking(self, booking: Booking) -> float:
+        """Returns the total price of a booking's stay."""
+        return self.quote(booking.get_room(), booking.get_check_in(), booking.get_check_out())
+
+    def quote_room_type(self, room_type: str, check_in: date, check_out: date) -> tuple:
+        """
+        Quotes the cheapest free room of a type.
+
+        :return: A (room, total) pair, or None if no room of the type is free.
+        """
+        room = next(self.__inventory.search(check_in, check_out, room_type), None)
+        if room is None:
+            return None
+        return room, self.quote(room, check_in, check_out)
+
+    def quote_all(self, check_in: date, check_out: date) -> dict:
+        """Returns {room type: (room, total)} for every room type with a free room."""
+        quotes = {}
+        for room_type in self.__inventory.get_room_types():
+            quote = self.quote_room_type(room_type, check_in, check_out)
+            if quote is not None:
+                quotes[room_type] = quote
+        return quotes
+
+    def _count(self, booking: Booking, delta: int) -> None:
+        """Adds delta sold rooms to every night of a booking, invalidating blocks whose band changed."""
+        room_type = booking.get_room().get_room_type()
+        with self.__lock:
+            sold = self.__sold.setdefault(room_type, {})
+            for day in range(booking.get_check_in().toordinal(), booking.get_check_out().toordinal()):
+                before = sold.get(day, 0)
+                sold[day] = before + delta
+                if self._band(room_type, before) != self._band(room_type, before + delta):
+                    self.__tables.pop((room_type, day // self.BLOCK_DAYS), None)
+
+    def on_booking_event(self, event: str, booking: Booking) -> None:
+        """Booking listener that counts confirmed and cancelled room-nights."""
+        if event == "confirmed":
+            self._count(booking, 1)
+        elif event == "cancelled":
+            self._count(booking, -1)
+
+    def get_stats(self) -> dict:
+        """Returns the number of cached rate tables and cache hits and misses."""
+        with self.__lock:
+            return {"tables": len(self.__tables), "hits": self.__hits, "misses": self.__misses}
+
+    def __str__(self) -> str:
+        return f"PricingEngine over {len(self.__capacity)} room type(s), {len(self.__tables)} cached rate table(s)"
@@ -0,0 +1,158 @@
+"""
+quote_cache.py
+Defines the QuoteCache class, which caches room type quotes for repeated searches.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from booking import Booking
+from room import Room
+from room_inventory import RoomInventory
+
+# Loyalty tier -> share of the quoted total taken off.
+DEFAULT_TIER_DISCOUNTS = {"Basic": 0.0, "Silver": 0.05, "Gold": 0.1, "Platinum": 0.15}
+
+class QuoteCache:
+    """
+    The QuoteCache class answers "cheapest free room of type X for dates Y-Z for
+    a guest of tier T" and remembers the answer. Entries are evicted least
+    recently used first once max_entries is reached, and expire after ttl seconds.
+
+    Entries are also invalidated precisely: a confirmed or cancelled booking drops
+    only the quotes of its room type whose dates overlap the stay, and a room
+    price change drops the quotes of that room's type. Quotes are computed
+    outside the lock; each invalidation bumps its room type's generation, and a
+    quote computed across a generation change is returned but not cached.
+    """
+
+    def __init__(self, inventory: RoomInventory, pricing=None, max_entries: int = 10000,
+                 ttl: float = 60.0, tier_discounts: dict = None, clock=time.monotonic):
+        """
+        Initializes an empty QuoteCache. Register it with
+        Booking.add_listener(cache.on_booking_event) and Room.add_listener(cache.on_room_event).
+
+        :param inventory: The RoomInventory searched on a miss.
+        :param pricing: An optional PricingEngine; without it a stay costs nights times the base price.
+        :param max_entries: The maximum number of cached quotes.
+        :param ttl: The number of seconds a quote stays valid.
+        :param tier_discounts: Loyalty tier -> discount rate applied to the total.
+        :param clock: A function returning the current time in seconds.
+        """
+        self.__inventory = inventory
+        self.__pricing = pricing
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__tier_discounts = tier_discounts if tier_discounts is not None else DEFAULT_TIER_DISCOUNTS
+        self.__clock = clock
+        self.__entries = OrderedDict()  # key -> (expiry, quote)
+        self.__by_type = {}             # room type -> set of keys
+        self.__generations = {}         # room type -> number of invalidations
+        self.__cleared = 0
+        self.__lock = threading.Lock()
+        self.__stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidated": 0}
+
+    def _compute(self, room_type: str, check_in: date, check_out: date, tier: str) -> tuple:
+        """Quotes the cheapest free room of a type, or returns None."""
+        if self.__pricing is not None:
+            quote = self.__pricing.quote_room_type(room_type, check_in, check_out)
+            if quote is None:
+                return None
+            room, total = quote
+        else:
+            room = next(self.__inventory.search(check_in, check_out, room_type), None)
+            if room is None:
+                return None
+            total = (check_out - check_in).days * room.get_price_per_night()
+        discount = self.__tier_discounts.get(tier, 0.0)
+        return room, round(total * (1 - discount), 2)
+
+    def _drop(self, key: tuple) -> None:
+        del self.__entries[key]
+        keys = self.__by_type[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self.__by_type[key[0]]
+
+    def get_quote(self, room_type: str, check_in: date, check_out: date, tier: str = "Basic") -> tuple:
+        """
+        Returns a (room, total) quote for the cheapest free room of a type, or None
+        if none is free, computing it only when no valid cached quote exists.
+        """
+        key = (room_type, check_in.toordinal(), check_out.toordinal(), tier)
+        now = self.__clock()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.__entries.move_to_end(key)
+                    self.__stats["hits"] += 1
+                    return entry[1]
+                self._drop(key)
+                self.__stats["expired"] += 1
+            self.__stats["misses"] += 1
+            generation = (self.__cleared, self.__generations.get(room_type, 0))
+        quote = self._compute(room_type, check_in, check_out, tier)
+        with self.__lock:
+            if generation != (self.__cleared, self.__generations.get(room_type, 0)):
+                return quote
+            if key in self.__entries:
+                self._drop(key)
+            self.__entries[key] = (now + self.__ttl, quote)
+            self.__by_type.setdefault(room_type, set()).add(key)
+            while len(self.__entries) > self.__max_entries:
+                self._drop(next(iter(self.__entries)))
+                self.__stats["evicted"] += 1
+        return quote
+
+    def invalidate(self, room_type: str, check_in: date = None, check_out: date = None) -> int:
+        """
+        Drops the quotes of a room type, or only those overlapping [check_in, check_out).
+
+        :return: The number of quotes dropped.
+        """
+        start = check_in.toordinal() if check_in else None
+        end = check_out.toordinal() if check_out else None
+        with self.__lock:
+            self.__generations[room_type] = self.__generations.get(room_type, 0) + 1
+            stale = [key for key in self.__by_type.get(room_type, ())
+                     if start is None or (key[1] < end and start < key[2])]
+            for key in stale:
+                self._drop(key)
+            self.__stats["invalidated"] += len(stale)
+        return len(stale)
+
+    def on_booking_event(self, event: str, booking: Booking) -> None:
+        """Booking listener that drops quotes overlapping a confirmed or cancelled stay."""
+        if event in ("confirmed", "cancelled"):
+            self.invalidate(booking.get_room().get_room_type(), booking.get_check_in(), booking.get_check_out())
+
+    def on_room_event(self, event: str, room: Room) -> None:
+        """Room listener that drops every quote of a room's type when its price changes."""
+        if event == "price_changed":
+            # Re-sort the room first, whatever order the listeners were registered in.
+            self.__inventory.on_room_event(event, room)
+            self.invalidate(room.get_room_type())
+
+    def clear(self) -> None:
+        """Drops every cached quote."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__by_type.clear()
+            self.__cleared += 1
+
+    def get_stats(self) -> dict:
+        """Returns hit, miss, expiry, eviction and invalidation counts, the hit rate and the size."""
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats["size"] = len(self.__entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __str__(self) -> str:
+        return f"QuoteCache with {len(self.__entries)}/{self.__max_entries} quote(s), ttl {self.__ttl}s"
@@ -3,11 +3,36 @@ room.py
 Defines the Room class for the hotel management system.
 """
 
+from datetime import date
+from room_schedule import RoomSchedule
+
 class Room:
     """
     The Room class represents a hotel room with basic attributes and methods.
+    Listeners registered with add_listener() are called as listener(event, room);
+    the event is "price_changed" when the nightly price changes.
     """
 
+    __slots__ = ("__room_number", "__room_type", "__amenities",
+                 "__price_per_night", "__is_available", "__schedule")
+
+    __listeners = []
+
+    @classmethod
+    def add_listener(cls, listener) -> None:
+        """Registers a callable to be notified of room changes."""
+        cls.__listeners.append(listener)
+
+    @classmethod
+    def remove_listener(cls, listener) -> None:
+        """Unregisters a previously added listener."""
+        cls.__listeners.remove(listener)
+
+    def _notify(self, event: str) -> None:
+        # A copy, so listeners may unregister themselves while being notified.
+        for listener in tuple(Room.__listeners):
+            listener(event, self)
+
     def __init__(self, room_number: int, room_type: str, amenities: list, price_per_night: float, is_available: bool = True):
         """
         Initializes a new Room object.
@@ -16,15 +41,38 @@ class Room:
         :param room_type: The type of the room (e.g., single, double, suite).
         :param amenities: A list of amenities available in the room.
         :param price_per_night: The cost per night for the room.
-        :param is_available: Availability status of the room.
+        :param is_available: Whether the room is in service and can be booked at all.
         """
         self.__room_number = room_number
         self.__room_type = room_type
         self.__amenities = amenities
         self.__price_per_night = price_per_night
         self.__is_available = is_available
+        self.__schedule = RoomSchedule()  # Composition relationship
 
+    def is_available_for(self, check_in: date, check_out: date) -> bool:
+        """
+        Returns True if the room is in service and free for [check_in, check_out).
+        """
+        return self.__is_available and self.__schedule.is_free(check_in, check_out)
 
+    def reserve(self, check_in: date, check_out: date, booking_id: int) -> None:
+        """
+        Reserves the room for [check_in, check_out) on behalf of a booking.
+
+        :raises ValueError: If the room is out of service or already reserved for those dates.
+        """
+        if not self.__is_available:
+            raise ValueError(f"Room {self.__room_number} is out of service.")
+        self.__schedule.reserve(check_in, check_out, booking_id)
+
+    def release(self, check_in: date, booking_id: int) -> bool:
+        """
+        Releases the reservation a booking holds starting on check_in.
+
+        :return: True if a reservation was released.
+        """
+        return self.__schedule.release(check_in, booking_id)
 
     # Setters & Getters
     def get_room_number(self) -> int:
@@ -45,20 +93,32 @@ class Room:
 
     def set_price_per_night(self, new_price: float) -> None:
         """Sets a new price per night for the room."""
+        changed = new_price != self.__price_per_night
         self.__price_per_night = new_price
+        if changed:
+            self._notify("price_changed")
 
     def is_available(self) -> bool:
-        """Returns True if the room is available, False otherwise."""
+        """Returns True if the room is in service, False otherwise."""
         return self.__is_available
 
     def set_availability(self, status: bool) -> None:
         """
-        Updates the availability status of the room.
+        Puts the room in or out of service. Date-level availability is tracked
+        by the room's schedule, see is_available_for().
 
-        :param status: Boolean indicating if the room is available.
+        :param status: Boolean indicating if the room is in service.
         """
         self.__is_available = status
 
+    def get_schedule(self) -> RoomSchedule:
+        """Returns the room's reservation schedule."""
+        return self.__schedule
+
+    def get_lock(self):
+        """Returns the per-room lock that serializes reservations on this room."""
+        return self.__schedule.get_lock()
+
     def get_details(self) -> str:
         """Returns a string with key details about the room."""
         return (
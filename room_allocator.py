@@ -0,0 +1,307 @@
+"""
+room_allocator.py
+Defines the RoomAllocator class, which assigns rooms to room-type reservations.
+"""
+
+from datetime import date
+from booking import Booking
+from guest import Guest
+from room_inventory import RoomInventory
+from room_schedule import RoomSchedule
+
+class RoomAllocator:
+    """
+    The RoomAllocator class takes reservations for a room type and decides which
+    room each one gets. A reservation goes to the free room whose surrounding gap
+    is tightest (best fit), so stays are packed back to back and long free runs
+    stay bookable instead of being cut into nights nobody can sell.
+
+    Each room type may be overbooked by a margin: reservations beyond the rooms
+    available on a night are accepted up to capacity * (1 + margin) and wait
+    unassigned until a cancellation makes room. A cancellation only re-examines
+    the reservations around the freed dates, so it stays cheap with thousands of
+    future reservations on the books: the freed gap is offered to the stay that
+    fits it best, and the slot that stay vacates is offered on in turn.
+    """
+
+    # Gap counted for a side with no neighbouring stay, so open-ended rooms rank last.
+    OPEN_GAP = 366
+    # Days on each side of a freed stay that moved reservations may extend into.
+    REOPTIMIZE_DAYS = 14
+    # Maximum reservations moved in response to one cancellation.
+    MAX_MOVES = 100
+
+    def __init__(self, inventory: RoomInventory, overbooking: dict = None):
+        """
+        Initializes a new RoomAllocator.
+
+        :param inventory: The RoomInventory holding the rooms to allocate.
+        :param overbooking: Room type -> overbooking margin (e.g. 0.05 for 5%); default 0.
+        """
+        self.__inventory = inventory
+        self.__overbooking = dict(overbooking or {})
+        self.__reservations = {}  # reservation id -> [room type, start, end, room number, booking]
+        self.__by_type = {}       # room type -> set of reservation ids
+        self.__waiting = {}       # room type -> set of unassigned reservation ids
+        self.__by_start = {}      # room type -> {check-in ordinal: set of reservation ids}
+        self.__demand = {}        # room type -> {ordinal: reservations}
+        self.__schedules = {}     # room number -> RoomSchedule of assigned reservations
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-reads the rooms of each type from the inventory; call it after rooms are added."""
+        self.__rooms = {}
+        for room in self.__inventory.get_availability_index().get_rooms():
+            self.__rooms.setdefault(room.get_room_type(), []).append(room.get_room_number())
+        for numbers in self.__rooms.values():
+            numbers.sort()
+        for numbers in self.__rooms.values():
+            for number in numbers:
+                self.__schedules.setdefault(number, RoomSchedule())
+
+    def set_overbooking(self, room_type: str, margin: float) -> None:
+        """Sets the overbooking margin of a room type."""
+        self.__overbooking[room_type] = margin
+
+    def get_limit(self, room_type: str) -> int:
+        """Returns the number of reservations a room type accepts per night."""
+        capacity = sum(1 for number in self.__rooms.get(room_type, [])
+                       if self.__inventory.get_room(number).is_available())
+        return int(capacity * (1 + self.__overbooking.get(room_type, 0.0)))
+
+    def _neighbours(self, number: int, check_in: date, check_out: date) -> tuple:
+        """
+        Returns (end of the previous stay, start of the next stay) around a range in
+        a room, counting both allocated reservations and the room's own bookings,
+        or None if the room is out of service or not free.
+        """
+        room = self.__inventory.get_room(number)
+        if not room.is_available():
+            return None
+        ours = self.__schedules[number].neighbours(check_in, check_out)
+        theirs = room.get_schedule().neighbours(check_in, check_out) if ours is not None else None
+        if theirs is None:
+            return None
+        previous = max((end for end in (ours[0], theirs[0]) if end is not None), default=None)
+        following = min((start for start in (ours[1], theirs[1]) if start is not None), default=None)
+        return previous, following
+
+    def _score(self, number: int, check_in: date, check_out: date) -> int:
+        """Returns the gap left around a stay in a room, or None if the room is not free."""
+        around = self._neighbours(number, check_in, check_out)
+        if around is None:
+            return None
+        previous, following = around
+        start, end = check_in.toordinal(), check_out.toordinal()
+        before = start - previous if previous is not None else self.OPEN_GAP
+        after = following - end if following is not None else self.OPEN_GAP
+        return before + after
+
+    def _best_room(self, room_type: str, check_in: date, check_out: date) -> tuple:
+        """Returns (score, room number) of the best-fitting free room, or None."""
+        best = None
+        for number in self.__rooms.get(room_type, []):
+            score = self._score(number, check_in, check_out)
+            if score is not None and (best is None or score < best[0]):
+                best = (score, number)
+                if score == 0:
+                    break
+        return best
+
+    def _place(self, reservation_id: int, number: int) -> None:
+        entry = self.__reservations[reservation_id]
+        self.__schedules[number].reserve(date.fromordinal(entry[1]), date.fromordinal(entry[2]), reservation_id)
+        entry[3] = number
+        self.__waiting.get(entry[0], set()).discard(reservation_id)
+
+    def _unplace(self, reservation_id: int) -> None:
+        entry = self.__reservations[reservation_id]
+        if entry[3] is not None:
+            self.__schedules[entry[3]].release(date.fromordinal(entry[1]), reservation_id)
+            entry[3] = None
+
+    def _assign(self, reservation_id: int) -> int:
+        """Places a reservation in its best-fitting room, or leaves it waiting; returns the room number."""
+        room_type, start, end = self.__reservations[reservation_id][:3]
+        best = self._best_room(room_type, date.fromordinal(start), date.fromordinal(end))
+        if best is None:
+            self.__waiting.setdefault(room_type, set()).add(reservation_id)
+            return None
+        self._place(reservation_id, best[1])
+        return best[1]
+
+    def reserve(self, reservation_id: int, room_type: str, check_in: date, check_out: date) -> int:
+        """
+        Accepts a reservation for a room type and assigns it a room.
+
+        :return: The assigned room number, or None if the reservation is overbooked and waiting.
+        :raises KeyError: If the inventory has no rooms of the type.
+        :raises ValueError: If the ID is taken, the dates are invalid, or a night is over the limit.
+        """
+        if room_type not in self.__rooms:
+            raise KeyError(f"No rooms of type {room_type!r} in the inventory.")
+        if reservation_id in self.__reservations:
+            raise ValueError(f"Reservation {reservation_id} already exists.")
+        start, end = RoomSchedule._to_range(check_in, check_out)
+        demand = self.__demand.setdefault(room_type, {})
+        limit = self.get_limit(room_type)
+        for day in range(start, end):
+            if demand.get(day, 0) >= limit:
+                raise ValueError(f"{room_type} is sold out on {date.fromordinal(day)}.")
+        for day in range(start, end):
+            demand[day] = demand.get(day, 0) + 1
+        self.__reservations[reservation_id] = [room_type, start, end, None, None]
+        self.__by_type.setdefault(room_type, set()).add(reservation_id)
+        self.__by_start.setdefault(room_type, {}).setdefault(start, set()).add(reservation_id)
+        return self._assign(reservation_id)
+
+    def cancel(self, reservation_id: int) -> list:
+        """
+        Cancels a reservation (and its booking, if one was made) and re-optimizes
+        the reservations around the freed dates.
+
+        :return: The resulting changes as (reservation id, old room, new room) tuples.
+        :raises KeyError: If the reservation does not exist.
+        """
+        room_type, start, end, number, booking = self.__reservations[reservation_id]
+        if booking is not None:
+            booking.cancel_booking()
+        self._unplace(reservation_id)
+        del self.__reservations[reservation_id]
+        self.__by_type[room_type].discard(reservation_id)
+        self.__by_start[room_type][start].discard(reservation_id)
+        self.__waiting.get(room_type, set()).discard(reservation_id)
+        demand = self.__demand[room_type]
+        for day in range(start, end):
+            demand[day] -= 1
+        return self._reoptimize(room_type, number, start, end)
+
+    def _gain(self, reservation_id: int, number: int) -> int:
+        """Returns how much tighter a reservation would fit in another room (<= 0 if not)."""
+        entry = self.__reservations[reservation_id]
+        check_in, check_out = date.fromordinal(entry[1]), date.fromordinal(entry[2])
+        new = self._score(number, check_in, check_out)
+        if new is None:
+            return 0
+        current = entry[3]
+        self._unplace(reservation_id)
+        old = self._score(current, check_in, check_out)
+        self._place(reservation_id, current)
+        return old - new
+
+    def _reoptimize(self, room_type: str, number: int, start: int, end: int) -> list:
+        """
+        Assigns waiting reservations that overlap [start, end), then fills freed
+        slots: the movable reservation that gains most by moving into a freed gap
+        is moved, and the slot it leaves is examined next, up to MAX_MOVES moves.
+        """
+        changes = []
+        for reservation_id in sorted(self.__waiting.get(room_type, ()),
+                                     key=lambda rid: self.__reservations[rid][1]):
+            entry = self.__reservations[reservation_id]
+            if entry[1] < end and start < entry[2]:
+                assigned = self._assign(reservation_id)
+                if assigned is not None:
+                    changes.append((reservation_id, None, assigned))
+        starts = self.__by_start.get(room_type, {})
+        freed = [(number, start, end)] if number is not None else []
+        while freed and len(changes) < self.MAX_MOVES:
+            room, low, high = freed.pop()
+            around = self._neighbours(room, date.fromordinal(low), date.fromordinal(high))
+            if around is None:
+                continue
+            first = max(around[0], low - self.REOPTIMIZE_DAYS) if around[0] is not None else low - self.REOPTIMIZE_DAYS
+            last = min(around[1], high + self.REOPTIMIZE_DAYS) if around[1] is not None else high + self.REOPTIMIZE_DAYS
+            best = None
+            for day in range(first, last):
+                for reservation_id in starts.get(day, ()):
+                    entry = self.__reservations[reservation_id]
+                    if entry[2] > last or entry[3] in (None, room) or entry[4] is not None:
+                        continue
+                    gain = self._gain(reservation_id, room)
+                    if gain > 0 and (best is None or gain > best[0]):
+                        best = (gain, reservation_id)
+            if best is None:
+                continue
+            entry = self.__reservations[best[1]]
+            previous = entry[3]
+            self._unplace(best[1])
+            self._place(best[1], room)
+            changes.append((best[1], previous, room))
+            freed.append((previous, entry[1], entry[2]))
+            for sub_low, sub_high in ((low, min(high, entry[1])), (max(low, entry[2]), high)):
+                if sub_low < sub_high:
+                    freed.append((room, sub_low, sub_high))
+        return changes
+
+    def optimize(self, room_type: str) -> int:
+        """
+        Re-packs every movable reservation of a room type from scratch, longest
+        stays first within each check-in date.
+
+        :return: The number of reservations whose room changed.
+        """
+        movable = [rid for rid in self.__by_type.get(room_type, ()) if self.__reservations[rid][4] is None]
+        before = {rid: self.__reservations[rid][3] for rid in movable}
+        for reservation_id in movable:
+            self._unplace(reservation_id)
+        movable.sort(key=lambda rid: (self.__reservations[rid][1], -self.__reservations[rid][2]))
+        for reservation_id in movable:
+            self._assign(reservation_id)
+        return sum(1 for rid in movable if self.__reservations[rid][3] != before[rid])
+
+    def to_booking(self, reservation_id: int, booking_id: int, guest: Guest) -> Booking:
+        """
+        Turns an assigned reservation into a confirmed Booking on its room. The
+        reservation is then fixed: re-optimization no longer moves it.
+
+        :raises ValueError: If the reservation is still waiting for a room, or its room
+                            was booked directly in the meantime; the reservation is then
+                            reassigned (or left waiting) and may be retried.
+        """
+        entry = self.__reservations[reservation_id]
+        if entry[3] is None:
+            raise ValueError(f"Reservation {reservation_id} has no room assigned yet.")
+        if entry[4] is None:
+            room = self.__inventory.get_room(entry[3])
+            booking = Booking(booking_id, guest, room, date.fromordinal(entry[1]), date.fromordinal(entry[2]))
+            try:
+                booking.confirm_booking()
+            except ValueError:
+                self._unplace(reservation_id)
+                self._assign(reservation_id)
+                raise
+            entry[4] = booking
+            booking.notify_created()
+        return entry[4]
+
+    def get_room_number(self, reservation_id: int) -> int:
+        """Returns the room assigned to a reservation, or None if it is waiting."""
+        return self.__reservations[reservation_id][3]
+
+    def get_waiting(self, room_type: str) -> list:
+        """Returns the IDs of the overbooked reservations of a type still waiting for a room."""
+        return sorted(self.__waiting.get(room_type, ()))
+
+    def fragmentation(self, room_type: str, start: date, end: date, min_nights: int = 2) -> int:
+        """
+        Returns the number of free gaps shorter than min_nights between stays in
+        rooms of a type within [start, end); lower means better packed.
+        """
+        low, high = start.toordinal(), end.toordinal()
+        gaps = 0
+        for number in self.__rooms.get(room_type, []):
+            stays = sorted((ci.toordinal(), co.toordinal())
+                           for schedule in (self.__schedules[number], self.__inventory.get_room(number).get_schedule())
+                           for ci, co, _ in schedule.get_reservations())
+            for (_, previous_end), (next_start, _) in zip(stays, stays[1:]):
+                if low <= previous_end and next_start <= high and 0 < next_start - previous_end < min_nights:
+                    gaps += 1
+        return gaps
+
+    def __len__(self) -> int:
+        return len(self.__reservations)
+
+    def __str__(self) -> str:
+        waiting = sum(len(ids) for ids in self.__waiting.values())
+        return f"RoomAllocator with {len(self.__reservations)} reservation(s), {waiting} waiting"
@@ -0,0 +1,187 @@
+"""
+room_inventory.py
+Defines the RoomInventory class, the room search engine of the hotel management system.
+"""
+
+import itertools
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from availability_index import AvailabilityIndex
+from room import Room
+
+def _weak_listener(method):
+    """
+    Wraps a bound listener method so the listener list does not keep its object
+    alive; the wrapper unregisters itself from Room once the object is gone.
+    """
+    reference = weakref.WeakMethod(method)
+
+    def listener(event: str, room: Room) -> None:
+        target = reference()
+        if target is None:
+            Room.remove_listener(listener)
+        else:
+            target(event, room)
+    return listener
+
+
+class RoomInventory:
+    """
+    The RoomInventory class answers searches such as "all Suites with Wi-Fi and
+    Mini-bar under 350/night free from X to Y". It keeps secondary indexes on room
+    type, amenities (as integer bitsets) and price (sorted lists), and asks the
+    AvailabilityIndex for the rooms among those that are free, cheapest first. The
+    inventory listens for Room "price_changed" events, so a room repriced with
+    Room.set_price_per_night() is re-sorted in the price indexes straight away.
+    """
+
+    def __init__(self, rooms: list = None):
+        """
+        Initializes a new RoomInventory.
+
+        :param rooms: An optional list of Room objects to load.
+        """
+        self.__availability = AvailabilityIndex()  # Composition relationship
+        self.__amenity_bits = {}     # amenity name -> bit position
+        self.__room_masks = {}       # room number -> amenity bitset
+        self.__entries = {}          # room number -> (price, room number) as indexed
+        self.__by_price = []         # sorted (price, room number) over all rooms
+        self.__by_type_price = {}    # room type -> sorted (price, room number)
+        for room in rooms or []:
+            self.add_room(room)
+        Room.add_listener(_weak_listener(self.on_room_event))
+
+    def _amenity_mask(self, amenities: list, create: bool) -> int:
+        """
+        Converts a list of amenity names to a bitset. Unknown amenities get a new
+        bit when create is True, otherwise the mask is -1 (matches no room).
+        """
+        mask = 0
+        for amenity in amenities:
+            bit = self.__amenity_bits.get(amenity)
+            if bit is None:
+                if not create:
+                    return -1
+                bit = self.__amenity_bits[amenity] = len(self.__amenity_bits)
+            mask |= 1 << bit
+        return mask
+
+    def add_room(self, room: Room) -> None:
+        """
+        Adds a room to the inventory and all of its indexes.
+
+        :raises ValueError: If a room with the same number is already present.
+        """
+        number = room.get_room_number()
+        self.__availability.add_room(room)
+        self.__room_masks[number] = self._amenity_mask(room.get_amenities(), create=True)
+        entry = self.__entries[number] = (room.get_price_per_night(), number)
+        insort(self.__by_price, entry)
+        insort(self.__by_type_price.setdefault(room.get_room_type(), []), entry)
+
+    @staticmethod
+    def _position(entries: list, entry: tuple) -> int:
+        """Returns the index of an entry in a sorted index list."""
+        idx = bisect_left(entries, entry)
+        if idx == len(entries) or entries[idx] != entry:
+            raise RuntimeError(f"Price index is missing {entry}.")
+        return idx
+
+    def remove_room(self, room_number: int) -> Room:
+        """
+        Removes a room from the inventory and returns it. Every index position is
+        looked up before anything is changed, so a failure leaves the inventory intact.
+
+        :raises KeyError: If the room is not in the inventory.
+        """
+        room = self.__availability.get_room(room_number)
+        if room is None:
+            raise KeyError(f"Room {room_number} is not in the inventory.")
+        entry = self.__entries[room_number]
+        by_type = self.__by_type_price[room.get_room_type()]
+        price_idx = self._position(self.__by_price, entry)
+        type_idx = self._position(by_type, entry)
+        self.__availability.remove_room(room_number)
+        del self.__room_masks[room_number]
+        del self.__entries[room_number]
+        del self.__by_price[price_idx]
+        del by_type[type_idx]
+        return room
+
+    def update_price(self, room_number: int, new_price: float) -> None:
+        """
+        Changes a room's nightly price and keeps the price indexes in order.
+
+        :raises KeyError: If the room is not in the inventory.
+        """
+        room = self.get_room(room_number)
+        if room is None:
+            raise KeyError(f"Room {room_number} is not in the inventory.")
+        room.set_price_per_night(new_price)
+        self.on_room_event("price_changed", room)
+
+    def on_room_event(self, event: str, room: Room) -> None:
+        """
+        Room listener that re-sorts a room of this inventory in the price indexes
+        after its price changed; it does nothing if the indexes are already current.
+        """
+        if event != "price_changed":
+            return
+        number = room.get_room_number()
+        if self.__availability.get_room(number) is not room:
+            return
+        old = self.__entries[number]
+        new = (room.get_price_per_night(), number)
+        if new == old:
+            return
+        by_type = self.__by_type_price[room.get_room_type()]
+        price_idx = self._position(self.__by_price, old)
+        type_idx = self._position(by_type, old)
+        del self.__by_price[price_idx]
+        del by_type[type_idx]
+        insort(self.__by_price, new)
+        insort(by_type, new)
+        self.__entries[number] = new
+
+    def get_room(self, room_number: int) -> Room:
+        """Returns the room with the given number, or None."""
+        return self.__availability.get_room(room_number)
+
+    def get_availability_index(self) -> AvailabilityIndex:
+        """Returns the AvailabilityIndex backing this inventory."""
+        return self.__availability
+
+    def get_room_types(self) -> list:
+        """Returns the room types present in the inventory."""
+        return [room_type for room_type, entries in self.__by_type_price.items() if entries]
+
+    def search(self, check_in: date, check_out: date, room_type: str = None,
+               amenities: list = None, max_price: float = None):
+        """
+        Yields the rooms free for [check_in, check_out) that match the filters,
+        ordered by price per night (ties by room number). Results are produced
+        lazily, so taking the first page only checks as many rooms as needed.
+
+        :param room_type: Only return rooms of this type.
+        :param amenities: Only return rooms offering all of these amenities.
+        :param max_price: Only return rooms priced at or below this amount.
+        """
+        if room_type is None:
+            entries = self.__by_price
+        else:
+            entries = self.__by_type_price.get(room_type, [])
+        stop = len(entries) if max_price is None else bisect_right(entries, (max_price, float("inf")))
+
+        wanted = self._amenity_mask(amenities or [], create=False)
+        if wanted < 0:
+            return
+        masks = self.__room_masks
+        candidates = (number for _, number in itertools.islice(entries, stop) if masks[number] & wanted == wanted)
+        yield from self.__availability.free_rooms(check_in, check_out, candidates)
+
+    def __len__(self) -> int:
+        return len(self.__availability)
+
+    def __str__(self) -> str:
+        return f"RoomInventory with {len(self)} room(s) of {len(self.get_room_types())} type(s)"
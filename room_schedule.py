@@ -0,0 +1,139 @@
+"""
+room_schedule.py
+Defines the RoomSchedule class, the per-room reservation index of the hotel management system.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+class RoomSchedule:
+    """
+    The RoomSchedule class stores the reserved [check_in, check_out) date ranges of a
+    single room. Ranges in one schedule never overlap, so both the start and the end
+    ordinals are kept in sorted parallel lists and every lookup is a binary search.
+    Each schedule has its own re-entrant lock, so reservations on different rooms
+    never contend and check-then-reserve on one room is atomic. Observers added
+    with add_observer() are called as observer(start, end, delta) with the lock
+    held whenever a reservation is added (delta 1) or released (delta -1).
+    """
+
+    __slots__ = ("__starts", "__ends", "__booking_ids", "__lock", "__observers")
+
+    def __init__(self):
+        """
+        Initializes an empty RoomSchedule.
+        """
+        self.__starts = []        # check-in ordinals, sorted
+        self.__ends = []          # check-out ordinals, sorted
+        self.__booking_ids = []   # booking id of each range
+        self.__lock = threading.RLock()
+        self.__observers = ()
+
+    def add_observer(self, observer) -> None:
+        """Registers a callable(start ordinal, end ordinal, delta) notified of reservation changes."""
+        with self.__lock:
+            self.__observers += (observer,)
+
+    def remove_observer(self, observer) -> None:
+        """Unregisters a previously added observer."""
+        with self.__lock:
+            observers = list(self.__observers)
+            observers.remove(observer)
+            self.__observers = tuple(observers)
+
+    @staticmethod
+    def _to_range(check_in: date, check_out: date) -> tuple:
+        """
+        Converts a pair of dates into ordinals, rejecting empty or reversed ranges.
+        """
+        start, end = check_in.toordinal(), check_out.toordinal()
+        if end <= start:
+            raise ValueError(f"Check-out {check_out} must be after check-in {check_in}.")
+        return start, end
+
+    def _is_free(self, start: int, end: int) -> bool:
+        """
+        Returns True if no stored range overlaps the ordinal range [start, end).
+        """
+        # First range that ends after our start; it is the only one that can overlap.
+        idx = bisect_right(self.__ends, start)
+        return idx == len(self.__starts) or self.__starts[idx] >= end
+
+    def is_free(self, check_in: date, check_out: date) -> bool:
+        """
+        Returns True if the room has no reservation overlapping [check_in, check_out).
+        """
+        start, end = self._to_range(check_in, check_out)
+        with self.__lock:
+            return self._is_free(start, end)
+
+    def reserve(self, check_in: date, check_out: date, booking_id: int) -> None:
+        """
+        Records a reservation for [check_in, check_out).
+
+        :raises ValueError: If the range is invalid or overlaps an existing reservation.
+        """
+        start, end = self._to_range(check_in, check_out)
+        with self.__lock:
+            if not self._is_free(start, end):
+                raise ValueError(f"Dates {check_in} to {check_out} overlap an existing reservation.")
+            idx = bisect_left(self.__starts, start)
+            self.__starts.insert(idx, start)
+            self.__ends.insert(idx, end)
+            self.__booking_ids.insert(idx, booking_id)
+            for observer in self.__observers:
+                observer(start, end, 1)
+
+    def release(self, check_in: date, booking_id: int) -> bool:
+        """
+        Removes the reservation of booking_id that starts on check_in.
+
+        :return: True if a reservation was removed, False if none matched.
+        """
+        start = check_in.toordinal()
+        with self.__lock:
+            idx = bisect_left(self.__starts, start)
+            if idx < len(self.__starts) and self.__starts[idx] == start and self.__booking_ids[idx] == booking_id:
+                end = self.__ends[idx]
+                del self.__starts[idx]
+                del self.__ends[idx]
+                del self.__booking_ids[idx]
+                for observer in self.__observers:
+                    observer(start, end, -1)
+                return True
+            return False
+
+    def neighbours(self, check_in: date, check_out: date) -> tuple:
+        """
+        Returns the reservations around a free range as (end of the previous stay,
+        start of the next stay) ordinals, either being None if there is no such stay.
+
+        :return: The pair, or None if the range is not free.
+        """
+        start, end = self._to_range(check_in, check_out)
+        with self.__lock:
+            idx = bisect_right(self.__ends, start)
+            if idx < len(self.__starts) and self.__starts[idx] < end:
+                return None
+            previous = self.__ends[idx - 1] if idx else None
+            following = self.__starts[idx] if idx < len(self.__starts) else None
+            return previous, following
+
+    def get_reservations(self) -> list:
+        """Returns the reservations as a sorted list of (check_in, check_out, booking_id) tuples."""
+        with self.__lock:
+            return [
+                (date.fromordinal(start), date.fromordinal(end), booking_id)
+                for start, end, booking_id in zip(self.__starts, self.__ends, self.__booking_ids)
+            ]
+
+    def get_lock(self) -> threading.RLock:
+        """Returns the lock guarding this schedule."""
+        return self.__lock
+
+    def __len__(self) -> int:
+        return len(self.__starts)
+
+    def __str__(self) -> str:
+        return f"RoomSchedule with {len(self.__starts)} reservation(s)"
@@ -0,0 +1,125 @@
+"""
+settlement_batcher.py
+Defines the SettlementBatcher class for end-of-day payment settlement.
+"""
+
+import threading
+import time
+from payment import Payment
+from payment_gateway import PaymentGateway
+
+class SettlementBatcher:
+    """
+    The SettlementBatcher class collects charged payments and submits them to a
+    PaymentGateway in batches instead of one round trip per payment. A batch is
+    flushed when it reaches max_batch payments or when its oldest payment has
+    waited max_wait seconds, and each payment's status is updated to "Settled"
+    or "Rejected" from the gateway's per-item results.
+    """
+
+    def __init__(self, gateway: PaymentGateway, max_batch: int = 500, max_wait: float = 60.0,
+                 clock=time.monotonic):
+        """
+        Initializes a new SettlementBatcher.
+
+        :param gateway: The PaymentGateway that settles batches.
+        :param max_batch: The number of payments that triggers a flush.
+        :param max_wait: The age in seconds of the oldest pending payment that triggers a flush.
+        :param clock: A callable returning the current time in seconds.
+        """
+        self.__gateway = gateway
+        self.__max_batch = max_batch
+        self.__max_wait = max_wait
+        self.__clock = clock
+        self.__pending = []
+        self.__opened_at = None
+        self.__lock = threading.Lock()
+        self.__settled = 0
+        self.__rejected = 0
+        self.__batches = 0
+
+    def add(self, payment: Payment) -> list:
+        """
+        Queues a charged payment for settlement, flushing if the batch is full or due.
+
+        :return: The payments settled or rejected by a triggered flush (empty if none).
+        :raises ValueError: If the payment has not been charged successfully.
+        :raises GatewayError: If a triggered flush failed; the payments stay pending.
+        """
+        if payment.get_status() != "Paid":
+            raise ValueError(f"Payment {payment.get_payment_id()} is {payment.get_status()}, not Paid.")
+        with self.__lock:
+            if not self.__pending:
+                self.__opened_at = self.__clock()
+            self.__pending.append(payment)
+            if len(self.__pending) < self.__max_batch and not self._is_due():
+                return []
+            batch, opened_at = self._take()
+        return self._submit(batch, opened_at)
+
+    def add_all(self, payments) -> int:
+        """Queues many payments; returns the number of payments flushed along the way."""
+        return sum(len(self.add(payment)) for payment in payments)
+
+    def _is_due(self) -> bool:
+        return bool(self.__pending) and self.__clock() - self.__opened_at >= self.__max_wait
+
+    def _take(self) -> tuple:
+        """Empties the pending batch; returns it and the time it was opened."""
+        batch, self.__pending = self.__pending, []
+        opened_at, self.__opened_at = self.__opened_at, None
+        return batch, opened_at
+
+    def _submit(self, batch: list, opened_at: float) -> list:
+        """
+        Sends the payments to the gateway in batches of at most max_batch (payments put
+        back after a failure can make a batch larger) and writes the per-item results back.
+
+        :raises GatewayError: If the gateway could not take a batch; that batch and the
+                              ones after it are put back at the front of the pending
+                              batch, keeping its age.
+        """
+        size = self.__max_batch
+        for first in range(0, len(batch), size):
+            chunk = batch[first:first + size]
+            try:
+                results = self.__gateway.settle_batch(chunk)
+            except Exception:
+                with self.__lock:
+                    self.__pending[:0] = batch[first:]
+                    self.__opened_at = opened_at
+                raise
+            settled = 0
+            for payment, ok in zip(chunk, results):
+                payment.set_status("Settled" if ok else "Rejected")
+                settled += ok
+            with self.__lock:
+                self.__batches += 1
+                self.__settled += settled
+                self.__rejected += len(chunk) - settled
+        return batch
+
+    def poll(self) -> list:
+        """Flushes the pending batch if its time window has elapsed; call this periodically when idle."""
+        with self.__lock:
+            batch, opened_at = self._take() if self._is_due() else ([], None)
+        return self._submit(batch, opened_at)
+
+    def flush(self) -> list:
+        """Submits whatever is pending immediately, e.g. at the end of the day."""
+        with self.__lock:
+            batch, opened_at = self._take()
+        return self._submit(batch, opened_at)
+
+    def get_pending_count(self) -> int:
+        return len(self.__pending)
+
+    def get_stats(self) -> dict:
+        """Returns the number of batches submitted and payments settled and rejected."""
+        return {"batches": self.__batches, "settled": self.__settled, "rejected": self.__rejected}
+
+    def __str__(self) -> str:
+        return (
+            f"SettlementBatcher: {len(self.__pending)} pending, {self.__batches} batch(es), "
+            f"{self.__settled} settled, {self.__rejected} rejected"
+        )
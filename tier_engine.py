@@ -0,0 +1,131 @@
+"""
+tier_engine.py
+Defines the TierEngine class for rules-driven loyalty tier evaluation.
+"""
+
+from guest import Guest
+from invoice import Invoice
+from loyalty_program import LoyaltyProgram
+
+# (tier, minimum points, minimum nights, minimum spend), highest tier first.
+DEFAULT_TIER_RULES = [
+    ("Platinum", 10000, 50, 20000.0),
+    ("Gold", 5000, 25, 10000.0),
+    ("Silver", 1000, 10, 3000.0),
+    ("Basic", 0, 0, 0.0),
+]
+
+class TierEngine:
+    """
+    The TierEngine class assigns loyalty tiers from points, nights stayed and
+    spend (the sum of Invoice totals). A guest reaches a tier by meeting any one
+    of its thresholds. Every change to a guest's inputs marks the guest dirty,
+    and evaluate() only re-checks dirty guests, so a periodic run costs time
+    proportional to the guests that changed rather than to the whole membership.
+
+    Register it with LoyaltyProgram.add_listener(engine.on_loyalty_event) so that
+    points changes mark their guest dirty as they happen.
+    """
+
+    def __init__(self, rules: list = None):
+        """
+        Initializes a new TierEngine.
+
+        :param rules: A list of (tier, min_points, min_nights, min_spend) tuples,
+                      highest tier first; the last rule should accept everyone.
+        """
+        self.__rules = rules or DEFAULT_TIER_RULES
+        self.__guests = {}   # email -> Guest
+        self.__stats = {}    # email -> [nights, spend]
+        self.__members = {}  # LoyaltyProgram -> email
+        self.__invoices = set()
+        self.__dirty = set()
+
+    def register(self, guest: Guest) -> None:
+        """Adds a guest with a LoyaltyProgram to the engine and marks it for evaluation."""
+        email = guest.get_email()
+        self.__guests[email] = guest
+        self.__stats.setdefault(email, [0, 0.0])
+        loyalty = guest.get_loyalty_program()
+        if loyalty is not None:
+            self.__members[loyalty] = email
+        self.__dirty.add(email)
+
+    def record_stay(self, invoice: Invoice) -> bool:
+        """
+        Adds the nights and total of an invoiced stay to its guest's inputs.
+
+        :return: True if the stay was recorded, False if the invoice already was.
+        """
+        if invoice.get_invoice_id() in self.__invoices:
+            return False
+        self.__invoices.add(invoice.get_invoice_id())
+        booking = invoice.get_booking()
+        guest = booking.get_guest()
+        email = guest.get_email()
+        if email not in self.__guests:
+            self.register(guest)
+        stats = self.__stats[email]
+        stats[0] += (booking.get_check_out() - booking.get_check_in()).days
+        stats[1] += invoice.get_total()
+        self.__dirty.add(email)
+        return True
+
+    def on_loyalty_event(self, event: str, loyalty: LoyaltyProgram) -> None:
+        """LoyaltyProgram listener that marks a member dirty when its points change."""
+        email = self.__members.get(loyalty)
+        if email is not None:
+            self.__dirty.add(email)
+
+    def touch(self, guest: Guest) -> None:
+        """Marks a guest for re-evaluation, e.g. after its points balance changed."""
+        self.__dirty.add(guest.get_email())
+
+    def tier_for(self, points: int, nights: int, spend: float) -> str:
+        """Returns the highest tier whose thresholds the inputs meet."""
+        for tier, min_points, min_nights, min_spend in self.__rules:
+            if points >= min_points or nights >= min_nights or spend >= min_spend:
+                return tier
+        return self.__rules[-1][0]
+
+    def _evaluate(self, emails) -> dict:
+        changes = {}
+        for email in emails:
+            guest = self.__guests.get(email)
+            loyalty = guest.get_loyalty_program() if guest else None
+            if loyalty is None:
+                continue
+            nights, spend = self.__stats[email]
+            tier = self.tier_for(loyalty.get_points(), nights, spend)
+            if tier != loyalty.get_tier():
+                changes[email] = (loyalty.get_tier(), tier)
+                loyalty.set_tier(tier)
+        return changes
+
+    def evaluate(self) -> dict:
+        """
+        Re-evaluates only the guests whose inputs changed since the last run.
+
+        :return: A dict mapping email to (old tier, new tier) for every guest whose tier changed.
+        """
+        dirty, self.__dirty = self.__dirty, set()
+        return self._evaluate(dirty)
+
+    def evaluate_all(self) -> dict:
+        """Re-evaluates every registered guest, regardless of what changed."""
+        self.__dirty.clear()
+        return self._evaluate(self.__guests)
+
+    def get_stats(self, guest: Guest) -> tuple:
+        """Returns (nights, spend) recorded for a guest."""
+        nights, spend = self.__stats.get(guest.get_email(), (0, 0.0))
+        return nights, spend
+
+    def get_dirty_count(self) -> int:
+        return len(self.__dirty)
+
+    def __len__(self) -> int:
+        return len(self.__guests)
+
+    def __str__(self) -> str:
+        return f"TierEngine with {len(self.__guests)} member(s), {len(self.__dirty)} pending evaluation"